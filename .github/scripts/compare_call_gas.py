@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""Compare the output of `measure_call_gas.py` against a baseline and
+generate a markdown report.
+
+Every change in call gas or code size is listed. A change which grows gas or
+code size by more than `--threshold` percent counts as a regression, as does
+a scenario which no longer runs. Compile times are reported per phase, but
+never count as regressions since they depend on the machine.
+
+Usage:
+    python .github/scripts/compare_call_gas.py base.json head.json
+    python .github/scripts/compare_call_gas.py --threshold 0.5 --fail-on-regression \\
+        .github/scripts/call_gas_baseline.json head.json
+"""
+
+import argparse
+import json
+import sys
+
+
+def fmt_percent(delta, base):
+    if base == 0:
+        return "-"
+    return f"{delta / base:+.2%}"
+
+
+def _gas(builds: dict) -> dict:
+    ret = {}
+    for build, scenarios in builds.items():
+        for scenario, result in scenarios.items():
+            for call, gas in result["gas"].items():
+                ret[(build, f"{scenario}.{call}")] = gas
+    return ret
+
+
+def _code_size(builds: dict) -> dict:
+    # the same contract can be deployed by several scenarios
+    ret = {}
+    for build, scenarios in builds.items():
+        for result in scenarios.values():
+            for path, sizes in result["code_size"].items():
+                for kind, size in sizes.items():
+                    ret[(build, f"{path} ({kind})")] = size
+    return ret
+
+
+def _errors(builds: dict) -> dict:
+    ret = {}
+    for build, scenarios in builds.items():
+        for scenario, result in scenarios.items():
+            if "error" in result:
+                ret[(build, scenario)] = result["error"]
+    return ret
+
+
+def _compile_time(builds: dict) -> dict:
+    ret: dict = {}
+    for build, scenarios in builds.items():
+        for result in scenarios.values():
+            for phase, t in result.get("compile_time", {}).items():
+                ret.setdefault(build, {}).setdefault(phase, 0.0)
+                ret[build][phase] += t
+    return ret
+
+
+def compare(base: dict, head: dict, threshold: float) -> list:
+    """
+    Compare two measurements of the same kind, keyed by (build, name).
+    Returns a list of (kind, build, name, base, head) for every change, where
+    kind is one of "regression", "increase", "improvement", "new" or
+    "deleted". An increase by more than `threshold` percent is a regression.
+    """
+    rows = []
+    for key in sorted(set(base) | set(head)):
+        build, name = key
+        base_val = base.get(key)
+        head_val = head.get(key)
+        if base_val is None:
+            rows.append(("new", build, name, None, head_val))
+        elif head_val is None:
+            rows.append(("deleted", build, name, base_val, None))
+        elif head_val < base_val:
+            rows.append(("improvement", build, name, base_val, head_val))
+        elif head_val > base_val:
+            over = base_val == 0 or (head_val - base_val) / base_val * 100 > threshold
+            kind = "regression" if over else "increase"
+            rows.append((kind, build, name, base_val, head_val))
+    return rows
+
+
+_ICONS = {"regression": "🔴", "increase": "🟠", "improvement": "🟢", "new": "➕", "deleted": "🗑️"}
+
+
+def _fmt_table(title: str, rows: list) -> str:
+    if not rows:
+        return f"## {title}\n\nNo changes detected."
+
+    def _sort_key(row):
+        _, _, _, base_val, head_val = row
+        if base_val is None or head_val is None:
+            return 0
+        return abs(head_val - base_val)
+
+    lines = [
+        f"## {title}",
+        "",
+        "| Delta | Delta % | Base | Head | Build | Name |",
+        "|---|---|---|---|---|---|",
+    ]
+    for kind, build, name, base_val, head_val in sorted(rows, key=_sort_key, reverse=True):
+        icon = _ICONS[kind]
+        if base_val is None or head_val is None:
+            delta_str, pct = icon, "-"
+        else:
+            delta = head_val - base_val
+            sign = "+" if delta > 0 else ""
+            delta_str, pct = f"{icon}{sign}{delta}", fmt_percent(delta, base_val)
+        base_str = "-" if base_val is None else f"**{base_val}**"
+        head_str = "-" if head_val is None else f"**{head_val}**"
+        lines.append(f"| {delta_str} | {pct} | {base_str} | {head_str} | {build} | {name} |")
+    return "\n".join(lines)
+
+
+def _fmt_compile_time(base: dict, head: dict) -> str:
+    lines = ["## Compile Time", "", "| Build | Phase | Base (s) | Head (s) | Delta % |"]
+    lines.append("|---|---|---|---|---|")
+    for build in sorted(set(base) & set(head)):
+        for phase in head[build]:
+            if phase not in base[build]:
+                continue
+            b, h = base[build][phase], head[build][phase]
+            lines.append(f"| {build} | {phase} | {b:.3f} | {h:.3f} | {fmt_percent(h - b, b)} |")
+    return "\n".join(lines)
+
+
+def generate_report(base_path: str, head_path: str, threshold: float) -> tuple[str, bool]:
+    """
+    Returns the markdown report, and whether there were any regressions
+    beyond the threshold.
+    """
+    with open(base_path) as f:
+        base = json.load(f)
+    with open(head_path) as f:
+        head = json.load(f)
+
+    sections = []
+    if base.get("backend") != head.get("backend"):
+        # the backends disagree on what is included in the gas used
+        sections.append(
+            f"> **Warning**: base was measured with `{base.get('backend')}`, "
+            f"head with `{head.get('backend')}`. Gas is not comparable."
+        )
+
+    # only compare the builds which were measured on both sides
+    common = base["builds"].keys() & head["builds"].keys()
+    skipped = sorted(base["builds"].keys() ^ head["builds"].keys())
+    if skipped:
+        sections.append(f"> Builds which were only measured on one side: {', '.join(skipped)}")
+    base_builds = {k: v for k, v in base["builds"].items() if k in common}
+    head_builds = {k: v for k, v in head["builds"].items() if k in common}
+    gas_rows = compare(_gas(base_builds), _gas(head_builds), threshold)
+    size_rows = compare(_code_size(base_builds), _code_size(head_builds), threshold)
+    base_errors, head_errors = _errors(base_builds), _errors(head_builds)
+    broke = {k: v for k, v in head_errors.items() if k not in base_errors}
+    fixed = [k for k in base_errors if k not in head_errors]
+
+    if broke:
+        lines = ["## Failing Scenarios", "", "| Build | Scenario | Error |", "|---|---|---|"]
+        for (build, scenario), error in sorted(broke.items()):
+            lines.append(f"| {build} | {scenario} | `{error}` |")
+        sections.append("\n".join(lines))
+
+    sections.append(_fmt_table("Call Gas Changes", gas_rows))
+    sections.append(_fmt_table("Code Size Changes", size_rows))
+
+    base_times, head_times = _compile_time(base_builds), _compile_time(head_builds)
+    if base_times and head_times:
+        sections.append(_fmt_compile_time(base_times, head_times))
+
+    gas_regressions = [r for r in gas_rows if r[0] == "regression"]
+    size_regressions = [r for r in size_rows if r[0] == "regression"]
+    summary = ["## Summary", ""]
+    summary.append(f"- Threshold: {threshold}%")
+    summary.append(f"- Calls measured: {len(_gas(head_builds))}")
+    summary.append(f"- Gas changes: {len(gas_rows)}")
+    summary.append(f"- Gas regressions above threshold: {len(gas_regressions)}")
+    summary.append(f"- Code size changes: {len(size_rows)}")
+    summary.append(f"- Code size regressions above threshold: {len(size_regressions)}")
+    summary.append(f"- Newly failing scenarios: {len(broke)}")
+    summary.append(f"- Newly passing scenarios: {len(fixed)}")
+    sections.append("\n".join(summary))
+
+    failed = bool(gas_regressions or size_regressions or broke)
+    return "\n\n".join(sections) + "\n", failed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=0.0, help="Allowed increase, in percent")
+    parser.add_argument(
+        "--fail-on-regression",
+        action="store_true",
+        help="Exit with a nonzero status if there are regressions",
+    )
+    args = parser.parse_args()
+
+    report, failed = generate_report(args.base, args.head, args.threshold)
+    print(report)
+    if failed and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""Compare the output of `measure_compile_time.py` between base and head and
+generate a markdown report.
+
+For the synthetic contracts, the time of each phase at the largest size is
+compared, together with the scaling exponents; for the examples, the time of
+each phase summed over all contracts. A phase which got slower by more than
+`--threshold` percent, or whose scaling exponent grew by more than
+`--exponent-threshold`, counts as a regression.
+
+Usage:
+    python .github/scripts/compare_compile_time.py base.json head.json
+    python .github/scripts/compare_compile_time.py --threshold 20 --fail-on-regression \\
+        base.json head.json
+"""
+
+import argparse
+import json
+import sys
+
+
+def fmt_percent(delta, base):
+    if base == 0:
+        return "-"
+    return f"{delta / base:+.2%}"
+
+
+def _largest_size(result: dict) -> dict:
+    # the phase times at the largest size which compiled
+    sizes = [n for n, r in result["sizes"].items() if "error" not in r]
+    if not sizes:
+        return {}
+    return result["sizes"][max(sizes, key=int)]
+
+
+def _times(run: dict) -> dict:
+    ret = dict(run.get("phases", {}))
+    for name, t in run.get("venom_passes", {}).items():
+        ret[f"venom_passes.{name}"] = t
+    return ret
+
+
+def synthetic_times(data: dict) -> dict:
+    ret = {}
+    for gen, pipelines in data["synthetic"].items():
+        for pipeline, result in pipelines.items():
+            for phase, t in _times(_largest_size(result)).items():
+                ret[(f"{gen} ({pipeline})", phase)] = t
+    return ret
+
+
+def synthetic_exponents(data: dict) -> dict:
+    ret = {}
+    for gen, pipelines in data["synthetic"].items():
+        for pipeline, result in pipelines.items():
+            for phase, k in result["exponents"].items():
+                ret[(f"{gen} ({pipeline})", phase)] = k
+    return ret
+
+
+def example_times(data: dict) -> dict:
+    ret: dict = {}
+    for pipelines in data["examples"].values():
+        for pipeline, run in pipelines.items():
+            for phase, t in _times(run).items():
+                key = (f"examples ({pipeline})", phase)
+                ret[key] = ret.get(key, 0.0) + t
+    return ret
+
+
+def compare_times(base: dict, head: dict, threshold: float, min_seconds: float) -> list:
+    """
+    Returns (regressed, subject, phase, base, head) for every phase which
+    got slower or faster by more than `threshold` percent, sorted by the
+    relative change. Phases which take less than `min_seconds` on both sides
+    are dominated by noise, and left out.
+    """
+    rows = []
+    for key in base.keys() & head.keys():
+        b, h = base[key], head[key]
+        if max(b, h) < min_seconds or b == 0:
+            continue
+        change = (h - b) / b * 100
+        if abs(change) > threshold:
+            rows.append((change > 0, *key, b, h))
+    rows.sort(key=lambda r: (r[4] - r[3]) / r[3], reverse=True)
+    return rows
+
+
+def compare_exponents(base: dict, head: dict, threshold: float) -> list:
+    rows = []
+    for key in base.keys() & head.keys():
+        b, h = base[key], head[key]
+        if abs(h - b) > threshold:
+            rows.append((h - b > threshold, *key, b, h))
+    rows.sort(key=lambda r: r[4] - r[3], reverse=True)
+    return rows
+
+
+def _fmt_times(title: str, rows: list) -> str:
+    if not rows:
+        return f"## {title}\n\nNo changes detected."
+    lines = [f"## {title}", "", "| Delta % | Base (s) | Head (s) | Contracts | Phase |"]
+    lines.append("|---|---|---|---|---|")
+    for regressed, subject, phase, b, h in rows:
+        icon = "🔴" if regressed else "🟢"
+        lines.append(f"| {icon}{fmt_percent(h - b, b)} | {b:.3f} | {h:.3f} | {subject} | {phase} |")
+    return "\n".join(lines)
+
+
+def _fmt_exponents(rows: list) -> str:
+    if not rows:
+        return "## Scaling Changes\n\nNo changes detected."
+    lines = ["## Scaling Changes", "", "| Delta | Base | Head | Contracts | Phase |"]
+    lines.append("|---|---|---|---|---|")
+    for regressed, subject, phase, b, h in rows:
+        icon = "🔴" if regressed else "🟢"
+        lines.append(f"| {icon}{h - b:+.2f} | {b:.2f} | {h:.2f} | {subject} | {phase} |")
+    return "\n".join(lines)
+
+
+def generate_report(
+    base_path: str,
+    head_path: str,
+    threshold: float,
+    exponent_threshold: float,
+    min_seconds: float = 0.05,
+) -> tuple[str, bool]:
+    """
+    Returns the markdown report, and whether any phase regressed beyond
+    the thresholds.
+    """
+    with open(base_path) as f:
+        base = json.load(f)
+    with open(head_path) as f:
+        head = json.load(f)
+
+    sections = []
+    if base.get("opt_level") != head.get("opt_level"):
+        sections.append(
+            f"> **Warning**: base was measured at `{base.get('opt_level')}`, "
+            f"head at `{head.get('opt_level')}`."
+        )
+
+    exponent_rows = compare_exponents(
+        synthetic_exponents(base), synthetic_exponents(head), exponent_threshold
+    )
+    synthetic_rows = compare_times(
+        synthetic_times(base), synthetic_times(head), threshold, min_seconds
+    )
+    example_rows = compare_times(example_times(base), example_times(head), threshold, min_seconds)
+
+    sections.append(_fmt_exponents(exponent_rows))
+    sections.append(_fmt_times("Synthetic Contracts (largest size)", synthetic_rows))
+    sections.append(_fmt_times("Examples", example_rows))
+
+    scaling_regressions = [r for r in exponent_rows if r[0]]
+    time_regressions = [r for r in synthetic_rows + example_rows if r[0]]
+    summary = ["## Summary", ""]
+    summary.append(f"- Threshold: {threshold}%, exponent threshold: {exponent_threshold}")
+    summary.append(f"- Phases slower than threshold: {len(time_regressions)}")
+    summary.append(f"- Scaling regressions: {len(scaling_regressions)}")
+    if time_regressions:
+        _, subject, phase, b, h = max(time_regressions, key=lambda r: (r[4] - r[3]) / r[3])
+        summary.append(f"- Top slowdown: `{phase}` in {subject} ({fmt_percent(h - b, b)})")
+    sections.append("\n".join(summary))
+
+    failed = bool(scaling_regressions or time_regressions)
+    return "\n\n".join(sections) + "\n", failed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument(
+        "--threshold", type=float, default=10.0, help="Allowed slowdown, in percent"
+    )
+    parser.add_argument(
+        "--exponent-threshold",
+        type=float,
+        default=0.25,
+        help="Allowed growth of the scaling exponents",
+    )
+    parser.add_argument(
+        "--fail-on-regression",
+        action="store_true",
+        help="Exit with a nonzero status if there are regressions",
+    )
+    args = parser.parse_args()
+
+    report, failed = generate_report(args.base, args.head, args.threshold, args.exponent_threshold)
+    print(report)
+    if failed and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Measure the time spent in Venom assembly generation on large functions.
+
+The corpus consists of synthetic contracts whose functions keep many
+variables live at once, so that stack scheduling runs close to the 16-slot
+limit and has to spill. Only `VenomCompiler.generate_evm_assembly` is timed.
+
+Usage:
+    python .github/scripts/measure_assembly_time.py
+    python .github/scripts/measure_assembly_time.py --repeat 5 --sizes 16,32,64
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from vyper.compiler.phases import CompilerData
+from vyper.compiler.settings import OptimizationLevel, Settings, anchor_settings
+from vyper.venom.venom_to_assembly import VenomCompiler
+
+DEFAULT_SIZES = "16,32,64,96"
+
+
+def many_live_vars(n: int) -> str:
+    # n locals which all stay live until the final sum
+    lines = ["@external", "def foo(x: uint256) -> uint256:"]
+    for i in range(n):
+        lines.append(f"    v{i}: uint256 = x * {i + 3} + {i}")
+    lines.append("    acc: uint256 = 0")
+    for i in range(n):
+        lines.append(f"    acc = acc * v{n - 1 - i} + v{i}")
+    lines.append("    return acc")
+    return "\n".join(lines) + "\n"
+
+
+def many_args(n: int) -> str:
+    # internal function with a wide calling convention, called in a loop
+    args = ", ".join(f"a{i}: uint256" for i in range(n))
+    body = " + ".join(f"a{i} * {i + 1}" for i in range(n))
+    call_args = ", ".join(f"x + {i}" for i in range(n))
+    return f"""
+@internal
+def bar({args}) -> uint256:
+    return {body}
+
+@external
+def foo(x: uint256) -> uint256:
+    acc: uint256 = 0
+    for i: uint256 in range(8):
+        acc += self.bar({call_args})
+    return acc
+"""
+
+
+CORPUS = {"many_live_vars": many_live_vars, "many_args": many_args}
+
+
+def time_assembly(source: str, opt_level: OptimizationLevel) -> float:
+    settings = Settings(experimental_codegen=True, optimize=opt_level)
+    compiler_data = CompilerData(source, settings=settings)
+    with anchor_settings(compiler_data.settings):
+        compiler = VenomCompiler(compiler_data.venom_runtime)
+        t0 = time.perf_counter()
+        compiler.generate_evm_assembly()
+        return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated corpus sizes")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per contract (best is kept)")
+    parser.add_argument("-O", dest="opt_level", default="gas", help="Optimization level")
+    args = parser.parse_args()
+
+    opt_level = OptimizationLevel.from_string(args.opt_level)
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    results = {}
+    for name, gen in CORPUS.items():
+        for n in sizes:
+            key = f"{name}_{n}"
+            try:
+                best = min(time_assembly(gen(n), opt_level) for _ in range(args.repeat))
+                results[key] = {"seconds": round(best, 4), "error": None}
+            except Exception as e:
+                results[key] = {"seconds": None, "error": str(e)}
+            print(f"{key}: {results[key]}", file=sys.stderr)
+
+    print(json.dumps({"contracts": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""Measure the gas used by a fixed call script against the example contracts
+and a set of realistic third-party contracts, for every optimization level of
+both pipelines.
+
+Each scenario deploys one or more contracts and runs a fixed sequence of
+calls. For every build the gas used by each call is recorded, together with
+the runtime and initcode size of every contract which was deployed, and the
+time spent in each compiler phase (see `-f profile`).
+
+The output can be compared against a baseline with `compare_call_gas.py`.
+The baseline which is checked in at `call_gas_baseline.json` is generated
+with `--no-timing`, since compile times depend on the machine.
+
+Must be run from the repository root, since it uses the test EVM backends.
+
+Usage:
+    PYTHONPATH=. python .github/scripts/measure_call_gas.py > head.json
+    PYTHONPATH=. python .github/scripts/measure_call_gas.py --backend py-evm
+    PYTHONPATH=. python .github/scripts/measure_call_gas.py --builds venom-O2 legacy-O2
+    PYTHONPATH=. python .github/scripts/measure_call_gas.py --no-timing \\
+        > .github/scripts/call_gas_baseline.json
+"""
+
+import argparse
+import json
+import sys
+from random import Random
+
+from eth_keys.datatypes import PrivateKey
+from eth_utils import keccak
+
+from tests.evm_backends.pyevm_env import PyEvmEnv
+from tests.evm_backends.revm_env import RevmEnv
+from vyper.compiler import compile_code
+from vyper.compiler.settings import OptimizationLevel, Settings
+
+THIRDPARTY = "tests/functional/examples/thirdparty/curvefi/amm"
+STABLESWAP_MATH = f"{THIRDPARTY}/stableswap/math/math_v_100.vy"
+TWOCRYPTO_MATH = f"{THIRDPARTY}/twocryptoswap/math/math_v_210.vy"
+TRICRYPTO_MATH = f"{THIRDPARTY}/tricryptoswap/math/math_v_200.vy"
+
+BACKENDS = {"revm": RevmEnv, "py-evm": PyEvmEnv}
+
+BUILDS = {
+    "legacy-O2": (False, OptimizationLevel.GAS),
+    "legacy-Os": (False, OptimizationLevel.CODESIZE),
+    "venom-O2": (True, OptimizationLevel.GAS),
+    "venom-O3": (True, OptimizationLevel.O3),
+    "venom-Os": (True, OptimizationLevel.CODESIZE),
+}
+
+ETHER = 10**18
+
+
+def _mk_env(backend: str):
+    random = Random(b"vyper")
+    keys = [PrivateKey(random.randbytes(32)) for _ in range(10)]
+    env = BACKENDS[backend](
+        gas_limit=10**10,
+        account_keys=keys,
+        tracing=False,
+        block_number=1,
+        evm_version="prague",
+        exporter=None,
+    )
+    for account in env.accounts:
+        env.set_balance(account, 1000 * ETHER)
+    env.timestamp = 1_000_000
+    return env
+
+
+def erc20(env, deploy):
+    c = deploy("examples/tokens/ERC20.vy", "Token", "TKN", 18, 10**6)
+    owner, alice, bob = env.accounts[:3]
+    yield "transfer", lambda: c.transfer(alice, 10**20, sender=owner)
+    yield "transfer_warm", lambda: c.transfer(alice, 10**20, sender=owner)
+    yield "approve", lambda: c.approve(bob, 10**19, sender=alice)
+    yield "transferFrom", lambda: c.transferFrom(alice, bob, 10**18, sender=bob)
+    yield "mint", lambda: c.mint(bob, 10**18, sender=owner)
+    yield "burn", lambda: c.burn(10**18, sender=bob)
+    yield "burnFrom", lambda: c.burnFrom(alice, 10**18, sender=bob)
+
+
+def erc721(env, deploy):
+    c = deploy("examples/tokens/ERC721.vy")
+    owner, alice, bob = env.accounts[:3]
+    yield "mint", lambda: c.mint(alice, 1, sender=owner)
+    c.mint(alice, 2, sender=owner)
+    yield "approve", lambda: c.approve(bob, 1, sender=alice)
+    yield "transferFrom", lambda: c.transferFrom(alice, bob, 1, sender=bob)
+    yield "setApprovalForAll", lambda: c.setApprovalForAll(bob, True, sender=alice)
+    yield "safeTransferFrom", lambda: c.safeTransferFrom(alice, bob, 2, b"", sender=bob)
+    yield "tokenURI", lambda: c.tokenURI(2**255)
+    yield "burn", lambda: c.burn(2, sender=bob)
+
+
+def erc1155(env, deploy):
+    c = deploy("examples/tokens/ERC1155ownable.vy", "Token", "TKN", "https://x/", "https://y/")
+    owner, alice = env.accounts[:2]
+    ids = list(range(1, 17))
+    amounts = [10] * len(ids)
+    yield "mint", lambda: c.mint(alice, 100, 10, sender=owner)
+    yield "mintBatch", lambda: c.mintBatch(alice, ids, amounts, sender=owner)
+    yield "balanceOfBatch", lambda: c.balanceOfBatch([alice] * len(ids), ids)
+    yield "safeTransferFrom", lambda: c.safeTransferFrom(
+        alice, owner, 100, 1, b"\x00" * 32, sender=alice
+    )
+    yield "safeBatchTransferFrom", lambda: c.safeBatchTransferFrom(
+        alice, owner, ids, [1] * len(ids), b"\x00" * 32, sender=alice
+    )
+    yield "burnBatch", lambda: c.burnBatch(ids, [1] * len(ids), sender=alice)
+    yield "uri", lambda: c.uri(1)
+
+
+def erc4626(env, deploy):
+    owner, alice = env.accounts[:2]
+    token = deploy("examples/tokens/ERC20.vy", "Token", "TKN", 18, 10**6)
+    c = deploy("examples/tokens/ERC4626.vy", token.address)
+    token.transfer(alice, 10**21, sender=owner)
+    token.approve(c.address, 10**21, sender=alice)
+    yield "deposit", lambda: c.deposit(10**20, sender=alice)
+    yield "mint", lambda: c.mint(10**20, sender=alice)
+    yield "convertToShares", lambda: c.convertToShares(10**18)
+    yield "withdraw", lambda: c.withdraw(10**19, sender=alice)
+    yield "redeem", lambda: c.redeem(10**19, sender=alice)
+
+
+def ballot(env, deploy):
+    c = deploy("examples/voting/ballot.vy", [b"a" * 32, b"b" * 32])
+    voters = env.accounts[1:6]
+    yield "giveRightToVote", lambda: c.giveRightToVote(voters[0])
+    for voter in voters[1:]:
+        c.giveRightToVote(voter)
+    # a delegation chain, which is followed by `_forwardWeight`
+    yield "delegate", lambda: c.delegate(voters[1], sender=voters[0])
+    yield "delegate_chain", lambda: c.delegate(voters[2], sender=voters[1])
+    yield "vote", lambda: c.vote(1, sender=voters[2])
+    yield "winningProposal", lambda: c.winningProposal()
+
+
+def blind_auction(env, deploy):
+    beneficiary, alice = env.accounts[:2]
+    c = deploy("examples/auctions/blind_auction.vy", beneficiary, 100, 100)
+    n = 8
+    values = [(i + 1) * 10**15 for i in range(n)]
+    fakes = [i % 3 == 0 for i in range(n)]
+    secrets = [bytes([i + 1]) * 32 for i in range(n)]
+
+    def blinded(i):
+        return keccak(values[i].to_bytes(32, "big") + fakes[i].to_bytes(32, "big") + secrets[i])
+
+    yield "bid", lambda: c.bid(blinded(0), value=values[0], sender=alice)
+    for i in range(1, n):
+        c.bid(blinded(i), value=values[i], sender=alice)
+
+    def pad(xs, fill):
+        return xs + [fill] * (128 - n)
+
+    env.timestamp += 150
+    yield "reveal", lambda: c.reveal(
+        n, pad(values, 0), pad(fakes, False), pad(secrets, b"\x00" * 32), sender=alice
+    )
+    env.timestamp += 100
+    yield "auctionEnd", lambda: c.auctionEnd()
+
+
+def simple_open_auction(env, deploy):
+    beneficiary, alice, bob = env.accounts[:3]
+    c = deploy("examples/auctions/simple_open_auction.vy", beneficiary, env.timestamp, 100)
+    yield "bid", lambda: c.bid(value=10**17, sender=alice)
+    yield "outbid", lambda: c.bid(value=2 * 10**17, sender=bob)
+    yield "withdraw", lambda: c.withdraw(sender=alice)
+    env.timestamp += 200
+    yield "endAuction", lambda: c.endAuction()
+
+
+def crowdfund(env, deploy):
+    beneficiary, alice, bob = env.accounts[:3]
+    c = deploy("examples/crowdfund.vy", beneficiary, 10**18, 100)
+    yield "participate", lambda: c.participate(value=6 * 10**17, sender=alice)
+    yield "participate_again", lambda: c.participate(value=10**17, sender=alice)
+    c.participate(value=3 * 10**17, sender=bob)
+    env.timestamp += 200
+    yield "finalize", lambda: c.finalize()
+
+
+def safe_remote_purchase(env, deploy):
+    seller, buyer = env.accounts[:2]
+    c = deploy("examples/safe_remote_purchase/safe_remote_purchase.vy", value=2 * 10**17)
+    yield "purchase", lambda: c.purchase(value=2 * 10**17, sender=buyer)
+    yield "received", lambda: c.received(sender=buyer)
+
+
+def company(env, deploy):
+    owner, alice, bob = env.accounts[:3]
+    c = deploy("examples/stock/company.vy", owner, 1000, 10**15)
+    yield "buyStock", lambda: c.buyStock(value=10**17, sender=alice)
+    yield "transferStock", lambda: c.transferStock(bob, 10, sender=alice)
+    yield "sellStock", lambda: c.sellStock(10, sender=bob)
+    yield "payBill", lambda: c.payBill(bob, 10**15, sender=owner)
+    yield "debt", lambda: c.debt()
+
+
+def storage(env, deploy):
+    c = deploy("examples/storage/storage.vy", 1)
+    d = deploy("examples/storage/advanced_storage.vy", 1)
+    yield "set", lambda: c.set(10)
+    yield "advanced_set", lambda: d.set(10)
+    yield "advanced_reset", lambda: d.reset()
+
+
+def name_registry(env, deploy):
+    c = deploy("examples/name_registry/name_registry.vy")
+    name = b"vyper" * 20
+    yield "register", lambda: c.register(name, env.accounts[1])
+    yield "lookup", lambda: c.lookup(name)
+
+
+def market_maker(env, deploy):
+    owner, alice = env.accounts[:2]
+    token = deploy("examples/tokens/ERC20.vy", "Token", "TKN", 18, 10**6)
+    c = deploy("examples/market_maker/on_chain_market_maker.vy")
+    token.approve(c.address, 10**21, sender=owner)
+    token.transfer(alice, 10**20, sender=owner)
+    token.approve(c.address, 10**20, sender=alice)
+    yield "initiate", lambda: c.initiate(token.address, 10**21, value=ETHER, sender=owner)
+    yield "ethToTokens", lambda: c.ethToTokens(value=10**16, sender=alice)
+    yield "tokensToEth", lambda: c.tokensToEth(10**18, sender=alice)
+    yield "ownerWithdraw", lambda: c.ownerWithdraw(sender=owner)
+
+
+def factory(env, deploy):
+    owner = env.deployer
+    exchange_path = "examples/factory/Exchange.vy"
+    token1 = deploy("examples/tokens/ERC20.vy", "One", "ONE", 18, 10**6)
+    token2 = deploy("examples/tokens/ERC20.vy", "Two", "TWO", 18, 10**6)
+    # the runtime code does not depend on the constructor arguments
+    codehash = keccak(env.get_code(deploy(exchange_path, token1.address, owner).address))
+    f = deploy("examples/factory/Factory.vy", codehash)
+    exchange1 = deploy(exchange_path, token1.address, f.address)
+    exchange2 = deploy(exchange_path, token2.address, f.address)
+    yield "initialize", lambda: exchange1.initialize()
+    exchange2.initialize()
+    token2.transfer(exchange2.address, 10**20, sender=owner)
+    token1.approve(exchange1.address, 10**20, sender=owner)
+    yield "trade", lambda: f.trade(token1.address, token2.address, 10**18, sender=owner)
+
+
+def stableswap_math(env, deploy):
+    c = deploy(STABLESWAP_MATH)
+    xp = [10**24 + i * 10**21 for i in range(4)]
+    yield "get_D", lambda: c.get_D(xp, 2000 * 100, 4)
+    d = c.get_D(xp, 2000 * 100, 4)
+    yield "get_y", lambda: c.get_y(0, 1, xp[0] + 10**22, xp, 2000 * 100, d, 4)
+    yield "get_y_D", lambda: c.get_y_D(2000 * 100, 0, xp, d - 10**21, 4)
+    yield "exp", lambda: c.exp(-(10**18))
+
+
+def twocrypto_math(env, deploy):
+    c = deploy(TWOCRYPTO_MATH)
+    ann = 400_000
+    gamma = 145 * 10**12
+    d = 2 * 10**24
+    x = [10**24 + 10**22, 10**24]
+    yield "newton_y", lambda: c.newton_y(ann, gamma, x, d, 1)
+
+
+def tricrypto_math(env, deploy):
+    c = deploy(TRICRYPTO_MATH)
+    ann = 1_707_629
+    gamma = 11_809_167_828_997
+    x = [10**24, 10**24, 10**24]
+    yield "newton_D", lambda: c.newton_D(ann, gamma, x)
+    d = c.newton_D(ann, gamma, x)
+    yield "get_y", lambda: c.get_y(ann, gamma, [x[0] + 10**22, x[1], x[2]], d, 1)
+    yield "get_p", lambda: c.get_p(x, d, [ann, gamma])
+    yield "geometric_mean", lambda: c.geometric_mean(x)
+    yield "cbrt", lambda: c.cbrt(3 * 10**36)
+
+
+SCENARIOS = {
+    "ERC20": erc20,
+    "ERC721": erc721,
+    "ERC1155ownable": erc1155,
+    "ERC4626": erc4626,
+    "ballot": ballot,
+    "blind_auction": blind_auction,
+    "simple_open_auction": simple_open_auction,
+    "crowdfund": crowdfund,
+    "safe_remote_purchase": safe_remote_purchase,
+    "company": company,
+    "storage": storage,
+    "name_registry": name_registry,
+    "market_maker": market_maker,
+    "factory": factory,
+    "stableswap_math": stableswap_math,
+    "twocrypto_math": twocrypto_math,
+    "tricrypto_math": tricrypto_math,
+}
+
+
+def _phase_times(profile: dict) -> dict:
+    phases = profile["total"].get("children", {})
+    return {name: phase["time"] for name, phase in phases.items()}
+
+
+def run_scenario(scenario, settings: Settings, backend: str, timing: bool) -> dict:
+    env = _mk_env(backend)
+    code_size: dict = {}
+    compile_time: dict = {}
+    cache: dict = {}
+
+    output_formats = ["abi", "bytecode", "bytecode_runtime"]
+    if timing:
+        output_formats.append("profile")
+
+    def deploy(path, *args, **kwargs):
+        if path not in cache:
+            with open(path) as f:
+                source = f.read()
+            out = compile_code(
+                source, contract_path=path, settings=settings, output_formats=output_formats
+            )
+            cache[path] = out
+            runtime = bytes.fromhex(out["bytecode_runtime"].removeprefix("0x"))
+            initcode = bytes.fromhex(out["bytecode"].removeprefix("0x"))
+            code_size[path] = {"runtime": len(runtime), "initcode": len(initcode)}
+            if timing:
+                for phase, t in _phase_times(out["profile"]).items():
+                    compile_time[phase] = compile_time.get(phase, 0.0) + t
+
+        out = cache[path]
+        bytecode = bytes.fromhex(out["bytecode"].removeprefix("0x"))
+        return env.deploy(out["abi"], bytecode, *args, **kwargs)
+
+    ret: dict = {"gas": {}}
+    name = "<setup>"
+    try:
+        for name, call in scenario(env, deploy):
+            call()
+            ret["gas"][name] = env.last_result.gas_used
+    except Exception as e:
+        # keep going, a build which breaks a scenario is reported as such
+        ret["error"] = f"{name}: {type(e).__name__}: {e}"
+
+    ret["code_size"] = code_size
+    if timing:
+        ret["compile_time"] = compile_time
+    return ret
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--backend", choices=list(BACKENDS), default="revm")
+    parser.add_argument("--builds", nargs="+", choices=list(BUILDS), default=list(BUILDS))
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument(
+        "--no-timing", action="store_true", help="Do not record compile time per phase"
+    )
+    args = parser.parse_args()
+
+    builds = {}
+    for build in args.builds:
+        experimental_codegen, opt_level = BUILDS[build]
+        settings = Settings(experimental_codegen=experimental_codegen, optimize=opt_level)
+        results = {}
+        for name in args.scenarios:
+            results[name] = run_scenario(
+                SCENARIOS[name], settings, args.backend, timing=not args.no_timing
+            )
+            if "error" in results[name]:
+                print(f"{build} {name}: {results[name]['error']}", file=sys.stderr)
+            else:
+                print(f"{build} {name}: {results[name]['gas']}", file=sys.stderr)
+        builds[build] = results
+
+    print(json.dumps({"backend": args.backend, "builds": builds}, indent=2, sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""Measure the time spent in each phase of the compiler, on synthetic
+contracts of increasing size and on the example contracts.
+
+Each synthetic generator produces a contract which grows along a single
+axis (number of functions, storage variables, depth of the import tree,
+length of a constant array, depth of nested loops). Every contract is
+compiled with the legacy and the Venom pipeline, and the time spent in
+each phase is taken from the compiler profiler, with the Venom passes
+aggregated by pass across all functions.
+
+For every generator, the scaling exponent of each phase is fitted over the
+sizes, i.e. `k` in `time ~ size**k`. An exponent well above 1 points at
+super-linear behaviour in that phase. Phases which stay below
+`MIN_SECONDS` at every size are left out, since their exponents are noise.
+
+The output is JSON which can be compared across commits with
+`compare_compile_time.py`.
+
+Before anything is timed, a small contract is compiled once with every
+pipeline, so that the lazily imported parts of the compiler are not
+counted against the first contract which is measured.
+
+Must be run from the repository root, since the paths of the examples are
+relative to it.
+
+Usage:
+    PYTHONPATH=. python .github/scripts/measure_compile_time.py > head.json
+    PYTHONPATH=. python .github/scripts/measure_compile_time.py --generators functions nested_loops
+    PYTHONPATH=. python .github/scripts/measure_compile_time.py --pipelines venom -O O3 --repeat 5
+    PYTHONPATH=. python .github/scripts/measure_compile_time.py --scale 2 --no-examples
+"""
+
+import argparse
+import json
+import math
+import sys
+import tempfile
+from pathlib import Path
+
+from vyper.compiler.input_bundle import FilesystemInputBundle
+from vyper.compiler.phases import CompilerData
+from vyper.compiler.profiler import Profiler
+from vyper.compiler.settings import OptimizationLevel, Settings, anchor_settings
+
+EXAMPLES = [
+    *sorted(str(p) for p in Path("examples").rglob("*.vy") if p.parent.name != "basic"),
+    "examples/abstract/basic/__main__.vy",
+    "tests/functional/examples/thirdparty/curvefi/amm/stableswap/math/math_v_100.vy",
+    "tests/functional/examples/thirdparty/curvefi/amm/tricryptoswap/math/math_v_200.vy",
+    "tests/functional/examples/thirdparty/yearnfi/VaultV3.vy",
+]
+
+# phases which never take longer than this are left out of the exponents
+MIN_SECONDS = 0.02
+
+
+def functions(n: int) -> dict[str, str]:
+    lines = []
+    for i in range(n):
+        lines += [
+            "@external",
+            f"def f_{i}(x: uint256, y: DynArray[uint256, 8]) -> uint256:",
+            f"    acc: uint256 = x * {i + 3}",
+            "    for v: uint256 in y:",
+            f"        acc = (acc + v) % {i + 7919}",
+            f"    if acc > {i}:",
+            f"        acc -= {i}",
+            "    return acc",
+            "",
+        ]
+    return {"main.vy": "\n".join(lines)}
+
+
+def storage_vars(n: int) -> dict[str, str]:
+    lines = [f"v_{i}: public(uint256)" for i in range(n)]
+    lines += [f"m_{i}: HashMap[address, uint256]" for i in range(n)]
+    lines += ["", "@external", "def touch(x: uint256) -> uint256:", "    acc: uint256 = 0"]
+    for i in range(n):
+        lines.append(f"    self.v_{i} = x + {i}")
+        lines.append(f"    self.m_{i}[msg.sender] += self.v_{i}")
+        lines.append(f"    acc += self.m_{i}[msg.sender]")
+    lines += ["    return acc", ""]
+    return {"main.vy": "\n".join(lines)}
+
+
+def import_tree(n: int) -> dict[str, str]:
+    # a chain of modules, each of which uses the previous one
+    files = {}
+    for i in range(n):
+        lines = []
+        if i > 0:
+            lines += [f"import lib_{i - 1}", f"uses: lib_{i - 1}", ""]
+        lines += [
+            "counter: uint256",
+            "",
+            "@internal",
+            "def f(x: uint256) -> uint256:",
+            f"    self.counter += x + {i}",
+        ]
+        if i > 0:
+            lines.append(f"    return lib_{i - 1}.f(x + 1) * 2")
+        else:
+            lines.append("    return self.counter")
+        files[f"lib_{i}.vy"] = "\n".join(lines) + "\n"
+
+    lines = [f"import lib_{i}" for i in range(n)]
+    lines.append("initializes: lib_0")
+    lines += [f"initializes: lib_{i}[lib_{i - 1} := lib_{i - 1}]" for i in range(1, n)]
+    lines += ["", "@external", "def run(x: uint256) -> uint256:", f"    return lib_{n - 1}.f(x)"]
+    files["main.vy"] = "\n".join(lines) + "\n"
+    return files
+
+
+def constant_array(n: int) -> dict[str, str]:
+    values = ", ".join(str((i * 2654435761) % 2**32) for i in range(n))
+    source = f"""
+TABLE: constant(uint256[{n}]) = [{values}]
+
+@external
+def lookup(i: uint256) -> uint256:
+    return TABLE[i]
+
+@external
+def total() -> uint256:
+    acc: uint256 = 0
+    for v: uint256 in TABLE:
+        acc = unsafe_add(acc, v)
+    return acc
+"""
+    return {"main.vy": source}
+
+
+def nested_loops(n: int) -> dict[str, str]:
+    lines = ["@external", "def run(x: uint256) -> uint256:", "    acc: uint256 = x"]
+    for i in range(n):
+        indent = "    " * (i + 1)
+        lines.append(f"{indent}for i_{i}: uint256 in range(3):")
+        lines.append(f"{indent}    acc += i_{i} * {i + 1}")
+    indent = "    " * (n + 1)
+    lines.append(f"{indent}acc = acc % 65537")
+    lines.append("    return acc")
+    return {"main.vy": "\n".join(lines) + "\n"}
+
+
+GENERATORS = {
+    "functions": (functions, [16, 32, 64, 128]),
+    "storage_vars": (storage_vars, [16, 32, 64, 128]),
+    "import_tree": (import_tree, [4, 8, 16, 32]),
+    "constant_array": (constant_array, [64, 128, 256, 512]),
+    "nested_loops": (nested_loops, [2, 4, 8, 16]),
+}
+
+PIPELINES = {"legacy": False, "venom": True}
+
+
+def _flatten(profile: dict) -> tuple[dict, dict]:
+    """
+    Split a profile into the time of each top-level phase, and the time of
+    each Venom pass summed over the runtime and deploy code and over all
+    functions.
+    """
+    phases = {"total": profile["total"]["time"]}
+    passes: dict = {}
+
+    def add_passes(children):
+        for name, p in children.items():
+            passes[name] = passes.get(name, 0.0) + p["time"]
+
+    for name, phase in profile["total"].get("children", {}).items():
+        phases[name] = phase["time"]
+        if name not in ("venom_runtime", "venom_deploytime"):
+            continue
+        children = phase.get("children", {})
+        if "codegen" in children:
+            phases["venom_codegen"] = phases.get("venom_codegen", 0.0) + children["codegen"]["time"]
+        add_passes(children.get("global_passes", {}).get("children", {}))
+        for fn in children.get("function_passes", {}).get("children", {}).values():
+            add_passes(fn.get("children", {}))
+
+    return phases, passes
+
+
+def profile_compilation(path: Path, search_paths: list, settings: Settings) -> dict:
+    input_bundle = FilesystemInputBundle(search_paths)
+    compiler_data = CompilerData(input_bundle.load_file(path), input_bundle, settings=settings)
+
+    profiler = Profiler(trace_memory=False)
+    with profiler.profile():
+        # same order as `-f profile`, so every phase shows up at the top
+        # level. reading the settings parses the contract
+        with anchor_settings(compiler_data.settings):
+            _ = compiler_data.resolved_imports
+            _ = compiler_data.compilation_target
+            _ = compiler_data.storage_layout
+            if compiler_data.settings.experimental_codegen:
+                _ = compiler_data.venom_runtime
+            else:
+                _ = compiler_data.ir_nodes
+            _ = compiler_data.bytecode_runtime
+            _ = compiler_data.bytecode
+
+    return profiler.as_dict()
+
+
+def time_contract(path: Path, search_paths: list, settings: Settings, repeat: int) -> dict:
+    # keep the best time of each phase over the runs
+    phases: dict = {}
+    passes: dict = {}
+    for _ in range(repeat):
+        run_phases, run_passes = _flatten(profile_compilation(path, search_paths, settings))
+        for name, t in run_phases.items():
+            phases[name] = min(t, phases.get(name, math.inf))
+        for name, t in run_passes.items():
+            passes[name] = min(t, passes.get(name, math.inf))
+
+    def _round(d):
+        return {k: round(v, 4) for k, v in sorted(d.items())}
+
+    return {"phases": _round(phases), "venom_passes": _round(passes)}
+
+
+def warm_up(settings: Settings) -> None:
+    # compile a small contract without timing it, so that the backend
+    # modules which are imported lazily are already loaded
+    gen, sizes = GENERATORS["functions"]
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        for filename, source in gen(sizes[0]).items():
+            (root / filename).write_text(source)
+        profile_compilation(root / "main.vy", [root], settings)
+
+
+def scaling_exponent(sizes: list[int], times: list[float]) -> float:
+    # least squares fit of log(time) = k * log(size) + c
+    xs = [math.log(n) for n in sizes]
+    ys = [math.log(t) for t in times]
+    x_mean = sum(xs) / len(xs)
+    y_mean = sum(ys) / len(ys)
+    num = sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys))
+    den = sum((x - x_mean) ** 2 for x in xs)
+    return num / den
+
+
+def exponents(by_size: dict) -> dict:
+    ret = {}
+    runs = [(n, r) for n, r in by_size.items() if "error" not in r]
+    if len(runs) < 2:
+        return ret
+    for kind in ("phases", "venom_passes"):
+        names = set().union(*(r[kind].keys() for _, r in runs))
+        for name in sorted(names):
+            points = [(n, r[kind][name]) for n, r in runs if r[kind].get(name, 0) > 0]
+            if len(points) < 2 or max(t for _, t in points) < MIN_SECONDS:
+                continue
+            sizes, times = zip(*points)
+            key = name if kind == "phases" else f"venom_passes.{name}"
+            ret[key] = round(scaling_exponent(list(sizes), list(times)), 2)
+    return ret
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--generators", nargs="*", choices=list(GENERATORS), default=list(GENERATORS)
+    )
+    parser.add_argument("--pipelines", nargs="+", choices=list(PIPELINES), default=list(PIPELINES))
+    parser.add_argument("--scale", type=int, default=1, help="Multiply the generator sizes")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per contract (best is kept)")
+    parser.add_argument("--no-examples", action="store_true", help="Skip the example contracts")
+    parser.add_argument("-O", dest="opt_level", default="gas", help="Optimization level")
+    args = parser.parse_args()
+
+    opt_level = OptimizationLevel.from_string(args.opt_level)
+
+    def settings_for(pipeline):
+        return Settings(experimental_codegen=PIPELINES[pipeline], optimize=opt_level)
+
+    for pipeline in args.pipelines:
+        warm_up(settings_for(pipeline))
+
+    synthetic: dict = {}
+    for name in args.generators:
+        gen, sizes = GENERATORS[name]
+        synthetic[name] = {}
+        for pipeline in args.pipelines:
+            by_size = {}
+            for n in (s * args.scale for s in sizes):
+                with tempfile.TemporaryDirectory() as tmp:
+                    root = Path(tmp)
+                    for filename, source in gen(n).items():
+                        (root / filename).write_text(source)
+                    try:
+                        by_size[n] = time_contract(
+                            root / "main.vy", [root], settings_for(pipeline), args.repeat
+                        )
+                    except Exception as e:
+                        by_size[n] = {"error": f"{type(e).__name__}: {e}"}
+                total = by_size[n].get("phases", {}).get("total", by_size[n].get("error"))
+                print(f"{name}_{n} {pipeline}: {total}", file=sys.stderr)
+
+            synthetic[name][pipeline] = {
+                "sizes": {str(n): r for n, r in by_size.items()},
+                "exponents": exponents(by_size),
+            }
+            print(f"{name} {pipeline}: {synthetic[name][pipeline]['exponents']}", file=sys.stderr)
+
+    examples: dict = {}
+    if not args.no_examples:
+        for path in EXAMPLES:
+            examples[path] = {}
+            for pipeline in args.pipelines:
+                search_paths = [Path(path).parent, Path(".")]
+                try:
+                    result = time_contract(
+                        Path(path), search_paths, settings_for(pipeline), args.repeat
+                    )
+                except Exception as e:
+                    result = {"error": f"{type(e).__name__}: {e}"}
+                examples[path][pipeline] = result
+                total = result.get("phases", {}).get("total", result.get("error"))
+                print(f"{path} {pipeline}: {total}", file=sys.stderr)
+
+    result = {
+        "opt_level": args.opt_level,
+        "repeat": args.repeat,
+        "synthetic": synthetic,
+        "examples": examples,
+    }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Measure how the per-function Venom pass pipelines scale with `--venom-jobs`.
+
+The corpus consists of synthetic contracts with many internal functions,
+arranged as a binary call tree so that each level can be optimized in
+parallel. Only the Venom optimization of the runtime code is timed, and
+the outputs of all job counts are checked to be identical.
+
+Usage:
+    python .github/scripts/measure_fn_pass_scaling.py
+    python .github/scripts/measure_fn_pass_scaling.py --jobs 1,2,4,8 --sizes 63,127 -O O3
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from vyper.compiler.phases import CompilerData
+from vyper.compiler.settings import (
+    OptimizationLevel,
+    Settings,
+    VenomOptimizationFlags,
+    anchor_settings,
+)
+
+DEFAULT_SIZES = "31,63,127"
+DEFAULT_JOBS = "1,2,4"
+
+
+def call_tree(n: int) -> str:
+    # n internal functions, f_i calls f_{2i+1} and f_{2i+2}. each one is
+    # called from two places, which keeps the inliner from removing it.
+    lines = ["counter: public(uint256)", ""]
+    for i in reversed(range(n)):
+        lines.append("@internal")
+        lines.append(f"def f_{i}(x: uint256, y: DynArray[uint256, 8]) -> uint256:")
+        lines.append(f"    acc: uint256 = x * {i + 3}")
+        lines.append("    for v: uint256 in y:")
+        lines.append(f"        acc = (acc + v) % {i + 7919}")
+        lines.append(f"        self.counter += acc + {i}")
+        for child in (2 * i + 1, 2 * i + 2):
+            if child < n:
+                lines.append(f"    acc += self.f_{child}(acc, y)")
+                lines.append(f"    acc += self.f_{child}(acc + 1, y)")
+        lines.append("    return acc")
+        lines.append("")
+    lines.append("@external")
+    lines.append("def run(x: uint256, y: DynArray[uint256, 8]) -> uint256:")
+    lines.append("    return self.f_0(x, y) + self.f_0(x + 1, y)")
+    return "\n".join(lines) + "\n"
+
+
+def time_fn_passes(source: str, opt_level: OptimizationLevel, jobs: int) -> tuple[float, str]:
+    flags = VenomOptimizationFlags(level=opt_level, fn_pass_jobs=jobs)
+    settings = Settings(experimental_codegen=True, optimize=opt_level, venom_flags=flags)
+    compiler_data = CompilerData(source, settings=settings)
+    # run the frontend outside of the timed region
+    _ = compiler_data.global_ctx
+    with anchor_settings(compiler_data.settings):
+        t0 = time.perf_counter()
+        ctx = compiler_data.venom_runtime
+        elapsed = time.perf_counter() - t0
+    return elapsed, str(ctx)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated function counts")
+    parser.add_argument("--jobs", default=DEFAULT_JOBS, help="Comma-separated job counts")
+    parser.add_argument("-O", dest="opt_level", default="O3", help="Optimization level")
+    args = parser.parse_args()
+
+    opt_level = OptimizationLevel.from_string(args.opt_level)
+    sizes = [int(s) for s in args.sizes.split(",")]
+    job_counts = [int(j) for j in args.jobs.split(",")]
+
+    results = {}
+    for n in sizes:
+        source = call_tree(n)
+        timings = {}
+        outputs = set()
+        for jobs in job_counts:
+            elapsed, output = time_fn_passes(source, opt_level, jobs)
+            timings[jobs] = round(elapsed, 3)
+            outputs.add(output)
+        base = timings[job_counts[0]]
+        results[f"call_tree_{n}"] = {
+            "seconds": timings,
+            "speedup": {jobs: round(base / t, 2) for jobs, t in timings.items()},
+            "identical": len(outputs) == 1,
+        }
+        print(f"call_tree_{n}: {results[f'call_tree_{n}']}", file=sys.stderr)
+
+    print(json.dumps({"contracts": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Measure the time it takes to import the compiler and its command line
+interface, with `python -X importtime`.
+
+The backend (Venom, the legacy IR, the assembler) is only imported once an
+output format needs it, so importing the cli should stay well below the
+time it takes when everything is imported eagerly (~0.8s on a slow
+machine, vs ~0.3s lazily). The best of `--repeat` runs in a fresh
+interpreter is reported for each module, in milliseconds. With
+`--budget`, exits with a nonzero status if any module takes longer.
+
+Wall-clock times are sensitive to load on the machine, so this should not
+be run next to a parallel test suite.
+
+Usage:
+    PYTHONPATH=. python .github/scripts/measure_import_time.py
+    PYTHONPATH=. python .github/scripts/measure_import_time.py --budget 600 --repeat 5
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+MODULES = ["vyper", "vyper.cli.vyper_compile"]
+
+
+def importtime(module: str) -> dict[str, int]:
+    # run `python -X importtime` and return the cumulative import time of
+    # every module which was imported, in microseconds
+    res = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    ret = {}
+    for line in res.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header
+        ret[name.strip()] = int(cumulative)
+    return ret
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--modules", nargs="+", default=MODULES)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per module (best is kept)")
+    parser.add_argument(
+        "--budget", type=float, default=None, help="Fail if an import takes longer (in ms)"
+    )
+    args = parser.parse_args()
+
+    result = {}
+    for module in args.modules:
+        best = min(importtime(module)[module] for _ in range(args.repeat))
+        result[module] = round(best / 1000, 1)
+        print(f"{module}: {result[module]}ms", file=sys.stderr)
+
+    print(json.dumps(result, indent=2))
+
+    if args.budget is not None:
+        over = [m for m, t in result.items() if t > args.budget]
+        if over:
+            print(f"over the budget of {args.budget}ms: {', '.join(over)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
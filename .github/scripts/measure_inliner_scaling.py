@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Measure how the Venom function inliner scales with the number of functions.
+
+The corpus is synthetic Venom IR: `n` functions arranged as a binary call
+tree, each called from exactly one place, so that every one of them gets
+inlined. Each function also calls a shared helper which is too large to be
+inlined, so the call graph keeps some functions with many call sites. Only
+`FunctionInlinerPass` is timed.
+
+Usage:
+    python .github/scripts/measure_inliner_scaling.py
+    python .github/scripts/measure_inliner_scaling.py --sizes 100,200,400 --body 40
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from vyper.compiler.settings import OptimizationLevel, VenomOptimizationFlags
+from vyper.venom.analysis import IRAnalysesCache
+from vyper.venom.parser import parse_venom
+from vyper.venom.passes import FunctionInlinerPass
+
+DEFAULT_SIZES = "50,100,200,400"
+
+
+def _body(prefix: str, n_instructions: int) -> list[str]:
+    lines = [f"    %{prefix}0 = add %x, 1"]
+    for j in range(1, n_instructions):
+        lines.append(f"    %{prefix}{j} = mul %{prefix}{j - 1}, {j + 2}")
+    return lines
+
+
+def call_tree(n: int, n_instructions: int) -> str:
+    lines = ["function main {", "main:", "    %p = source", "    %r = invoke @f_0, %p"]
+    lines += ["    sink %r", "}", ""]
+
+    # called from every function, and too large to be inlined
+    lines += ["function helper {", "helper:", "    %x = param", "    %retpc = param"]
+    lines += _body("h", 4 * n_instructions)
+    lines += [f"    ret %h{4 * n_instructions - 1}, %retpc", "}", ""]
+
+    for i in range(n):
+        lines += [f"function f_{i} {{", f"f_{i}:", "    %x = param", "    %retpc = param"]
+        lines += _body("a", n_instructions)
+        acc = f"%a{n_instructions - 1}"
+        lines.append(f"    %s = invoke @helper, {acc}")
+        acc = "%s"
+        for child in (2 * i + 1, 2 * i + 2):
+            if child < n:
+                lines.append(f"    %c{child} = invoke @f_{child}, {acc}")
+                acc = f"%c{child}"
+        lines += [f"    ret {acc}, %retpc", "}", ""]
+
+    return "\n".join(lines)
+
+
+def time_inliner(source: str) -> float:
+    ctx = parse_venom(source)
+    analyses = {fn: IRAnalysesCache(fn) for fn in ctx.functions.values()}
+    flags = VenomOptimizationFlags(level=OptimizationLevel.GAS)
+    t0 = time.perf_counter()
+    FunctionInlinerPass(analyses, ctx, flags).run_pass()
+    elapsed = time.perf_counter() - t0
+    # everything but `main` and `helper` got inlined
+    assert len(ctx.functions) == 2, len(ctx.functions)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated function counts")
+    parser.add_argument("--body", type=int, default=20, help="Instructions per function")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of timed runs")
+    args = parser.parse_args()
+
+    results = {}
+    for n in (int(s) for s in args.sizes.split(",")):
+        source = call_tree(n, args.body)
+        timings = [time_inliner(source) for _ in range(args.repeat)]
+        results[f"call_tree_{n}"] = {"seconds": round(min(timings), 3)}
+        print(f"call_tree_{n}: {results[f'call_tree_{n}']}", file=sys.stderr)
+
+    print(json.dumps({"inliner": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Measure the gas used by loops in the example contracts, with and without
+loop-invariant code motion.
+
+Each scenario deploys an example contract and runs a fixed sequence of
+calls which exercise its loops. The gas used by every call is reported for
+both builds, together with the runtime code size.
+
+Must be run from the repository root, since it uses the test EVM backends.
+
+Usage:
+    PYTHONPATH=. python .github/scripts/measure_loop_gas.py
+    PYTHONPATH=. python .github/scripts/measure_loop_gas.py -O O3
+"""
+
+import argparse
+import json
+import sys
+from random import Random
+
+from eth_keys.datatypes import PrivateKey
+
+from tests.evm_backends.revm_env import RevmEnv
+from vyper.compiler import compile_code
+from vyper.compiler.settings import OptimizationLevel, Settings, VenomOptimizationFlags
+
+STABLESWAP_MATH = "tests/functional/examples/thirdparty/curvefi/amm/stableswap/math/math_v_100.vy"
+
+
+def _mk_env() -> RevmEnv:
+    random = Random(b"vyper")
+    keys = [PrivateKey(random.randbytes(32)) for _ in range(10)]
+    return RevmEnv(
+        gas_limit=10**10,
+        account_keys=keys,
+        tracing=False,
+        block_number=1,
+        evm_version="prague",
+        exporter=None,
+    )
+
+
+def erc1155(env, deploy):
+    c = deploy("examples/tokens/ERC1155ownable.vy", "Token", "TKN", "https://x/", "https://y/")
+    owner = env.deployer
+    receiver = env.accounts[1]
+    ids = list(range(1, 17))
+    amounts = [10] * len(ids)
+    yield "mintBatch", lambda: c.mintBatch(receiver, ids, amounts, sender=owner)
+    yield "balanceOfBatch", lambda: c.balanceOfBatch([receiver] * len(ids), ids)
+    yield "safeBatchTransferFrom", lambda: c.safeBatchTransferFrom(
+        receiver, owner, ids, [1] * len(ids), b"\x00" * 32, sender=receiver
+    )
+
+
+def ballot(env, deploy):
+    c = deploy("examples/voting/ballot.vy", [b"a" * 32, b"b" * 32])
+    voters = env.accounts[1:6]
+    for voter in voters:
+        c.giveRightToVote(voter)
+    # a delegation chain, which is followed by `_forwardWeight`
+    yield "delegate", lambda: c.delegate(voters[1], sender=voters[0])
+    yield "delegate_chain", lambda: c.delegate(voters[2], sender=voters[1])
+    yield "vote", lambda: c.vote(1, sender=voters[2])
+    yield "winningProposal", lambda: c.winningProposal()
+
+
+def stableswap_math(env, deploy):
+    c = deploy(STABLESWAP_MATH)
+    xp = [10**24 + i * 10**21 for i in range(4)]
+    yield "get_D", lambda: c.get_D(xp, 2000 * 100, 4)
+    d = c.get_D(xp, 2000 * 100, 4)
+    yield "get_y", lambda: c.get_y(0, 1, xp[0] + 10**22, xp, 2000 * 100, d, 4)
+    yield "get_y_D", lambda: c.get_y_D(2000 * 100, 0, xp, d - 10**21, 4)
+
+
+SCENARIOS = {"ERC1155ownable": erc1155, "ballot": ballot, "stableswap_math": stableswap_math}
+
+
+def run_scenario(scenario, settings: Settings) -> dict:
+    env = _mk_env()
+    sizes = []
+
+    def deploy(path, *args):
+        with open(path) as f:
+            source = f.read()
+        out = compile_code(
+            source,
+            contract_path=path,
+            settings=settings,
+            output_formats=["abi", "bytecode", "bytecode_runtime"],
+        )
+        sizes.append(len(bytes.fromhex(out["bytecode_runtime"].removeprefix("0x"))))
+        bytecode = bytes.fromhex(out["bytecode"].removeprefix("0x"))
+        return env.deploy(out["abi"], bytecode, *args)
+
+    gas = {}
+    for name, call in scenario(env, deploy):
+        call()
+        gas[name] = env.last_result.gas_used
+    return {"gas": gas, "code_size": sum(sizes)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-O", dest="opt_level", default="gas", help="Optimization level")
+    args = parser.parse_args()
+    opt_level = OptimizationLevel.from_string(args.opt_level)
+
+    results = {}
+    for name, scenario in SCENARIOS.items():
+        runs = {}
+        for label, disable_licm in (("no_licm", True), ("licm", False)):
+            flags = VenomOptimizationFlags(level=opt_level, disable_licm=disable_licm)
+            settings = Settings(experimental_codegen=True, optimize=opt_level, venom_flags=flags)
+            runs[label] = run_scenario(scenario, settings)
+
+        base, head = runs["no_licm"], runs["licm"]
+        results[name] = {
+            "gas": {
+                call: {"no_licm": gas, "licm": head["gas"][call], "delta": head["gas"][call] - gas}
+                for call, gas in base["gas"].items()
+            },
+            "code_size": {
+                "no_licm": base["code_size"],
+                "licm": head["code_size"],
+                "delta": head["code_size"] - base["code_size"],
+            },
+        }
+        print(f"{name}: {results[name]}", file=sys.stderr)
+
+    print(json.dumps({"scenarios": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Measure the time spent in semantic analysis of a large multi-module project.
+
+The project is synthetic: a number of library modules, each of which
+defines structs, storage variables and functions over arrays, hashmaps and
+bytestrings, and imports the previous library. The main contract
+initializes all of the libraries and calls into them. Parsing and import
+resolution are done outside of the timed region, only `analyze_modules` is
+timed.
+
+Usage:
+    python .github/scripts/measure_semantic_analysis.py
+    python .github/scripts/measure_semantic_analysis.py --modules 40 --functions 20 --repeat 5
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from vyper.compiler.input_bundle import FilesystemInputBundle
+from vyper.compiler.phases import CompilerData
+from vyper.semantics.analysis.module import analyze_modules
+
+
+def library(i: int, n_functions: int) -> str:
+    lines = []
+    if i > 0:
+        lines += [f"import lib_{i - 1}", f"uses: lib_{i - 1}", ""]
+    lines += [
+        f"struct Point_{i}:",
+        "    x: uint256",
+        "    y: int128",
+        "    tag: bytes32",
+        "",
+        f"points: HashMap[address, HashMap[uint256, Point_{i}]]",
+        "balances: HashMap[address, uint256]",
+        "history: DynArray[uint256, 64]",
+        "names: HashMap[bytes32, String[96]]",
+        "",
+    ]
+    for j in range(n_functions):
+        lines += [
+            "@internal",
+            f"def f_{j}(a: address, xs: DynArray[uint256, 16], s: Bytes[64]) -> uint256:",
+            f"    acc: uint256 = {j}",
+            "    for x: uint256 in xs:",
+            f"        p: Point_{i} = self.points[a][x]",
+            "        acc += p.x * x + convert(p.y, uint256) % 7",
+            "        if p.tag == keccak256(s):",
+            "            acc = acc // 2 + len(s)",
+            "    fixed: uint256[4] = [acc, acc + 1, acc * 3, unsafe_sub(acc, 1)]",
+            "    for k: uint256 in range(4):",
+            "        acc = max(acc, fixed[k]) + min(fixed[k], 10)",
+            "    self.balances[a] += acc",
+            "    self.history.append(acc)",
+            f'    self.names[keccak256(s)] = concat("f_{j}", uint2str(acc % 1000))',
+        ]
+        if i > 0:
+            lines.append(f"    acc += lib_{i - 1}.f_{j}(a, xs, s)")
+        lines += ["    return acc", ""]
+    return "\n".join(lines)
+
+
+def main_contract(n_modules: int, n_functions: int) -> str:
+    lines = [f"import lib_{i}" for i in range(n_modules)]
+    lines.append("")
+    lines.append("initializes: lib_0")
+    for i in range(1, n_modules):
+        lines.append(f"initializes: lib_{i}[lib_{i - 1} := lib_{i - 1}]")
+    lines += [
+        "",
+        "@external",
+        "def run(a: address, xs: DynArray[uint256, 16], s: Bytes[64]) -> uint256:",
+        "    acc: uint256 = 0",
+    ]
+    for i in range(n_modules):
+        for j in range(0, n_functions, 4):
+            lines.append(f"    acc += lib_{i}.f_{j}(a, xs, s)")
+    lines += ["    return acc", ""]
+    return "\n".join(lines)
+
+
+def write_project(root: Path, n_modules: int, n_functions: int) -> Path:
+    for i in range(n_modules):
+        (root / f"lib_{i}.vy").write_text(library(i, n_functions))
+    main = root / "main.vy"
+    main.write_text(main_contract(n_modules, n_functions))
+    return main
+
+
+def time_analysis(root: Path, main: Path) -> float:
+    input_bundle = FilesystemInputBundle([root])
+    compiler_data = CompilerData(input_bundle.load_file(main), input_bundle)
+    # parse all of the modules outside of the timed region
+    imports = compiler_data.resolved_imports
+    t0 = time.process_time()
+    analyze_modules(imports)
+    return time.process_time() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--modules", type=int, default=24, help="Number of library modules")
+    parser.add_argument("--functions", type=int, default=16, help="Functions per module")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of timed runs")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        main_path = write_project(root, args.modules, args.functions)
+        timings = []
+        for _ in range(args.repeat):
+            timings.append(time_analysis(root, main_path))
+            print(f"analysis: {timings[-1]:.3f}s", file=sys.stderr)
+
+    result = {
+        "modules": args.modules,
+        "functions_per_module": args.functions,
+        "seconds": [round(t, 3) for t in timings],
+        "best": round(min(timings), 3),
+    }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -67,6 +67,8 @@ def output_formats():
     output_formats = compiler.OUTPUT_FORMATS.copy()
 
     to_drop = ("cfg", "cfg_runtime", "archive", "archive_b64", "solc_json")
+    # instrumented outputs, which compile the contract a second time
+    to_drop += ("profile", "venom_pass_stats")
     for s in to_drop:
         del output_formats[s]
 
@@ -4,6 +4,10 @@ from hypothesis import given, settings
 
 import vyper.utils as utils
 from vyper.codegen.jumptable_utils import (
+    MAX_MAGIC,
+    _FindMagicFailure,
+    _image_of,
+    find_magic_for,
     generate_dense_jumptable_info,
     generate_sparse_jumptable_buckets,
 )
@@ -478,6 +482,27 @@ def test_dense_jumptable_bucket_size(n_methods, seed):
     assert n_buckets / n < 0.4 or n < 10
 
 
+def _find_magic_scalar(xs):
+    for m in range(MAX_MAGIC):
+        test = _image_of(xs, m)
+        if len(test) == len(set(test)):
+            return m
+    return None
+
+
+@given(xs=st.lists(st.integers(min_value=0, max_value=2**32 - 1), min_size=1, max_size=10))
+@pytest.mark.fuzzing
+@settings(max_examples=50)
+def test_find_magic_matches_scalar_search(xs):
+    # the batched search finds the same (smallest) magic
+    expected = _find_magic_scalar(xs)
+    if expected is None:
+        with pytest.raises(_FindMagicFailure):
+            find_magic_for(xs)
+    else:
+        assert find_magic_for(xs) == expected
+
+
 @st.composite
 def generate_methods(draw, max_calldata_bytes):
     max_default_args = draw(st.integers(min_value=0, max_value=4))
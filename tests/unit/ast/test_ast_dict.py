@@ -6,6 +6,7 @@ from vyper import compiler
 from vyper.ast.nodes import NODE_SRC_ATTRIBUTES
 from vyper.ast.parse import parse_to_ast
 from vyper.ast.utils import ast_to_dict, dict_to_ast
+from vyper.compiler.phases import CompilerData
 
 
 def get_node_ids(ast_struct, ids=None):
@@ -2115,3 +2116,34 @@ def foo():
     for key in keys:
         assert lib1_ast[key] == lib1_import_ast[key]
         assert lib2_ast[key] == lib2_import_ast[key]
+
+
+def test_ast_dict_not_annotated():
+    code = """
+x: uint256
+
+@external
+def foo(a: uint256) -> uint256:
+    return self.x + a
+    """
+    # request the unannotated ast after analysis has run
+    out = compiler.compile_code(code, output_formats=["bytecode", "ast_dict", "annotated_ast_dict"])
+
+    expected = compiler.compile_code(code, output_formats=["ast_dict"])
+    assert out["ast_dict"] == expected["ast_dict"]
+    assert "type" not in out["ast_dict"]["ast"]["body"][0]
+    assert "type" in out["annotated_ast_dict"]["ast"]["body"][0]
+
+
+def test_compile_does_not_copy_ast():
+    code = """
+@external
+def foo() -> uint256:
+    return 1
+    """
+    compiler_data = CompilerData(code)
+    _ = compiler_data.bytecode
+
+    # the unannotated module is only materialized for `-f ast`
+    assert "vyper_module" not in compiler_data.__dict__
+    assert compiler_data.vyper_module is not compiler_data.annotated_vyper_module
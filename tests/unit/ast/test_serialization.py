@@ -0,0 +1,55 @@
+import pickle
+
+import pytest
+
+from vyper.ast import parse_to_ast, serialization
+from vyper.ast.utils import ast_to_dict
+
+SOURCE = """
+struct Foo:
+    a: uint256
+    b: DynArray[address, 3]
+
+x: public(HashMap[address, Foo])
+
+@external
+def foo(y: uint256) -> uint256:
+    for i: uint256 in range(10):
+        y += i * -3
+    return y
+"""
+
+
+def test_roundtrip():
+    module = parse_to_ast(SOURCE, source_id=3, resolved_path="foo.vy")
+    data = serialization.dumps(module)
+    assert data.startswith(serialization.MAGIC)
+
+    ret = serialization.loads(data)
+    assert ret is not module
+    assert ast_to_dict(ret) == ast_to_dict(module)
+    assert ret.settings == module.settings
+
+
+def test_smaller_than_pickle():
+    module = parse_to_ast(SOURCE)
+    assert len(serialization.dumps(module)) < len(pickle.dumps(module))
+
+
+@pytest.mark.parametrize(
+    "mutate",
+    [
+        lambda data: data[:3],
+        lambda data: b"XXXX" + data[4:],
+        # format version
+        lambda data: data[:4] + b"\xff\xff" + data[6:],
+        # compiler version
+        lambda data: data[:8] + b"x" + data[9:],
+        # payload
+        lambda data: data[:-10],
+    ],
+)
+def test_rejects_invalid_data(mutate):
+    data = serialization.dumps(parse_to_ast(SOURCE))
+    with pytest.raises(ValueError):
+        serialization.loads(mutate(data))
@@ -0,0 +1,64 @@
+import subprocess
+import sys
+
+# the backend is only imported once an output format needs it
+BACKEND_MODULES = ("vyper.codegen_venom", "vyper.venom", "vyper.ir", "vyper.evm.assembler")
+
+# how many vyper modules `import vyper.cli.vyper_compile` may load (60 at
+# the time of writing). the wall time of the import is too noisy to test,
+# the number of modules is a deterministic proxy for it. raise the budget
+# if a new module really has to be imported up front.
+CLI_MODULE_BUDGET = 64
+
+
+def _importtime(code: str) -> dict[str, int]:
+    # run `python -X importtime` and return the cumulative import time
+    # of every module which was imported
+    res = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True
+    )
+    ret = {}
+    for line in res.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header
+        ret[module.strip()] = int(cumulative)
+    return ret
+
+
+def _backend_modules(modules):
+    return [m for m in modules if m.startswith(BACKEND_MODULES) or m == "vyper.codegen.ir_node"]
+
+
+def test_cli_import_is_lazy():
+    modules = _importtime("import vyper.cli.vyper_compile")
+
+    assert _backend_modules(modules) == []
+    assert "vyper.compiler.phases" in modules
+
+
+def test_cli_import_budget():
+    modules = _importtime("import vyper.cli.vyper_compile")
+
+    vyper_modules = [m for m in modules if m == "vyper" or m.startswith("vyper.")]
+    assert len(vyper_modules) <= CLI_MODULE_BUDGET, vyper_modules
+
+
+def _modules_after_compile(output_formats):
+    code = f"""
+import sys
+from vyper.compiler import compile_code
+
+compile_code("x: public(uint256)", output_formats={output_formats!r})
+print(",".join(sys.modules))
+    """
+    res = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return res.stdout.strip().split(",")
+
+
+def test_frontend_outputs_do_not_import_backend():
+    formats = ["abi", "method_identifiers", "layout", "interface", "external_interface", "devdoc"]
+    modules = _modules_after_compile(formats)
+    assert [m for m in modules if m.startswith(BACKEND_MODULES)] == []
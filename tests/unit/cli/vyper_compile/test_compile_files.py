@@ -730,3 +730,31 @@ def baz() -> uint8:
             continue
         with pytest.raises(ValueError):
             compile_files([file], [f])
+
+
+def test_compile_files_parallel(input_files, make_file):
+    tmpdir, _, _, _, contract_file, _ = input_files
+    search_paths = [".", tmpdir]
+
+    archive_path = Path("foo.zip")
+    out = compile_files([contract_file], ["archive"], paths=search_paths)
+    archive_path.write_bytes(out[contract_file]["archive"])
+
+    other_file = make_file("other.vy", "import lib\n\n@external\ndef baz():\n    lib.foo()\n")
+    files = [contract_file, archive_path, other_file]
+    formats = ["bytecode", "abi", "source_map", "layout", "ast"]
+
+    expected = compile_files(files, formats, paths=search_paths)
+    out = compile_files(files, formats, paths=search_paths, jobs=2)
+
+    # output and its ordering is the same as for a serial run
+    assert list(out.keys()) == list(expected.keys())
+    assert out == expected
+
+
+def test_compile_files_parallel_error(make_file, chdir_tmp_path):
+    good = make_file("good.vy", "@external\ndef foo():\n    pass\n")
+    bad = make_file("bad.vy", "@external\ndef foo() -> uint256:\n    return -1\n")
+
+    with pytest.raises(TypeMismatch):
+        compile_files([good, bad], ["bytecode"], jobs=2)
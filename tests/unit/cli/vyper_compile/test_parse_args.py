@@ -1,10 +1,11 @@
+import json
 import os
 import warnings
 
 import pytest
 
 import vyper
-from vyper.cli.vyper_compile import _parse_args
+from vyper.cli.vyper_compile import _parse_args, compile_files
 from vyper.warnings import VyperWarning
 
 
@@ -69,3 +70,25 @@ def test_version(capsys):
     assert exc_info.value.code == 0
     captured = capsys.readouterr()
     assert vyper.__long_version__ in captured.out
+
+
+def test_streamed_outputs(make_file, tmp_path):
+    code = """
+x: public(uint256)
+
+@external
+def foo(a: uint256) -> uint256:
+    if a > 10:
+        return self.x
+    return a
+    """
+    path = make_file("foo.vy", code)
+    formats = "asm,source_map,abi,asm_runtime,source_map_runtime"
+
+    # the asm and the source maps are written straight from the assembly
+    output_path = tmp_path / "out.txt"
+    _parse_args([str(path), "-f", formats, "-o", str(output_path)])
+
+    (outputs,) = compile_files([str(path)], tuple(formats.split(","))).values()
+    expected = [json.dumps(v) if isinstance(v, (list, dict)) else v for v in outputs.values()]
+    assert output_path.read_text() == "\n".join(expected) + "\n"
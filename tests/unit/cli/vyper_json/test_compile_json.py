@@ -154,6 +154,7 @@ def test_compile_json(input_json, input_bundle, experimental_codegen):
     if not experimental_codegen:
         output_formats.pop("cfg", None)
         output_formats.pop("cfg_runtime", None)
+        output_formats.pop("venom_pass_stats", None)
     foo = compile_from_file_input(
         foo_input,
         output_formats=output_formats,
@@ -441,6 +442,20 @@ def call_foo(amount: uint256, account: address) -> uint256:
     assert 'subgraph "internal 0 _foo(uint256,address)_runtime"' in venom["cfg_runtime"]
 
 
+def test_compile_json_venom_pass_stats(input_json):
+    input_json["settings"]["experimentalCodegen"] = True
+    input_json["settings"]["outputSelection"] = {"contracts/foo.vy": ["venom_pass_stats"]}
+    output_json = compile_json(input_json)
+
+    venom = output_json["contracts"]["contracts/foo.vy"]["foo"]["venom"]
+    assert set(venom["pass_stats"].keys()) == {"runtime", "deploy"}
+
+    # not included in the wildcard selection
+    input_json["settings"]["outputSelection"] = {"*": ["*"]}
+    output_json = compile_json(input_json)
+    assert "pass_stats" not in output_json["contracts"]["contracts/foo.vy"]["foo"]["venom"]
+
+
 def test_compile_json_without_experimental_codegen():
     code = {
         "language": "Vyper",
@@ -476,3 +491,73 @@ def test_compile_json_with_both_venom_aliases():
     with pytest.raises(JSONError) as e:
         get_settings(code)
     assert e.value.args[0] == "both experimentalCodegen and venomExperimental cannot be set"
+
+
+def test_compile_json_parallel(input_json):
+    expected = compile_json(input_json)
+
+    input_json["settings"]["jobs"] = 2
+    out = compile_json(input_json)
+
+    assert list(out["contracts"].keys()) == list(expected["contracts"].keys())
+    assert out == expected
+
+
+def test_compile_json_parallel_error(input_json):
+    input_json["sources"]["badcode.vy"] = {"content": BAD_COMPILER_CODE}
+    input_json["settings"]["jobs"] = 2
+
+    with pytest.raises(TypeMismatch):
+        compile_json(input_json)
+
+    result = compile_json(input_json, exc_handler_to_dict)
+    assert len(result["errors"]) == 1
+    assert result["errors"][0]["type"] == "TypeMismatch"
+
+
+@pytest.mark.parametrize("jobs", [0, -1, "2", True])
+def test_compile_json_invalid_jobs(input_json, jobs):
+    input_json["settings"]["jobs"] = jobs
+    with pytest.raises(JSONError):
+        compile_json(input_json)
+
+
+def test_compile_json_profile(input_json):
+    input_json["settings"]["profile"] = True
+    output_json = compile_json(input_json)
+
+    for path in ("contracts/foo.vy", "contracts/bar.vy", "contracts/library.vy"):
+        contract = output_json["contracts"][path]
+        (name,) = contract.keys()
+        phases = contract[name]["profile"]["total"]["children"]
+        assert "semantic_analysis" in phases
+        assert "bytecode" in phases
+
+
+def test_compile_json_invalid_profile(input_json):
+    input_json["settings"]["profile"] = "yes"
+    with pytest.raises(JSONError):
+        compile_json(input_json)
+
+
+def test_compile_json_parses_imports_once(input_json, monkeypatch):
+    parsed = []
+    parse_to_ast = vyper.ast.parse_to_ast
+
+    def counting_parse_to_ast(source_code, *args, **kwargs):
+        parsed.append(kwargs["resolved_path"])
+        return parse_to_ast(source_code, *args, **kwargs)
+
+    monkeypatch.setattr(vyper.ast, "parse_to_ast", counting_parse_to_ast)
+
+    # several targets importing the same library
+    for i in range(3):
+        source = f"import contracts.library as library\n\nx{i}: uint256\n"
+        input_json["sources"][f"contracts/user{i}.vy"] = {"content": source}
+
+    compile_json(input_json)
+
+    # every module is parsed exactly once, regardless of how many
+    # targets import it
+    assert sorted(parsed) == sorted(set(parsed))
+    assert "contracts/library.vy" in parsed
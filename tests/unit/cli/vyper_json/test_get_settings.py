@@ -41,3 +41,13 @@ def test_experimental_codegen_settings():
 
     input_json = {"settings": {"experimentalCodegen": False}}
     assert get_settings(input_json).experimental_codegen is False
+
+
+def test_execution_profile_settings():
+    profile = {"version": 2, "functions": {"internal 0 foo()_runtime": 10}}
+    input_json = {"settings": {"venom": {"executionProfile": profile}}}
+    assert get_settings(input_json).venom_flags.execution_profile == profile
+
+    input_json = {"settings": {"venom": {"executionProfile": {"version": 1}}}}
+    with pytest.raises(JSONError, match="unsupported profile version"):
+        get_settings(input_json)
@@ -3,7 +3,7 @@ from pathlib import PurePath
 import pytest
 
 from vyper import compiler
-from vyper.cli.vyper_json import TRANSLATE_MAP, VENOM_KEYS, get_output_formats
+from vyper.cli.vyper_json import NON_WILDCARD_KEYS, TRANSLATE_MAP, VENOM_KEYS, get_output_formats
 from vyper.exceptions import JSONError
 
 
@@ -33,7 +33,7 @@ def test_translate_map(output):
         "sources": {"foo.vy": ""},
         "settings": {"outputSelection": {"foo.vy": [output[0]]}},
     }
-    if output[0] in ["cfg", "cfg_runtime"]:
+    if output[0] in VENOM_KEYS:
         with pytest.raises(JSONError, match="experimentalCodegen not selected!"):
             _ = get_output_formats(input_json)
     else:
@@ -69,7 +69,7 @@ def test_star_with_venom_flag():
         "sources": {"foo.vy": "", "bar.vy": ""},
         "settings": {"venomExperimental": True, "outputSelection": {"*": ["*"]}},
     }
-    translate_map = set(TRANSLATE_MAP.values())
+    translate_map = set(TRANSLATE_MAP.values()) - set(NON_WILDCARD_KEYS)
     expected = sorted(translate_map)
     result = get_output_formats(input_json)
     assert result == {PurePath("foo.vy"): expected, PurePath("bar.vy"): expected}
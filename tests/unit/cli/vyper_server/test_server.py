@@ -0,0 +1,136 @@
+import io
+import json
+import os
+import socket
+import threading
+
+from vyper.cli.vyper_json import compile_json
+from vyper.cli.vyper_server import (
+    INVALID_PARAMS,
+    INVALID_REQUEST,
+    METHOD_NOT_FOUND,
+    PARSE_ERROR,
+    CompilerServer,
+    serve_socket,
+    serve_stream,
+)
+
+CODE = """
+@external
+def foo() -> uint256:
+    return 1
+"""
+
+INPUT_JSON = {
+    "language": "Vyper",
+    "sources": {"contracts/foo.vy": {"content": CODE}},
+    "settings": {"outputSelection": {"*": ["abi", "evm.bytecode.object"]}},
+}
+
+
+def _request(request_id, method, params=None):
+    ret = {"jsonrpc": "2.0", "id": request_id, "method": method}
+    if params is not None:
+        ret["params"] = params
+    return ret
+
+
+def test_compile():
+    server = CompilerServer()
+    response = server.handle_request(_request(1, "compile", INPUT_JSON))
+
+    assert response["id"] == 1
+    result = response["result"]
+    assert result["output"] == compile_json(INPUT_JSON)
+    assert result["timing"]["compile"] <= result["timing"]["total"]
+
+
+def test_compile_error_output():
+    server = CompilerServer()
+    input_json = {**INPUT_JSON, "sources": {"foo.vy": {"content": "def foo(:"}}}
+    response = server.handle_request(_request(1, "compile", input_json))
+
+    # compilation errors are reported in the standard JSON output
+    errors = response["result"]["output"]["errors"]
+    assert errors[0]["type"] == "SyntaxException"
+
+
+def test_protocol_errors():
+    server = CompilerServer()
+
+    assert server.handle_line("{")["error"]["code"] == PARSE_ERROR
+    assert server.handle_request([])["error"]["code"] == INVALID_REQUEST
+    assert server.handle_request({"id": 1, "method": "version"})["error"]["code"] == INVALID_REQUEST
+
+    response = server.handle_request(_request(2, "foo"))
+    assert response["id"] == 2
+    assert response["error"]["code"] == METHOD_NOT_FOUND
+
+    response = server.handle_request(_request(3, "compile", ["foo"]))
+    assert response["error"]["code"] == INVALID_PARAMS
+
+
+def test_notification():
+    server = CompilerServer()
+    assert server.handle_request({"jsonrpc": "2.0", "method": "version"}) is None
+
+
+def test_serve_stream():
+    requests = [
+        _request(1, "version"),
+        _request(2, "compile", INPUT_JSON),
+        _request(3, "shutdown"),
+        # not served, the server already shut down
+        _request(4, "version"),
+    ]
+    fin = io.StringIO("\n".join(json.dumps(r) for r in requests) + "\n")
+    fout = io.StringIO()
+
+    serve_stream(CompilerServer(), fin, fout)
+
+    responses = [json.loads(line) for line in fout.getvalue().splitlines()]
+    assert [r["id"] for r in responses] == [1, 2, 3]
+    assert responses[1]["result"]["output"] == compile_json(INPUT_JSON)
+
+
+def _serve_and_shutdown(socket_path):
+    server = CompilerServer()
+
+    thread = threading.Thread(target=serve_socket, args=(server, socket_path))
+    thread.start()
+
+    # wait for the server to come up
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    for _ in range(100):
+        try:
+            client.connect(socket_path)
+            break
+        except (FileNotFoundError, ConnectionRefusedError):
+            thread.join(0.05)
+
+    with client, client.makefile("rw") as f:
+        for request in (_request(1, "compile", INPUT_JSON), _request(2, "shutdown")):
+            f.write(json.dumps(request) + "\n")
+            f.flush()
+            response = json.loads(f.readline())
+            assert response["id"] == request["id"]
+            assert "result" in response
+
+    thread.join(10)
+    assert not thread.is_alive()
+
+
+def test_serve_socket(tmp_path):
+    _serve_and_shutdown(str(tmp_path / "vyper.sock"))
+
+
+def test_serve_socket_stale_socket(tmp_path):
+    # the socket file left behind by a server which was killed
+    socket_path = str(tmp_path / "vyper.sock")
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(socket_path)
+    stale.close()
+    assert os.path.exists(socket_path)
+
+    _serve_and_shutdown(socket_path)
+    assert not os.path.exists(socket_path)
@@ -0,0 +1,299 @@
+import os
+import time
+import warnings
+from pathlib import Path
+
+import pytest
+
+from vyper import ast as vy_ast
+from vyper.cli.vyper_compile import compile_files
+from vyper.compiler import outputs_from_compiler_data
+from vyper.compiler.cache import CompilationCache
+from vyper.compiler.phases import CompilerData
+from vyper.compiler.settings import OptimizationLevel, Settings
+from vyper.warnings import EnumUsage, VyperWarning
+
+LIB = """
+x: uint256
+
+@internal
+def foo() -> uint256:
+    return self.x + 1
+"""
+
+MAIN = """
+import lib
+
+initializes: lib
+
+@external
+def bar() -> uint256:
+    return lib.foo()
+"""
+
+FORMATS = ["bytecode", "bytecode_runtime", "abi", "source_map", "layout"]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CompilationCache(tmp_path / "cache")
+
+
+def _compiler_data(input_bundle, settings=None):
+    file_input = input_bundle.load_file("main.vy")
+    return CompilerData(file_input, input_bundle, settings=settings)
+
+
+def test_cache_hit_skips_analysis(make_input_bundle, cache):
+    input_bundle = make_input_bundle({"lib.vy": LIB, "main.vy": MAIN})
+
+    expected = outputs_from_compiler_data(_compiler_data(input_bundle), FORMATS, cache=cache)
+
+    compiler_data = _compiler_data(input_bundle)
+    out = outputs_from_compiler_data(compiler_data, FORMATS, cache=cache)
+
+    assert out == expected
+    # a cache hit should not run semantic analysis or codegen
+    assert "_annotate" not in compiler_data.__dict__
+    assert "_bytecode" not in compiler_data.__dict__
+
+
+def test_cache_partial_hit(make_input_bundle, cache):
+    input_bundle = make_input_bundle({"lib.vy": LIB, "main.vy": MAIN})
+
+    outputs_from_compiler_data(_compiler_data(input_bundle), ["abi"], cache=cache)
+
+    compiler_data = _compiler_data(input_bundle)
+    out = outputs_from_compiler_data(compiler_data, ["abi", "bytecode"], cache=cache)
+    assert set(out.keys()) == {"abi", "bytecode"}
+
+    # both formats should now be served from the cache
+    compiler_data = _compiler_data(input_bundle)
+    assert outputs_from_compiler_data(compiler_data, ["abi", "bytecode"], cache=cache) == out
+    assert "_annotate" not in compiler_data.__dict__
+
+
+def test_cache_key_changes(make_input_bundle, make_file, cache):
+    input_bundle = make_input_bundle({"lib.vy": LIB, "main.vy": MAIN})
+    key = cache.get_key(_compiler_data(input_bundle))
+
+    settings = Settings(optimize=OptimizationLevel.CODESIZE)
+    assert cache.get_key(_compiler_data(input_bundle, settings)) != key
+
+    settings = Settings(evm_version="cancun")
+    assert cache.get_key(_compiler_data(input_bundle, settings)) != key
+
+    # changing an import invalidates the entry
+    make_file("lib.vy", LIB + "\ny: uint256\n")
+    assert cache.get_key(_compiler_data(input_bundle)) != key
+
+
+def test_cache_corrupted_entry(make_input_bundle, cache):
+    input_bundle = make_input_bundle({"lib.vy": LIB, "main.vy": MAIN})
+    expected = outputs_from_compiler_data(_compiler_data(input_bundle), FORMATS, cache=cache)
+
+    key = cache.get_key(_compiler_data(input_bundle))
+    cache._entry_path(key).write_bytes(b"garbage")
+
+    assert cache.load(key) == {}
+    out = outputs_from_compiler_data(_compiler_data(input_bundle), FORMATS, cache=cache)
+    assert out == expected
+
+
+def test_cache_dir_is_private(make_input_bundle, cache):
+    input_bundle = make_input_bundle({"lib.vy": LIB, "main.vy": MAIN})
+    outputs_from_compiler_data(_compiler_data(input_bundle), FORMATS, cache=cache)
+
+    key = cache.get_key(_compiler_data(input_bundle))
+    assert cache.cache_dir.stat().st_mode & 0o777 == 0o700
+    assert cache._entry_path(key).parent.stat().st_mode & 0o777 == 0o700
+    assert cache.load(key) != {}
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="no file ownership")
+def test_cache_ignores_untrusted_entries(make_input_bundle, cache, monkeypatch):
+    input_bundle = make_input_bundle({"lib.vy": LIB, "main.vy": MAIN})
+    outputs_from_compiler_data(_compiler_data(input_bundle), FORMATS, cache=cache)
+    key = cache.get_key(_compiler_data(input_bundle))
+    path = cache._entry_path(key)
+
+    # writable by other users
+    path.chmod(0o666)
+    assert cache.load(key) == {}
+    path.chmod(0o600)
+    assert cache.load(key) != {}
+
+    cache.cache_dir.chmod(0o777)
+    assert cache.load(key) == {}
+    cache.cache_dir.chmod(0o700)
+
+    # owned by another user
+    uid = os.getuid()
+    monkeypatch.setattr(os, "getuid", lambda: uid + 1)
+    assert cache.load(key) == {}
+
+
+def test_cache_replays_warnings(make_input_bundle, cache):
+    source = """
+@external
+def foo():
+    x: uint256 = block.difficulty
+    """
+    input_bundle = make_input_bundle({"main.vy": source})
+
+    for _ in range(2):
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            outputs_from_compiler_data(_compiler_data(input_bundle), ["bytecode"], cache=cache)
+        assert len(w) == 1
+        assert issubclass(w[0].category, VyperWarning)
+
+
+def test_module_cache_replays_parse_warnings(chdir_tmp_path, make_file, tmp_path):
+    make_file("lib.vy", "enum Action:\n    BUY\n    SELL\n")
+    make_file("main.vy", "import lib\n\nx: lib.Action\n")
+    cache_dir = tmp_path / "cache"
+
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter("always")
+        compile_files(["main.vy"], ["abi"], cache_dir=cache_dir)
+    assert any(issubclass(x.category, EnumUsage) for x in w)
+
+    # the outputs are not cached yet, but the parsed modules are
+    with pytest.raises(EnumUsage):
+        compile_files(["main.vy"], ["bytecode"], warnings_control="error", cache_dir=cache_dir)
+
+
+def test_cache_prune(tmp_path, make_input_bundle):
+    input_bundle = make_input_bundle({"lib.vy": LIB, "main.vy": MAIN})
+    cache = CompilationCache(tmp_path / "cache")
+
+    outputs_from_compiler_data(_compiler_data(input_bundle), FORMATS, cache=cache)
+    settings = Settings(optimize=OptimizationLevel.CODESIZE)
+    outputs_from_compiler_data(_compiler_data(input_bundle, settings), FORMATS, cache=cache)
+
+    old_key = cache.get_key(_compiler_data(input_bundle))
+    new_key = cache.get_key(_compiler_data(input_bundle, settings))
+    old_path = cache._entry_path(old_key)
+    new_path = cache._entry_path(new_key)
+
+    # make the first entry least recently used
+    t = time.time() - 60
+    os.utime(old_path, (t, t))
+
+    cache.prune()
+    assert old_path.exists() and new_path.exists()
+
+    # evict by size: only room for one entry
+    cache.max_size = new_path.stat().st_size
+    cache.prune()
+    assert not old_path.exists()
+    assert new_path.exists()
+
+    # evict by age
+    cache.max_age = 10
+    t = time.time() - 20
+    os.utime(new_path, (t, t))
+    cache.prune()
+    assert not new_path.exists()
+
+
+def test_compile_files_cache_dir(chdir_tmp_path, make_file, tmp_path):
+    make_file("lib.vy", LIB)
+    make_file("main.vy", MAIN)
+    cache_dir = tmp_path / "cache"
+
+    expected = compile_files(["main.vy"], FORMATS)
+    assert compile_files(["main.vy"], FORMATS, cache_dir=cache_dir) == expected
+    # one entry for the outputs, one for the dependencies and one for
+    # each parsed module
+    assert len(list(cache_dir.glob("*/*"))) == 4
+    assert compile_files(["main.vy"], FORMATS, cache_dir=cache_dir) == expected
+
+
+def test_unchanged_dependencies_skip_parsing(make_input_bundle, cache):
+    input_bundle = make_input_bundle({"lib.vy": LIB, "main.vy": MAIN})
+    expected = outputs_from_compiler_data(_compiler_data(input_bundle), FORMATS, cache=cache)
+
+    # fresh input bundle, as in a new process
+    input_bundle = make_input_bundle({"lib.vy": LIB, "main.vy": MAIN})
+    compiler_data = _compiler_data(input_bundle)
+    assert outputs_from_compiler_data(compiler_data, FORMATS, cache=cache) == expected
+
+    # nothing was parsed
+    assert "vyper_module" not in compiler_data.__dict__
+    assert "_resolve_imports" not in compiler_data.__dict__
+
+
+def test_parsed_modules_are_cached(make_input_bundle, cache, monkeypatch):
+    input_bundle = make_input_bundle({"lib.vy": LIB, "main.vy": MAIN})
+    outputs_from_compiler_data(_compiler_data(input_bundle), FORMATS, cache=cache)
+
+    parsed = []
+    parse_to_ast = vy_ast.parse_to_ast
+
+    def _parse_to_ast(source_code, *args, **kwargs):
+        parsed.append(kwargs["resolved_path"])
+        return parse_to_ast(source_code, *args, **kwargs)
+
+    monkeypatch.setattr(vy_ast, "parse_to_ast", _parse_to_ast)
+
+    # only `main.vy` changed, `lib.vy` is loaded from the cache
+    new_main = MAIN + "\n@external\ndef baz():\n    pass\n"
+    input_bundle = make_input_bundle({"lib.vy": LIB, "main.vy": new_main})
+    compiler_data = _compiler_data(input_bundle)
+    out = outputs_from_compiler_data(compiler_data, FORMATS, cache=cache)
+
+    assert [Path(p).name for p in parsed] == ["main.vy"]
+    monkeypatch.undo()
+    assert out == outputs_from_compiler_data(_compiler_data(input_bundle), FORMATS)
+
+
+def test_changed_dependency_recompiles(make_input_bundle, make_file, cache):
+    input_bundle = make_input_bundle({"lib.vy": LIB, "main.vy": MAIN})
+    outputs_from_compiler_data(_compiler_data(input_bundle), FORMATS, cache=cache)
+
+    new_lib = LIB.replace("self.x + 1", "self.x + 2")
+    input_bundle = make_input_bundle({"lib.vy": new_lib, "main.vy": MAIN})
+    compiler_data = _compiler_data(input_bundle)
+    out = outputs_from_compiler_data(compiler_data, FORMATS, cache=cache)
+
+    assert "_annotate" in compiler_data.__dict__
+    assert out == outputs_from_compiler_data(_compiler_data(input_bundle), FORMATS)
+
+
+def test_shadowing_dependency_recompiles(make_input_bundle, make_file, cache):
+    iface = """
+@view
+@external
+def foo() -> uint256:
+    ...
+    """
+    main = """
+import lib
+
+@external
+def bar() -> uint256:
+    return 1
+    """
+    input_bundle = make_input_bundle({"lib.vyi": iface, "main.vy": main})
+    outputs_from_compiler_data(_compiler_data(input_bundle), ["abi"], cache=cache)
+
+    # `lib.vy` takes precedence over `lib.vyi`
+    make_file("lib.vy", LIB)
+    compiler_data = _compiler_data(input_bundle)
+    outputs_from_compiler_data(compiler_data, ["abi"], cache=cache)
+    assert "_resolve_imports" in compiler_data.__dict__
+
+
+def test_dependencies_source_ids(chdir_tmp_path, make_file, tmp_path):
+    make_file("lib.vy", LIB)
+    make_file("main.vy", MAIN)
+    make_file("main2.vy", MAIN + "\nx: uint256\n")
+    cache_dir = tmp_path / "cache"
+
+    files = ["main.vy", "main2.vy"]
+    expected = compile_files(files, FORMATS)
+    assert compile_files(files, FORMATS, cache_dir=cache_dir) == expected
+    # served from the dependencies entries
+    assert compile_files(files, FORMATS, cache_dir=cache_dir) == expected
@@ -0,0 +1,134 @@
+import pytest
+
+from vyper.compiler import OUTPUT_FORMATS, compile_code, compile_from_file_input
+from vyper.compiler.profiler import Profiler
+from vyper.compiler.settings import Settings
+
+CODE = """
+x: public(uint256)
+
+@internal
+def _foo() -> uint256:
+    return self.x + 1
+
+@external
+def foo() -> uint256:
+    \"\"\"
+    @notice foo
+    \"\"\"
+    return self._foo()
+"""
+
+# the phases of `CompilerData`, in pipeline order
+COMPILATION_PHASES = (
+    "parse",
+    "import_resolution",
+    "semantic_analysis",  # includes natspec
+    "storage_layout",
+    "codegen",  # legacy IR or venom
+    "assembly",
+    "bytecode",
+)
+
+# the last phase which each output format needs. building an output never
+# runs a phase past this one, e.g. `-f abi,method_identifiers` stops after
+# semantic analysis. note: with the venom pipeline, the deploy code embeds
+# the runtime bytecode, so `ir` and `cfg` need every phase.
+OUTPUT_FORMAT_PHASES = {
+    "ast_dict": "import_resolution",
+    "annotated_ast_dict": "semantic_analysis",
+    "layout": "storage_layout",
+    "devdoc": "semantic_analysis",
+    "userdoc": "semantic_analysis",
+    "archive": "bytecode",
+    "archive_b64": "bytecode",
+    "integrity": "import_resolution",
+    "solc_json": "bytecode",
+    "external_interface": "semantic_analysis",
+    "interface": "semantic_analysis",
+    "cfg": "bytecode",
+    "cfg_runtime": "codegen",
+    "ir": "codegen",
+    "ir_runtime": "codegen",
+    "ir_dict": "codegen",
+    "ir_runtime_dict": "codegen",
+    "method_identifiers": "semantic_analysis",
+    "metadata": "codegen",
+    "settings_dict": "parse",
+    "profile": "bytecode",
+    "venom_pass_stats": "bytecode",
+    # (codegen if gas estimates are requested)
+    "abi": "semantic_analysis",
+    "gas_estimates": "codegen",
+    "asm": "assembly",
+    "asm_runtime": "assembly",
+    "source_map": "bytecode",
+    "source_map_runtime": "bytecode",
+    "bytecode": "bytecode",
+    "bytecode_runtime": "bytecode",
+    "blueprint_bytecode": "bytecode",
+    "opcodes": "bytecode",
+    "opcodes_runtime": "bytecode",
+    "symbol_map": "assembly",
+    "symbol_map_runtime": "assembly",
+}
+
+# profiler phase name -> phase of the pipeline
+_PROFILER_PHASES = {
+    "parse": "parse",
+    "import_resolution": "import_resolution",
+    "semantic_analysis": "semantic_analysis",
+    "storage_layout": "storage_layout",
+    "ir_generation": "codegen",
+    "legacy_optimizer": "codegen",
+    "venom_runtime": "codegen",
+    "venom_deploytime": "codegen",
+    "assembly": "assembly",
+    "assembly_runtime": "assembly",
+    "bytecode": "bytecode",
+    "bytecode_runtime": "bytecode",
+    "assembly_to_evm": "bytecode",
+}
+
+VENOM_ONLY_FORMATS = ("cfg", "cfg_runtime", "venom_pass_stats")
+
+
+def _phases_run(profile: dict) -> set[str]:
+    ret = set()
+    for name, phase in profile.items():
+        if name in _PROFILER_PHASES:
+            ret.add(_PROFILER_PHASES[name])
+        ret |= _phases_run(phase.get("children", {}))
+    return ret
+
+
+def test_all_output_formats_have_phases():
+    assert OUTPUT_FORMAT_PHASES.keys() == OUTPUT_FORMATS.keys()
+    assert set(OUTPUT_FORMAT_PHASES.values()) <= set(COMPILATION_PHASES)
+
+
+@pytest.mark.parametrize("output_format", OUTPUT_FORMATS.keys())
+def test_output_format_phases(output_format, make_input_bundle):
+    input_bundle = make_input_bundle({"contract.vy": CODE})
+    file_input = input_bundle.load_file("contract.vy")
+    settings = Settings(experimental_codegen=output_format in VENOM_ONLY_FORMATS)
+
+    profiler = Profiler()
+    with profiler.profile():
+        compile_from_file_input(
+            file_input, input_bundle, output_formats=[output_format], settings=settings
+        )
+
+    last_phase = COMPILATION_PHASES.index(OUTPUT_FORMAT_PHASES[output_format])
+    allowed = set(COMPILATION_PHASES[: last_phase + 1])
+    assert _phases_run(profiler.as_dict()) <= allowed
+
+
+def test_abi_with_gas_estimates_runs_codegen():
+    profiler = Profiler()
+    with profiler.profile():
+        out = compile_code(CODE, output_formats=["abi"], show_gas_estimates=True)
+
+    assert "codegen" in _phases_run(profiler.as_dict())
+    (foo,) = [f for f in out["abi"] if f.get("name") == "foo"]
+    assert foo["gas"] > 0
@@ -0,0 +1,84 @@
+from vyper.compiler import compile_code
+from vyper.compiler.profiler import Profiler, profile_phase
+from vyper.compiler.settings import Settings
+
+CODE = """
+x: uint256
+
+@internal
+def _foo() -> uint256:
+    return self.x + 1
+
+@external
+def foo() -> uint256:
+    return self._foo()
+"""
+
+PHASES = [
+    "parse",
+    "import_resolution",
+    "semantic_analysis",
+    "storage_layout",
+    "assembly_runtime",
+    "bytecode_runtime",
+    "assembly",
+    "bytecode",
+]
+
+
+def test_profiler_nesting():
+    profiler = Profiler()
+    with profiler.profile():
+        for _ in range(3):
+            with profile_phase("outer"):
+                with profile_phase("inner"):
+                    _ = [0] * 1000
+
+    ret = profiler.as_dict()
+    outer = ret["total"]["children"]["outer"]
+    assert outer["count"] == 3
+    assert outer["children"]["inner"]["count"] == 3
+    assert outer["peak_memory"] >= outer["children"]["inner"]["peak_memory"] > 0
+    assert ret["total"]["time"] >= outer["time"] >= outer["children"]["inner"]["time"]
+
+    # inactive profiler
+    with profile_phase("outer"):
+        pass
+    assert profiler.as_dict() == ret
+
+
+def test_profile_output():
+    out = compile_code(CODE, output_formats=["profile"])
+    phases = out["profile"]["total"]["children"]
+
+    for phase in PHASES + ["ir_generation", "legacy_optimizer"]:
+        assert phase in phases
+        assert phases[phase]["count"] >= 1
+
+
+def test_profile_output_venom():
+    settings = Settings(experimental_codegen=True)
+    out = compile_code(CODE, output_formats=["profile"], settings=settings)
+    phases = out["profile"]["total"]["children"]
+
+    for phase in PHASES + ["venom_runtime", "venom_deploytime"]:
+        assert phase in phases
+
+    venom = phases["venom_runtime"]["children"]
+    assert "codegen" in venom
+    function_passes = venom["function_passes"]["children"]
+    assert len(function_passes) > 0
+    for fn_profile in function_passes.values():
+        assert "SimplifyCFGPass" in fn_profile["children"]
+
+
+def test_profiler_without_memory_tracing():
+    profiler = Profiler(trace_memory=False)
+    with profiler.profile():
+        with profile_phase("outer"):
+            _ = [0] * 1000
+
+    outer = profiler.as_dict()["total"]["children"]["outer"]
+    assert outer["count"] == 1
+    assert outer["time"] > 0
+    assert outer["peak_memory"] == 0
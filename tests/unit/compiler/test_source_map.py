@@ -1,9 +1,17 @@
+import io
+import json
 from collections import namedtuple
 
 from vyper.compiler import compile_code
-from vyper.compiler.output import _compress_source_map
+from vyper.compiler.output import (
+    _compress_source_map,
+    write_compressed_source_map,
+    write_source_map_output,
+)
+from vyper.compiler.phases import CompilerData
 from vyper.compiler.settings import OptimizationLevel
 from vyper.compiler.utils import expand_source_map
+from vyper.evm.assembler.instructions import PUSHLABEL, Label, TaggedInstruction
 
 TEST_CODE = """
 x: public(uint256)
@@ -170,6 +178,47 @@ def test_compress_source_map():
     assert compressed == "-1:-1:-1;-1:-1:-1;-1:-1:-1;1:45:o;-1:-1:-1;45:49"
 
 
+def test_write_compressed_source_map():
+    # mock the required VyperNode fields in write_compressed_source_map
+    class FakeNode:
+        node_id = 0
+
+        def __init__(self, src):
+            self.src = src
+
+        def get_original_node(self):
+            return self
+
+    assembly = [
+        TaggedInstruction("CALLVALUE", ast_source=FakeNode("1:45")),
+        PUSHLABEL(Label("internal_foo_cleanup")),
+        TaggedInstruction("JUMP", ast_source=FakeNode("45:49")),
+        Label("bar"),
+        "STOP",
+    ]
+    buf = io.StringIO()
+    write_compressed_source_map(buf, assembly, FakeNode("0:100"))
+    assert buf.getvalue() == "1:45:-;-1:-1:-1;-1:-1:-1;-1:-1:-1;45:49:o;-1:-1:-1;-1:-1:-1"
+
+
+def test_compressed_source_map_covers_bytecode():
+    out = compile_code(TEST_CODE, output_formats=["source_map_runtime", "bytecode_runtime"])
+    source_map = out["source_map_runtime"]
+    expanded = expand_source_map(source_map["pc_pos_map_compressed"] + ";")
+    assert len(expanded) == len(bytes.fromhex(out["bytecode_runtime"][2:]))
+    for pc, jump_type in source_map["pc_jump_map"].items():
+        assert expanded[pc][3] == jump_type
+
+
+def test_write_source_map_output():
+    out = compile_code(TEST_CODE, output_formats=["source_map", "source_map_runtime"])
+    compiler_data = CompilerData(TEST_CODE)
+    for runtime, output_format in ((False, "source_map"), (True, "source_map_runtime")):
+        buf = io.StringIO()
+        write_source_map_output(buf, compiler_data, runtime)
+        assert buf.getvalue() == json.dumps(out[output_format])
+
+
 def test_expand_source_map():
     compressed = "13:42:1;:21;::0:o;:::-;1::1;"
     expanded = [
@@ -1,6 +1,8 @@
 import pytest
 
-from tests.venom_utils import PrePostChecker
+from tests.venom_utils import PrePostChecker, parse_from_basic_block
+from vyper.venom.analysis import IRAnalysesCache
+from vyper.venom.execution_profile import ExecutionProfile
 from vyper.venom.passes import BranchOptimizationPass, RemoveUnusedVariablesPass
 
 pytestmark = pytest.mark.hevm
@@ -51,3 +53,86 @@ def test_simple_jump_case():
         sink %res2
     """
     _check_pre_post(pre, post)
+
+
+def _check_pre_post_with_profile(pre, post, branches):
+    pre_ctx = parse_from_basic_block(pre)
+    pre_ctx.profile = ExecutionProfile({}, branches, {label: label for label in branches})
+    for fn in pre_ctx.functions.values():
+        ac = IRAnalysesCache(fn)
+        BranchOptimizationPass(ac, fn).run_pass()
+        RemoveUnusedVariablesPass(ac, fn).run_pass()
+
+    post_ctx = parse_from_basic_block(post)
+    _check_pre_post.check(pre_ctx, post_ctx, pre, post)
+
+
+SIMPLE_JUMP = """
+main:
+    %p1 = source
+    %cond = iszero %p1
+    jnz %cond, @br1, @br2
+br1:
+    sink %p1
+br2:
+    %p2 = source
+    %res = add %p1, %p2
+    sink %res
+"""
+
+
+def test_profile_hot_branch_is_fallthrough():
+    # the zero branch is laid out as the fallthrough, flip the jnz
+    # (for free, by removing the iszero) so that it is the hot branch
+    post = """
+    main:
+        %p1 = source
+        jnz %p1, @br2, @br1
+    br1:
+        sink %p1
+    br2:
+        %p2 = source
+        %res = add %p1, %p2
+        sink %res
+    """
+    _check_pre_post_with_profile(SIMPLE_JUMP, post, {"br1": 100, "br2": 1})
+
+    # already the fallthrough. (without a profile, the heuristic would
+    # flip the jnz)
+    _check_pre_post_with_profile(SIMPLE_JUMP, SIMPLE_JUMP, {"br1": 1, "br2": 100})
+
+
+def test_profile_no_iszero_on_hot_path():
+    pre = """
+    main:
+        %p1 = source
+        %p2 = source
+        %cond = lt %p1, %p2
+        jnz %cond, @br1, @br2
+    br1:
+        sink 0
+    br2:
+        %res = add %p1, %p2
+        sink %res
+    """
+    # without a profile, an iszero is added and the branches are swapped
+    post = """
+    main:
+        %p1 = source
+        %p2 = source
+        %cond = lt %p1, %p2
+        %1 = iszero %cond
+        jnz %1, @br2, @br1
+    br1:
+        sink 0
+    br2:
+        %res = add %p1, %p2
+        sink %res
+    """
+    _check_pre_post(pre, post)
+
+    # the hot branch should not pay for an extra iszero
+    _check_pre_post_with_profile(pre, pre, {"br1": 100, "br2": 1})
+
+    # no (or partial) data: fall back to the heuristic
+    _check_pre_post_with_profile(pre, post, {"br1": 100})
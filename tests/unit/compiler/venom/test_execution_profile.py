@@ -0,0 +1,155 @@
+import pytest
+
+from vyper.compiler import compile_code
+from vyper.compiler.settings import OptimizationLevel, Settings, VenomOptimizationFlags
+from vyper.venom.basicblock import IRLabel
+from vyper.venom.execution_profile import ExecutionProfile
+
+ROUTER = """
+balances: HashMap[address, uint256]
+fee: uint256
+
+@internal
+def _swap(a: address, amount: uint256) -> uint256:
+    f: uint256 = amount * self.fee // 10000
+    if f > amount // 2:
+        f = amount // 2
+    self.balances[a] += amount - f
+    self.balances[msg.sender] -= amount
+    return amount - f
+
+@external
+def swap1(a: address, x: uint256) -> uint256:
+    return self._swap(a, x)
+
+@external
+def swap2(a: address, x: uint256) -> uint256:
+    return self._swap(a, x * 2)
+
+@external
+def swap3(a: address, x: uint256) -> uint256:
+    return self._swap(a, x + 1) + self._swap(msg.sender, x)
+"""
+
+SWAP = "internal 0 _swap(address,uint256)_runtime"
+
+
+@pytest.mark.parametrize(
+    "data,msg",
+    [
+        ([], "must be an object"),
+        ({"functions": {}}, "unsupported profile version"),
+        ({"version": 1, "functions": {}}, "unsupported profile version"),
+        ({"version": 2, "functions": []}, "must be an object"),
+        ({"version": 2, "functions": {"f": -1}}, "invalid count"),
+        ({"version": 2, "branches": {"f:1_then": True}}, "invalid count"),
+    ],
+)
+def test_invalid_profile(data, msg):
+    with pytest.raises(ValueError, match=msg):
+        ExecutionProfile.from_dict(data)
+
+
+def test_profile_from_trace():
+    symbol_map = {SWAP: 10, "3_then": 20, "4_if_exit": 30, f"{SWAP}_split_4_if_exit": 40}
+    block_ids = {"3_then": f"{SWAP}:1_then", "4_if_exit": f"{SWAP}:2_if_exit"}
+    pcs = [0, 10, 20, 10, 30, 40, 10, 20]
+    profile = ExecutionProfile.from_trace(symbol_map, block_ids, pcs)
+
+    # the split block was created by a pass, it has no block id
+    assert profile.functions == {SWAP: 3}
+    assert profile.branches == {f"{SWAP}:1_then": 2, f"{SWAP}:2_if_exit": 1}
+    assert ExecutionProfile.from_dict(profile.as_dict()).as_dict() == profile.as_dict()
+
+    # applied to a build where the labels were numbered differently
+    block_ids = {"7_then": f"{SWAP}:1_then", "8_if_exit": f"{SWAP}:2_if_exit"}
+    profile = ExecutionProfile.from_dict(profile.as_dict(), block_ids)
+    assert profile.block_count(IRLabel("7_then")) == 2
+    assert profile.block_count(IRLabel("3_then")) is None
+
+    # inlined copies share the count of the original block
+    assert profile.block_count(IRLabel("inl2_inl0_7_then")) == 2
+    assert profile.block_count(IRLabel("5_else")) is None
+
+
+def _compile(level, source=ROUTER, **flags):
+    settings = Settings(
+        optimize=level,
+        experimental_codegen=True,
+        venom_flags=VenomOptimizationFlags(level=level, **flags),
+    )
+    return compile_code(
+        source, output_formats=["symbol_map_runtime", "ir_runtime"], settings=settings
+    )
+
+
+def _record(source, hits):
+    # record in a build which keeps all of the labels. `hits` maps
+    # function names and block ids to how often they were entered
+    out = _compile(OptimizationLevel.NONE, source, disable_inlining=True)
+    symbol_map = out["symbol_map_runtime"]
+    labels = {block_id: label for label, block_id in out["ir_runtime"].block_ids.items()}
+    labels.update({fn: fn for fn in symbol_map})
+    pcs = [symbol_map[labels[name]] for name, count in hits.items() for _ in range(count)]
+    return ExecutionProfile.from_trace(symbol_map, out["ir_runtime"].block_ids, pcs)
+
+
+def test_hot_function_is_inlined():
+    profile = _record(ROUTER, {SWAP: 80, f"{SWAP}:1_then": 5}).as_dict()
+    assert profile["branches"][f"{SWAP}:1_then"] == 5
+
+    assert SWAP in _compile(OptimizationLevel.GAS)["symbol_map_runtime"]
+    out = _compile(OptimizationLevel.GAS, execution_profile=profile)
+    assert SWAP not in out["symbol_map_runtime"]
+
+
+def test_profile_settings_roundtrip():
+    profile = {"version": 2, "functions": {SWAP: 80}, "branches": {f"{SWAP}:1_then": 5}}
+    settings = Settings(venom_flags=VenomOptimizationFlags(execution_profile=profile))
+    assert Settings.from_dict(settings.as_dict()) == settings
+
+
+# enough external functions for a different selector section at each
+# optimization level, which shifts the labels of the function bodies
+DEPOSIT = """
+total: uint256
+
+@external
+def deposit(x: uint256):
+    if x > 100:
+        self.total += x
+    else:
+        self.total += 1
+
+@external
+def a() -> uint256:
+    return 1
+
+@external
+def b() -> uint256:
+    return 2
+
+@external
+def c() -> uint256:
+    return 3
+
+@external
+def d() -> uint256:
+    return 4
+"""
+
+
+@pytest.mark.parametrize("level", [OptimizationLevel.GAS, OptimizationLevel.CODESIZE])
+def test_profile_recorded_at_another_level(level):
+    profile = _record(DEPOSIT, {"external deposit:1_then": 1, "external deposit:2_else": 10})
+
+    block_ids = _compile(level, DEPOSIT)["ir_runtime"].block_ids
+    profile = ExecutionProfile.from_dict(profile.as_dict(), block_ids)
+    counts = {
+        block_id: profile.block_count(IRLabel(label)) for label, block_id in block_ids.items()
+    }
+    assert counts == {
+        "external deposit:1_then": 1,
+        "external deposit:2_else": 10,
+        "external deposit:3_if_exit": 0,
+    }
@@ -0,0 +1,183 @@
+import pytest
+
+from vyper.compiler import compile_code
+from vyper.compiler.output import build_abi_output, build_gas_estimates_output
+from vyper.compiler.phases import CompilerData
+from vyper.compiler.settings import OptimizationLevel, Settings
+from vyper.venom.gas_estimate import SSTORE_RESET_GAS, GasEstimator
+from vyper.venom.parser import parse_venom
+
+BOUNDED_LOOP = """
+function main {
+main:
+    %n = calldataload 0
+    %bad = gt %n, BOUND
+    %ok = iszero %bad
+    assert %ok
+    %zero = 0
+    jmp @cond
+cond:
+    %i = phi @main, %zero, @body, %i2
+    %done = eq %i, END
+    jnz %done, @exit, @body
+body:
+    %x = sload %i
+    %i2 = add %i, 1
+    jmp @cond
+exit:
+    stop
+}
+"""
+
+
+def _estimate(src):
+    ctx = parse_venom(src)
+    return GasEstimator(ctx).estimate(ctx.entry_function)
+
+
+@pytest.mark.parametrize("end", ["%n", "%bound"])
+def test_loop_bound(end):
+    # the trip count is bounded by the assert, or by the literal
+    estimates = []
+    for bound in (10, 20, 30):
+        src = BOUNDED_LOOP.replace("BOUND", str(bound))
+        src = src.replace("END", str(bound) if end == "%bound" else "%n")
+        estimates.append(_estimate(src))
+
+    e10, e20, e30 = estimates
+    # each iteration loads a storage slot
+    assert e20.worst - e10.worst == e30.worst - e20.worst > 10 * 2100
+    if end == "%bound":
+        assert e10.typical == e10.worst
+    else:
+        # dynamic loops run for half of their bound
+        assert e20.typical - e10.typical == e30.typical - e20.typical > 5 * 2100
+        assert e10.typical < e10.worst
+
+
+def test_unknown_loop_trips():
+    # without the assert, nothing bounds the trip count
+    bounded = BOUNDED_LOOP.replace("BOUND", "10").replace("END", "%n")
+    unbounded = bounded.replace("    assert %ok\n", "")
+
+    assert not _estimate(bounded).unknown_loop_trips
+    e = _estimate(unbounded)
+    assert e.unknown_loop_trips
+    # one iteration
+    assert 2100 < e.worst < 2 * 2100
+
+
+def test_typical_excludes_reverts():
+    src = """
+    function main {
+    main:
+        %x = calldataload 0
+        jnz %x, @fail, @ok
+    fail:
+        %y = sload 1
+        revert 0, 0
+    ok:
+        sstore 0, %x
+        stop
+    }
+    """
+    estimate = _estimate(src)
+    assert SSTORE_RESET_GAS < estimate.typical < SSTORE_RESET_GAS + 2100
+    # the worst case writes to an empty slot
+    assert estimate.worst > 20000
+
+
+def test_invoke_includes_callee():
+    src = """
+    function main {
+    main:
+        %x = calldataload 0
+        %y = invoke @f, %x
+        %z = invoke @f, %y
+        stop
+    }
+
+    function f {
+    f:
+        %p = param
+        %retpc = param
+        %v = sload %p
+        ret %v, %retpc
+    }
+    """
+    ctx = parse_venom(src)
+    estimator = GasEstimator(ctx)
+    main = estimator.estimate(ctx.entry_function)
+    (f,) = [fn for fn in ctx.get_functions() if fn is not ctx.entry_function]
+    callee = estimator.estimate(f)
+    assert main.worst > 2 * callee.worst > 2 * 2100
+
+
+LOOPS = """
+arr: DynArray[uint256, 10]
+
+@external
+def static_range() -> uint256:
+    acc: uint256 = 0
+    for i: uint256 in range(10):
+        acc += i
+    return acc
+
+@external
+def dyn_range(n: uint256) -> uint256:
+    acc: uint256 = 0
+    for i: uint256 in range(n, bound=20):
+        acc += i
+    return acc
+
+@external
+def mem_iter(xs: DynArray[uint256, 7]) -> uint256:
+    acc: uint256 = 0
+    for x: uint256 in xs:
+        acc += x
+    return acc
+
+@external
+def storage_iter() -> uint256:
+    acc: uint256 = 0
+    for x: uint256 in self.arr:
+        acc += x
+    return acc
+"""
+
+
+@pytest.mark.parametrize(
+    "level", [OptimizationLevel.GAS, OptimizationLevel.CODESIZE, OptimizationLevel.NONE]
+)
+def test_gas_estimates_output(level):
+    settings = Settings(optimize=level, experimental_codegen=True)
+    out = compile_code(LOOPS, output_formats=["gas_estimates"], settings=settings)
+    estimates = out["gas_estimates"]
+
+    assert estimates.keys() == {"static_range", "dyn_range", "mem_iter", "storage_iter"}
+    assert estimates["static_range"]["typical"] == estimates["static_range"]["worst"]
+    for name in ("dyn_range", "mem_iter", "storage_iter"):
+        assert 0 < estimates[name]["typical"] < estimates[name]["worst"]
+    # each iteration loads a storage slot
+    assert estimates["storage_iter"]["worst"] > 10 * 2100
+    assert not any(v["unknown_loop_trips"] for v in estimates.values())
+
+
+def test_gas_estimates_output_legacy():
+    out = compile_code(LOOPS, output_formats=["gas_estimates"])
+    estimates = out["gas_estimates"]
+    assert estimates.keys() == {"static_range", "dyn_range", "mem_iter", "storage_iter"}
+    assert all(v["worst"] > 0 and v["typical"] is None for v in estimates.values())
+    assert all(v["unknown_loop_trips"] is None for v in estimates.values())
+
+
+def test_abi_gas_estimates_without_legacy_codegen():
+    settings = Settings(experimental_codegen=True)
+    compiler_data = CompilerData(LOOPS, settings=settings, show_gas_estimates=True)
+    abi = build_abi_output(compiler_data)
+    estimates = build_gas_estimates_output(compiler_data)
+
+    for fn in abi:
+        assert fn["gas"] == estimates[fn["name"]]["worst"]
+    # the estimates come from the venom code
+    assert "_ir_output" not in compiler_data.__dict__
@@ -4,6 +4,7 @@ from vyper.venom.analysis.analysis import IRAnalysesCache
 from vyper.venom.analysis.fcg import FCGGlobalAnalysis
 from vyper.venom.basicblock import IRLabel
 from vyper.venom.check_venom import check_venom_ctx
+from vyper.venom.execution_profile import ExecutionProfile
 from vyper.venom.passes import FunctionInlinerPass, SimplifyCFGPass
 
 
@@ -165,3 +166,117 @@ def test_noinline_annotation():
 
     # sanity check: without the annotation, the function gets inlined
     assert IRLabel("f") not in run_inliner(src.replace(" [noinline]", "")).functions
+
+
+def test_inliner_updates_call_graph():
+    # g and h get inlined into f (and f into main), which moves their
+    # call sites of `leaf` into main. `leaf` has too many call sites to
+    # be inlined.
+    src = """
+    function main {
+    main:
+        %p = source
+        %1 = invoke @f, %p
+        %2 = invoke @leaf, %1
+        sink %2
+    }
+
+    function f {
+    f:
+        %x = param
+        %retpc = param
+        %1 = invoke @g, %x
+        %2 = invoke @h, %1
+        ret %2, %retpc
+    }
+
+    function g {
+    g:
+        %x = param
+        %retpc = param
+        %1 = invoke @leaf, %x
+        ret %1, %retpc
+    }
+
+    function h {
+    h:
+        %x = param
+        %retpc = param
+        %1 = invoke @leaf, %x
+        %2 = invoke @leaf, %1
+        ret %2, %retpc
+    }
+
+    function leaf [noinline] {
+    leaf:
+        %x = param
+        %retpc = param
+        %1 = add %x, 1
+        ret %1, %retpc
+    }
+    """
+    ctx = parse_venom(src)
+    analyses = {fn: IRAnalysesCache(fn) for fn in ctx.functions.values()}
+    flags = VenomOptimizationFlags(level=OptimizationLevel.GAS)
+    inliner = FunctionInlinerPass(analyses, ctx, flags)
+    inliner.run_pass()
+
+    assert list(ctx.functions) == [IRLabel("main"), IRLabel("leaf")]
+    main, leaf = ctx.get_functions()
+
+    # the call graph which was updated in place is the same as a fresh one
+    updated = inliner.fcg
+    fresh = IRAnalysesCache(main).force_analysis(FCGGlobalAnalysis)
+    assert fresh is not updated
+    for fn in (main, leaf):
+        assert set(updated.get_call_sites(fn)) == set(fresh.get_call_sites(fn))
+        assert set(updated.get_callees(fn)) == set(fresh.get_callees(fn))
+    assert set(updated.get_reachable_functions()) == set(fresh.get_reachable_functions())
+    assert len(updated.get_call_sites(leaf)) == 4
+
+
+def test_inliner_hot_function():
+    # `f` is too big to be inlined at two call sites, unless the profile
+    # says that it is hot
+    body = "\n".join(f"        %{i + 1} = add %{i}, {i}" for i in range(20))
+    src = f"""
+    function main {{
+    main:
+        %p = source
+        %1 = invoke @f, %p
+        %2 = invoke @f, %1
+        %3 = invoke @g, %2
+        sink %3
+    }}
+
+    function f {{
+    f:
+        %0 = param
+        %retpc = param
+{body}
+        ret %20, %retpc
+    }}
+
+    function g [noinline] {{
+    g:
+        %x = param
+        %retpc = param
+        ret %x, %retpc
+    }}
+    """
+    flags = VenomOptimizationFlags(level=OptimizationLevel.GAS)
+
+    def run_inliner(profile):
+        ctx = parse_venom(src)
+        ctx.profile = profile
+        analyses = {fn: IRAnalysesCache(fn) for fn in ctx.functions.values()}
+        FunctionInlinerPass(analyses, ctx, flags).run_pass()
+        return ctx
+
+    assert IRLabel("f") in run_inliner(None).functions
+
+    hot = ExecutionProfile({"f": 1000, "g": 10}, {})
+    assert IRLabel("f") not in run_inliner(hot).functions
+
+    cold = ExecutionProfile({"f": 10, "g": 1000}, {})
+    assert IRLabel("f") in run_inliner(cold).functions
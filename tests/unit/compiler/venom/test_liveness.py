@@ -0,0 +1,74 @@
+from vyper.venom.analysis import IRAnalysesCache
+from vyper.venom.analysis.liveness import LivenessAnalysis
+from vyper.venom.parser import parse_venom
+
+
+def _names(vars_):
+    return [var.name for var in vars_]
+
+
+def test_liveness_loop_with_phi():
+    src = """
+    function main {
+    main:
+        %a = source
+        %b = source
+        jmp @cond
+    cond:
+        %i = phi @main, %a, @body, %i2
+        %c = lt %i, %b
+        jnz %c, @body, @exit
+    body:
+        %i2 = add %i, 1
+        jmp @cond
+    exit:
+        sink %i, %b
+    }
+    """
+    ctx = parse_venom(src)
+    fn = ctx.entry_function
+    ac = IRAnalysesCache(fn)
+    liveness = ac.request_analysis(LivenessAnalysis)
+
+    main = fn.get_basic_block("main")
+    cond = fn.get_basic_block("cond")
+    body = fn.get_basic_block("body")
+    exit_bb = fn.get_basic_block("exit")
+
+    # ordering is significant, it drives the stack layout
+    assert _names(liveness.out_vars(main)) == ["%b", "%a"]
+    assert _names(liveness.out_vars(cond)) == ["%b", "%i"]
+    assert _names(liveness.out_vars(body)) == ["%b", "%i2"]
+    assert _names(liveness.out_vars(exit_bb)) == []
+
+    phi, lt, jnz = cond.instructions
+    assert _names(liveness.live_vars_at(phi)) == ["%b", "%a", "%i2"]
+    assert _names(liveness.live_vars_at(lt)) == ["%b", "%i"]
+    assert _names(liveness.live_vars_at(jnz)) == ["%b", "%i", "%c"]
+    assert _names(liveness.liveness_in_vars(cond)) == ["%b", "%i"]
+
+    # phi operands are translated to the operand from the given source
+    assert _names(liveness.input_vars_from(main, cond)) == ["%b", "%a"]
+    assert _names(liveness.input_vars_from(body, cond)) == ["%b", "%i2"]
+    assert _names(liveness.input_vars_from(cond, body)) == ["%b", "%i"]
+
+
+def test_liveness_unreachable_block():
+    src = """
+    function main {
+    main:
+        %a = source
+        sink %a
+    dead:
+        %b = source
+        sink %b
+    }
+    """
+    ctx = parse_venom(src)
+    fn = ctx.entry_function
+    ac = IRAnalysesCache(fn)
+    liveness = ac.request_analysis(LivenessAnalysis)
+
+    dead = fn.get_basic_block("dead")
+    for inst in dead.instructions:
+        assert len(liveness.live_vars_at(inst)) == 0
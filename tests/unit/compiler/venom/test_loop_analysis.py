@@ -0,0 +1,98 @@
+from vyper.venom.analysis import IRAnalysesCache, LoopAnalysis
+from vyper.venom.basicblock import IRLabel
+from vyper.venom.parser import parse_venom
+
+
+def _labels(bbs):
+    return {bb.label.value for bb in bbs}
+
+
+def test_loop_nest():
+    src = """
+    function main {
+    main:
+        %zero = 0
+        %n = source
+        jmp @outer_cond
+    outer_cond:
+        %i = phi @main, %zero, @outer_incr, %i2
+        %c1 = lt %i, %n
+        jnz %c1, @outer_body, @exit
+    outer_body:
+        %zero_j = 0
+        jmp @inner_cond
+    inner_cond:
+        %j = phi @outer_body, %zero_j, @inner_body, %j2
+        %c2 = lt %j, %n
+        jnz %c2, @inner_body, @outer_incr
+    inner_body:
+        %j2 = add %j, 1
+        jmp @inner_cond
+    outer_incr:
+        %i2 = add %i, 1
+        jmp @outer_cond
+    exit:
+        sink %i
+    }
+    """
+    ctx = parse_venom(src)
+    fn = ctx.entry_function
+    loops = IRAnalysesCache(fn).request_analysis(LoopAnalysis)
+
+    inner, outer = loops.loops
+    assert inner.header.label == IRLabel("inner_cond")
+    assert _labels(inner.body) == {"inner_cond", "inner_body"}
+    assert _labels(inner.latches) == {"inner_body"}
+    assert _labels(inner.exiting) == {"inner_cond"}
+
+    assert outer.header.label == IRLabel("outer_cond")
+    assert _labels(outer.body) == {
+        "outer_cond",
+        "outer_body",
+        "inner_cond",
+        "inner_body",
+        "outer_incr",
+    }
+    assert _labels(outer.latches) == {"outer_incr"}
+
+    assert inner.parent is outer and outer.children == [inner]
+    assert (inner.depth, outer.depth) == (2, 1)
+
+    assert loops.get_loop(fn.get_basic_block("inner_body")) is inner
+    assert loops.get_loop(fn.get_basic_block("outer_incr")) is outer
+    assert loops.get_loop(fn.get_basic_block("exit")) is None
+
+    assert loops.get_preheader(inner).label == IRLabel("outer_body")
+    assert loops.get_preheader(outer).label == IRLabel("main")
+
+
+def test_no_preheader():
+    # the header is entered from two blocks outside of the loop
+    src = """
+    function main {
+    main:
+        %n = source
+        jnz %n, @a, @b
+    a:
+        %zero = 0
+        jmp @cond
+    b:
+        %one = 1
+        jmp @cond
+    cond:
+        %i = phi @a, %zero, @b, %one, @cond, %i2
+        %i2 = add %i, 1
+        %c = lt %i2, %n
+        jnz %c, @cond, @exit
+    exit:
+        sink %i2
+    }
+    """
+    ctx = parse_venom(src)
+    fn = ctx.entry_function
+    loops = IRAnalysesCache(fn).request_analysis(LoopAnalysis)
+
+    (loop,) = loops.loops
+    assert _labels(loop.body) == {"cond"}
+    assert _labels(loop.latches) == {"cond"}
+    assert loops.get_preheader(loop) is None
@@ -0,0 +1,396 @@
+import pytest
+
+from tests.venom_utils import PrePostChecker
+from vyper.compiler import compile_code
+from vyper.compiler.settings import OptimizationLevel, Settings
+from vyper.venom.analysis import IRAnalysesCache, LoopAnalysis
+from vyper.venom.passes import LoopInvariantCodeMotion
+
+pytestmark = pytest.mark.hevm
+
+_check_pre_post = PrePostChecker([LoopInvariantCodeMotion])
+
+
+def _check_no_change(pre):
+    _check_pre_post(pre, pre, hevm=False)
+
+
+def test_hoist_invariant_arithmetic():
+    pre = """
+    main:
+        %zero = 0
+        %x = calldataload 0
+        %n = calldataload 32
+        jmp @cond
+    cond:
+        %i = phi @main, %zero, @body, %i2
+        %c = lt %i, %n
+        jnz %c, @body, @exit
+    body:
+        %y = mul %x, 3
+        %z = add %y, %i
+        mstore %i, %z
+        %i2 = add %i, 1
+        jmp @cond
+    exit:
+        stop
+    """
+    post = """
+    main:
+        %zero = 0
+        %x = calldataload 0
+        %n = calldataload 32
+        %y = mul %x, 3
+        jmp @cond
+    cond:
+        %i = phi @main, %zero, @body, %i2
+        %c = lt %i, %n
+        jnz %c, @body, @exit
+    body:
+        %z = add %y, %i
+        mstore %i, %z
+        %i2 = add %i, 1
+        jmp @cond
+    exit:
+        stop
+    """
+    _check_pre_post(pre, post)
+
+
+def test_hoist_sload_not_clobbered():
+    # the store in the loop writes to a different slot
+    pre = """
+    main:
+        %zero = 0
+        %n = calldataload 0
+        jmp @cond
+    cond:
+        %i = phi @main, %zero, @body, %i2
+        %fee = sload 1
+        %c = lt %i, %n
+        jnz %c, @body, @exit
+    body:
+        %v = mul %fee, %i
+        sstore 2, %v
+        %i2 = add %i, 1
+        jmp @cond
+    exit:
+        stop
+    """
+    post = """
+    main:
+        %zero = 0
+        %n = calldataload 0
+        %fee = sload 1
+        jmp @cond
+    cond:
+        %i = phi @main, %zero, @body, %i2
+        %c = lt %i, %n
+        jnz %c, @body, @exit
+    body:
+        %v = mul %fee, %i
+        sstore 2, %v
+        %i2 = add %i, 1
+        jmp @cond
+    exit:
+        stop
+    """
+    _check_pre_post(pre, post)
+
+
+@pytest.mark.parametrize("slot", ["1", "%n"])
+def test_no_hoist_clobbered_sload(slot):
+    # the store may write to the slot which is read
+    pre = f"""
+    main:
+        %zero = 0
+        %n = calldataload 0
+        jmp @cond
+    cond:
+        %i = phi @main, %zero, @body, %i2
+        %c = lt %i, %n
+        jnz %c, @body, @exit
+    body:
+        %fee = sload 1
+        %v = add %fee, %i
+        sstore {slot}, %v
+        %i2 = add %i, 1
+        jmp @cond
+    exit:
+        stop
+    """
+    _check_no_change(pre)
+
+
+def test_no_hoist_across_call():
+    pre = """
+    main:
+        %zero = 0
+        %n = calldataload 0
+        jmp @cond
+    cond:
+        %i = phi @main, %zero, @body, %i2
+        %c = lt %i, %n
+        jnz %c, @body, @exit
+    body:
+        %fee = sload 1
+        %ok = call 0, %fee, 0, 0, 0, 0, 0
+        %i2 = add %i, 1
+        jmp @cond
+    exit:
+        stop
+    """
+    _check_no_change(pre)
+
+
+@pytest.mark.parametrize("load,store", [("sload", "mstore"), ("tload", "sstore")])
+def test_hoist_load_behind_guard(load, store):
+    # the body is not executed if the loop is left right away, so the
+    # load is hoisted into a guard which checks the exit condition first
+    pre = f"""
+    main:
+        %zero = 0
+        %p = calldataload 0
+        %n = calldataload 32
+        jmp @cond
+    cond:
+        %i = phi @main, %zero, @body, %i2
+        %c = lt %i, %n
+        jnz %c, @body, @exit
+    body:
+        %v = {load} %p
+        {store} %i, %v
+        %i2 = add %i, 1
+        jmp @cond
+    exit:
+        %r = add %i, 1
+        return %r, %c
+    """
+    post = f"""
+    main:
+        %zero = 0
+        %p = calldataload 0
+        %n = calldataload 32
+        %1 = lt %zero, %n
+        jnz %1, @1_licm_guard, @exit
+    cond:
+        %i = phi @1_licm_guard, %zero, @body, %i2
+        %c = lt %i, %n
+        jnz %c, @body, @exit
+    body:
+        {store} %i, %v
+        %i2 = add %i, 1
+        jmp @cond
+    exit:
+        %3 = phi @cond, %c, @main, %1
+        %2 = phi @cond, %i, @main, %zero
+        %r = add %2, 1
+        return %r, %3
+    1_licm_guard:
+        %v = {load} %p
+        jmp @cond
+    """
+    _check_pre_post(pre, post)
+
+
+def test_no_guard_for_mload():
+    # an mload is not worth the guard
+    pre = """
+    main:
+        %zero = 0
+        %p = calldataload 0
+        %n = calldataload 32
+        jmp @cond
+    cond:
+        %i = phi @main, %zero, @body, %i2
+        %c = lt %i, %n
+        jnz %c, @body, @exit
+    body:
+        %v = mload %p
+        sstore %i, %v
+        %i2 = add %i, 1
+        jmp @cond
+    exit:
+        stop
+    """
+    _check_no_change(pre)
+
+
+def test_no_guard_if_exit_merges_values():
+    # the exit block already has several predecessors
+    pre = """
+    main:
+        %zero = 0
+        %p = calldataload 0
+        %n = calldataload 32
+        jmp @cond
+    cond:
+        %i = phi @main, %zero, @body, %i2
+        %c = lt %i, %n
+        jnz %c, @body, @exit
+    body:
+        %v = sload %p
+        mstore %i, %v
+        %i2 = add %i, 1
+        %done = eq %v, %i2
+        jnz %done, @exit, @cond
+    exit:
+        stop
+    """
+    _check_no_change(pre)
+
+
+def test_no_hoist_sload_in_branch():
+    # the sload is only executed if the branch is taken, hoisting it would
+    # pay for a cold sload on every call
+    pre = """
+    main:
+        %zero = 0
+        %n = calldataload 0
+        jmp @cond
+    cond:
+        %i = phi @main, %zero, @incr, %i2
+        %c = lt %i, %n
+        jnz %c, @body, @exit
+    body:
+        %match = eq %i, 12345
+        jnz %match, @then, @incr
+    then:
+        %y = sload 1
+        sstore 2, %y
+        jmp @incr
+    incr:
+        %i2 = add %i, 1
+        jmp @cond
+    exit:
+        stop
+    """
+    _check_no_change(pre)
+
+
+def test_hoist_mload_executed_on_entry():
+    pre = """
+    main:
+        %zero = 0
+        %p = calldataload 0
+        %n = calldataload 32
+        jmp @cond
+    cond:
+        %i = phi @main, %zero, @body, %i2
+        %v = mload %p
+        sstore %i, %v
+        %c = lt %i, %n
+        jnz %c, @body, @exit
+    body:
+        %i2 = add %i, 1
+        jmp @cond
+    exit:
+        stop
+    """
+    post = """
+    main:
+        %zero = 0
+        %p = calldataload 0
+        %n = calldataload 32
+        %v = mload %p
+        jmp @cond
+    cond:
+        %i = phi @main, %zero, @body, %i2
+        sstore %i, %v
+        %c = lt %i, %n
+        jnz %c, @body, @exit
+    body:
+        %i2 = add %i, 1
+        jmp @cond
+    exit:
+        stop
+    """
+    _check_pre_post(pre, post)
+
+
+def test_hoist_out_of_loop_nest():
+    pre = """
+    main:
+        %zero = 0
+        %n = calldataload 0
+        jmp @outer_cond
+    outer_cond:
+        %i = phi @main, %zero, @outer_incr, %i2
+        %c1 = lt %i, %n
+        jnz %c1, @outer_body, @exit
+    outer_body:
+        %zero_j = 0
+        jmp @inner_cond
+    inner_cond:
+        %j = phi @outer_body, %zero_j, @inner_body, %j2
+        %c2 = lt %j, %n
+        jnz %c2, @inner_body, @outer_incr
+    inner_body:
+        %me = caller
+        %ok = eq %me, %n
+        %k = add %i, %j
+        mstore %k, %ok
+        %j2 = add %j, 1
+        jmp @inner_cond
+    outer_incr:
+        %i2 = add %i, 1
+        jmp @outer_cond
+    exit:
+        stop
+    """
+    post = """
+    main:
+        %zero = 0
+        %n = calldataload 0
+        %me = caller
+        %ok = eq %me, %n
+        jmp @outer_cond
+    outer_cond:
+        %i = phi @main, %zero, @outer_incr, %i2
+        %c1 = lt %i, %n
+        jnz %c1, @outer_body, @exit
+    outer_body:
+        %zero_j = 0
+        jmp @inner_cond
+    inner_cond:
+        %j = phi @outer_body, %zero_j, @inner_body, %j2
+        %c2 = lt %j, %n
+        jnz %c2, @inner_body, @outer_incr
+    inner_body:
+        %k = add %i, %j
+        mstore %k, %ok
+        %j2 = add %j, 1
+        jmp @inner_cond
+    outer_incr:
+        %i2 = add %i, 1
+        jmp @outer_cond
+    exit:
+        stop
+    """
+    _check_pre_post(pre, post)
+
+
+def test_hoist_sload_out_of_for_loop():
+    code = """
+cfg: uint256
+
+@external
+def foo(xs: DynArray[uint256, 10]) -> uint256:
+    s: uint256 = 0
+    for x: uint256 in xs:
+        s += x * self.cfg
+    return s
+    """
+    settings = Settings(experimental_codegen=True, optimize=OptimizationLevel.GAS)
+    ctx = compile_code(code, settings=settings, output_formats=["ir_runtime"])["ir_runtime"]
+
+    (fn,) = ctx.functions.values()
+    loops = LoopAnalysis(IRAnalysesCache(fn), fn)
+    loops.analyze()
+    (loop,) = loops.loops
+
+    (sload,) = [
+        inst for bb in fn.get_basic_blocks() for inst in bb.instructions if inst.opcode == "sload"
+    ]
+    assert sload.parent not in loop.body
+    assert loops.get_preheader(loop) is sload.parent
@@ -0,0 +1,47 @@
+import pytest
+
+from vyper.compiler import compile_code
+from vyper.compiler.settings import OptimizationLevel, Settings, VenomOptimizationFlags
+
+CODE = """
+counter: uint256
+
+@internal
+def _leaf(x: uint256, xs: DynArray[uint256, 4]) -> uint256:
+    acc: uint256 = x
+    for v: uint256 in xs:
+        acc = acc * 3 + v
+    self.counter += acc
+    return acc
+
+@internal
+def _mid(x: uint256, xs: DynArray[uint256, 4]) -> uint256:
+    return self._leaf(x, xs) + self._leaf(x + 1, xs)
+
+@internal
+def _other(x: uint256) -> Bytes[64]:
+    return concat(convert(x, bytes32), convert(x + 1, bytes32))
+
+@external
+def foo(x: uint256, xs: DynArray[uint256, 4]) -> uint256:
+    return self._mid(x, xs) + self._mid(x + 2, xs) + len(self._other(x))
+
+@external
+def bar(x: uint256) -> Bytes[64]:
+    return self._other(x + self._leaf(x, []))
+"""
+
+OUTPUTS = ["bytecode", "bytecode_runtime", "source_map"]
+
+
+def _compile(level: OptimizationLevel, jobs: int) -> dict:
+    flags = VenomOptimizationFlags(level=level, fn_pass_jobs=jobs)
+    settings = Settings(experimental_codegen=True, optimize=level, venom_flags=flags)
+    return compile_code(CODE, settings=settings, output_formats=OUTPUTS)
+
+
+@pytest.mark.parametrize(
+    "level", [OptimizationLevel.GAS, OptimizationLevel.O3, OptimizationLevel.CODESIZE]
+)
+def test_parallel_fn_passes_identical(level):
+    assert _compile(level, 2) == _compile(level, 1)
@@ -0,0 +1,250 @@
+import pytest
+
+from tests.venom_utils import PrePostChecker
+from vyper.venom.passes import PartialRedundancyElimination
+
+pytestmark = pytest.mark.hevm
+
+_check_pre_post = PrePostChecker([PartialRedundancyElimination])
+_check_pre_post_size = PrePostChecker([(PartialRedundancyElimination, {"max_code_growth": 0})])
+
+
+def test_fully_redundant_sha3():
+    # the slot is hashed on both arms and again after the join
+    pre = """
+    main:
+        %1 = calldataload 0
+        %2 = calldataload 32
+        mstore 0, %1
+        mstore 32, 5
+        jnz %2, @then, @else
+    then:
+        %3 = sha3 0, 64
+        sstore %3, %2
+        jmp @join
+    else:
+        %4 = sha3 0, 64
+        sstore %4, 1
+        jmp @join
+    join:
+        %5 = sha3 0, 64
+        %6 = sload %5
+        sink %6
+    """
+    post = """
+    main:
+        %1 = calldataload 0
+        %2 = calldataload 32
+        mstore 0, %1
+        mstore 32, 5
+        jnz %2, @then, @else
+    then:
+        %3 = sha3 0, 64
+        sstore %3, %2
+        jmp @join
+    else:
+        %4 = sha3 0, 64
+        sstore %4, 1
+        jmp @join
+    join:
+        %7 = phi @then, %3, @else, %4
+        %5 = %7
+        %6 = sload %5
+        sink %6
+    """
+    _check_pre_post(pre, post)
+
+
+def test_reinsert_after_clobber():
+    # memory is written after the sha3 in one of the arms, so the value
+    # is recomputed at the end of that arm
+    pre = """
+    main:
+        %1 = calldataload 0
+        %2 = calldataload 32
+        mstore 0, %1
+        jnz %2, @then, @else
+    then:
+        %3 = sha3 0, 64
+        mstore 32, %3
+        jmp @join
+    else:
+        %4 = sha3 0, 64
+        sstore %4, 1
+        jmp @join
+    join:
+        %5 = sha3 0, 64
+        sink %5
+    """
+    post = """
+    main:
+        %1 = calldataload 0
+        %2 = calldataload 32
+        mstore 0, %1
+        jnz %2, @then, @else
+    then:
+        %3 = sha3 0, 64
+        mstore 32, %3
+        %6 = sha3 0, 64
+        jmp @join
+    else:
+        %4 = sha3 0, 64
+        sstore %4, 1
+        jmp @join
+    join:
+        %7 = phi @then, %6, @else, %4
+        %5 = %7
+        sink %5
+    """
+    _check_pre_post(pre, post)
+
+
+def test_no_elimination_clobber_in_join():
+    pre = """
+    main:
+        %1 = calldataload 0
+        %2 = calldataload 32
+        mstore 0, %1
+        jnz %2, @then, @else
+    then:
+        %3 = sha3 0, 64
+        jmp @join
+    else:
+        %4 = sha3 0, 64
+        jmp @join
+    join:
+        mstore 0, %2
+        %5 = sha3 0, 64
+        sink %5
+    """
+    _check_pre_post(pre, pre, hevm=False)
+
+
+def test_partially_redundant():
+    # the `sload` is only done on one arm, insert it on the other
+    pre = """
+    main:
+        %x = calldataload 0
+        %y = calldataload 32
+        jnz %x, @then, @else
+    then:
+        %1 = sload %y
+        mstore 0, %1
+        jmp @join
+    else:
+        mstore 0, %y
+        jmp @join
+    join:
+        %2 = sload %y
+        %3 = add %2, 7
+        sink %3
+    """
+    post = """
+    main:
+        %x = calldataload 0
+        %y = calldataload 32
+        jnz %x, @then, @else
+    then:
+        %1 = sload %y
+        mstore 0, %1
+        jmp @join
+    else:
+        mstore 0, %y
+        %4 = sload %y
+        jmp @join
+    join:
+        %5 = phi @then, %1, @else, %4
+        %2 = %5
+        %3 = add %2, 7
+        sink %3
+    """
+    _check_pre_post(pre, post)
+
+    # inserting grows the code, so it is not done when optimizing for size
+    _check_pre_post_size(pre, pre, hevm=False)
+
+
+def test_cheap_instruction_not_eliminated():
+    # merging the values costs more than recomputing the `add`
+    pre = """
+    main:
+        %x = calldataload 0
+        %y = calldataload 32
+        jnz %x, @then, @else
+    then:
+        %1 = add %x, %y
+        mstore 0, %1
+        jmp @join
+    else:
+        %2 = add %y, %x
+        mstore 32, %2
+        jmp @join
+    join:
+        %3 = add %x, %y
+        sink %3
+    """
+    _check_pre_post(pre, pre, hevm=False)
+
+
+def test_translate_through_phi():
+    # the operand of the expression is a phi, look for the expression
+    # with the incoming value in each predecessor
+    pre = """
+    main:
+        %x = calldataload 0
+        jnz %x, @then, @else
+    then:
+        %a = calldataload 32
+        %1 = sload %a
+        mstore 0, %1
+        jmp @join
+    else:
+        %b = calldataload 64
+        %2 = sload %b
+        mstore 32, %2
+        jmp @join
+    join:
+        %p = phi @then, %a, @else, %b
+        %3 = sload %p
+        sink %3
+    """
+    post = """
+    main:
+        %x = calldataload 0
+        jnz %x, @then, @else
+    then:
+        %a = calldataload 32
+        %1 = sload %a
+        mstore 0, %1
+        jmp @join
+    else:
+        %b = calldataload 64
+        %2 = sload %b
+        mstore 32, %2
+        jmp @join
+    join:
+        %4 = phi @then, %1, @else, %2
+        %p = phi @then, %a, @else, %b
+        %3 = %4
+        sink %3
+    """
+    _check_pre_post(pre, post)
+
+
+def test_no_insertion_on_critical_edge():
+    # `main` has another successor, inserting the `sload` there would be
+    # speculative
+    pre = """
+    main:
+        %x = calldataload 0
+        %y = calldataload 32
+        jnz %x, @then, @join
+    then:
+        %1 = sload %y
+        mstore 0, %1
+        jmp @join
+    join:
+        %2 = sload %y
+        sink %2
+    """
+    _check_pre_post(pre, pre, hevm=False)
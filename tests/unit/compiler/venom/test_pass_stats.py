@@ -0,0 +1,81 @@
+import pytest
+
+from vyper.compiler import compile_code
+from vyper.compiler.settings import Settings
+from vyper.venom.analysis import IRAnalysesCache
+from vyper.venom.parser import parse_venom
+from vyper.venom.pass_stats import PassStatsCollector, pass_stats
+from vyper.venom.passes import RemoveUnusedVariablesPass, SimplifyCFGPass
+
+CODE = """
+x: uint256
+
+@internal
+def _foo() -> uint256:
+    return self.x + 1
+
+@external
+def foo() -> uint256:
+    return self._foo()
+"""
+
+
+def _run(fn, ac, pass_cls):
+    with pass_stats(fn, pass_cls.__name__, ac):
+        pass_cls(ac, fn).run_pass()
+
+
+def test_pass_stats_records():
+    src = """
+    function main {
+    main:
+        %1 = source
+        %2 = add %1, 1
+        sink %1
+    }
+    """
+    ctx = parse_venom(src)
+    fn = ctx.entry_function
+    ac = IRAnalysesCache(fn)
+
+    collector = PassStatsCollector()
+    with collector.collect():
+        _run(fn, ac, RemoveUnusedVariablesPass)
+        _run(fn, ac, SimplifyCFGPass)
+
+    # not collected outside of `collect()`
+    _run(fn, ac, RemoveUnusedVariablesPass)
+
+    (records,) = collector.functions.values()
+    assert [r["pass"] for r in records] == ["RemoveUnusedVariablesPass", "SimplifyCFGPass"]
+
+    remove_unused, simplify_cfg = records
+    assert remove_unused["changed"]
+    assert remove_unused["instructions_after"] == remove_unused["instructions_before"] - 1
+    assert remove_unused["code_size_delta"] < 0
+    assert remove_unused["analyses_computed"] > 0
+
+    assert not simplify_cfg["changed"]
+    assert simplify_cfg["instructions_after"] == simplify_cfg["instructions_before"]
+    assert simplify_cfg["basic_blocks_after"] == simplify_cfg["basic_blocks_before"] == 1
+
+    summary = collector.summary()
+    assert summary["RemoveUnusedVariablesPass"]["runs"] == 1
+    assert summary["RemoveUnusedVariablesPass"]["changed"] == 1
+    assert summary["RemoveUnusedVariablesPass"]["instructions_delta"] == -1
+    assert summary["SimplifyCFGPass"]["changed"] == 0
+
+
+def test_venom_pass_stats_output():
+    settings = Settings(experimental_codegen=True)
+    out = compile_code(CODE, output_formats=["venom_pass_stats"], settings=settings)
+    stats = out["venom_pass_stats"]
+
+    for section in ("runtime", "deploy"):
+        assert len(stats[section]["functions"]) > 0
+        assert "SimplifyCFGPass" in stats[section]["passes"]
+
+
+def test_venom_pass_stats_requires_venom():
+    with pytest.raises(ValueError):
+        compile_code(CODE, output_formats=["venom_pass_stats"])
@@ -46,3 +46,31 @@ def test_single_use_Expansion():
         SingleUseExpansion(ac, fn).run_pass()
 
     generate_assembly_experimental(ctx)
+
+
+def test_phi_operand_live_through_phi_block():
+    # %x flows back into the header along the back edge, but it is also
+    # used in the loop body, so it is still live after the phi
+    code = """
+    main:
+        %x = calldataload 0
+        %n = calldataload 32
+        %zero = 0
+        jmp @cond
+    cond:
+        %y = phi @main, %zero, @body, %x
+        %c = lt %y, %n
+        jnz %c, @body, @exit
+    body:
+        mstore %x, %y
+        jmp @cond
+    exit:
+        return %y, %n
+    """
+
+    ctx = parse_from_basic_block(code)
+    for fn in ctx.functions.values():
+        ac = IRAnalysesCache(fn)
+        SingleUseExpansion(ac, fn).run_pass()
+
+    generate_assembly_experimental(ctx)
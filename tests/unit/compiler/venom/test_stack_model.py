@@ -0,0 +1,78 @@
+import random
+
+import pytest
+
+from vyper.venom.basicblock import IRLiteral, IRVariable
+from vyper.venom.stack_model import StackModel
+
+
+def _scan_depth(stack: StackModel, op) -> int:
+    for i, stack_op in enumerate(reversed(stack._stack)):
+        if stack_op.value == op.value:
+            return -i
+    return StackModel.NOT_IN_STACK  # type: ignore
+
+
+def test_stack_model_depths():
+    stack = StackModel()
+    a, b, c = IRVariable("a"), IRVariable("b"), IRVariable("c")
+    stack.push(a)
+    stack.push(b)
+    stack.push(a)
+
+    assert stack.get_depth(a) == 0
+    assert stack.get_depth(b) == -1
+    assert stack.get_depth(c) is StackModel.NOT_IN_STACK
+
+    stack.swap(-1)
+    assert stack.get_depth(a) == -1
+    assert stack.get_depth(b) == 0
+
+    stack.poke(0, c)
+    assert stack.get_depth(c) == 0
+    assert stack.get_depth(b) is StackModel.NOT_IN_STACK
+    assert stack.get_depth(a) == -1
+
+    stack.pop(2)
+    assert stack.get_depth(a) == 0
+    assert stack.get_depth(c) is StackModel.NOT_IN_STACK
+
+
+def test_stack_model_phi_depth():
+    stack = StackModel()
+    a, b, c = IRVariable("a"), IRVariable("b"), IRVariable("c")
+    stack.push(a)
+    stack.push(c)
+
+    assert stack.get_phi_depth([a, b]) == -1
+    assert stack.get_phi_depth([b]) is StackModel.NOT_IN_STACK
+
+    stack.push(b)
+    with pytest.raises(AssertionError):
+        stack.get_phi_depth([a, b])
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_stack_model_matches_scan(seed):
+    rng = random.Random(seed)
+    ops = [IRVariable(f"v{i}") for i in range(6)] + [IRLiteral(i) for i in range(3)]
+
+    stack = StackModel()
+    for _ in range(300):
+        action = rng.choice(["push", "pop", "swap", "dup", "poke", "copy"])
+        height = stack.height
+        if action == "push" or height == 0:
+            stack.push(rng.choice(ops))
+        elif action == "pop":
+            stack.pop(rng.randint(1, height))
+        elif action == "swap" and height > 1:
+            stack.swap(-rng.randint(1, height - 1))
+        elif action == "dup":
+            stack.dup(-rng.randint(0, height - 1))
+        elif action == "poke":
+            stack.poke(-rng.randint(0, height - 1), rng.choice(ops))
+        elif action == "copy":
+            stack = stack.copy()
+
+        for op in ops:
+            assert stack.get_depth(op) == _scan_depth(stack, op)
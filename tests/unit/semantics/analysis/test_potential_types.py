@@ -9,7 +9,7 @@ from vyper.exceptions import (
     UnknownAttribute,
 )
 from vyper.semantics.analysis.base import VarInfo
-from vyper.semantics.analysis.utils import get_possible_types_from_node
+from vyper.semantics.analysis.utils import count_type_inference, get_possible_types_from_node
 from vyper.semantics.types import AddressT, BoolT, DArrayT, SArrayT
 from vyper.semantics.types.shortcuts import INT128_T
 
@@ -219,3 +219,16 @@ def test_tuple_subscript(build_node, namespace):
     types_list = get_possible_types_from_node(node)
 
     assert types_list == [namespace["bar"].typ]
+
+
+def test_count_type_inference(build_node, namespace):
+    node = build_node("[[1, 2], [3 * 4, foo]]")
+
+    namespace["foo"] = VarInfo(INT128_T)
+    with count_type_inference() as counts:
+        get_possible_types_from_node(node)
+        get_possible_types_from_node(node)
+
+    # every node is inferred once, then found in its cache
+    assert len(counts) == 9
+    assert all(c == 1 for c in counts.values())
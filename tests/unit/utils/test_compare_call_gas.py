@@ -0,0 +1,93 @@
+import importlib.util
+import json
+from pathlib import Path
+
+
+def load_compare_call_gas():
+    script_path = Path(__file__).parents[3] / ".github" / "scripts" / "compare_call_gas.py"
+    spec = importlib.util.spec_from_file_location("compare_call_gas", script_path)
+    compare_call_gas = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(compare_call_gas)
+    return compare_call_gas
+
+
+def write_measurement(tmp_path, name, builds, backend="revm"):
+    path = tmp_path / name
+    path.write_text(json.dumps({"backend": backend, "builds": builds}))
+    return path
+
+
+def scenario(gas, runtime, error=None):
+    ret = {"gas": gas, "code_size": {"examples/tokens/ERC20.vy": {"runtime": runtime}}}
+    if error is not None:
+        ret["error"] = error
+    return ret
+
+
+def test_regressions_beyond_threshold_fail(tmp_path):
+    compare_call_gas = load_compare_call_gas()
+    base_path = write_measurement(
+        tmp_path,
+        "base.json",
+        {"venom-O2": {"ERC20": scenario({"transfer": 1000, "approve": 1000}, 1000)}},
+    )
+    head_path = write_measurement(
+        tmp_path,
+        "head.json",
+        {"venom-O2": {"ERC20": scenario({"transfer": 1004, "approve": 900}, 1000)}},
+    )
+
+    report, failed = compare_call_gas.generate_report(base_path, head_path, threshold=0.5)
+    assert not failed
+    assert "| 🟠+4 | +0.40% | **1000** | **1004** | venom-O2 | ERC20.transfer |" in report
+    assert "| 🟢-100 | -10.00% | **1000** | **900** | venom-O2 | ERC20.approve |" in report
+
+    report, failed = compare_call_gas.generate_report(base_path, head_path, threshold=0.1)
+    assert failed
+    assert "| 🔴+4 | +0.40% | **1000** | **1004** | venom-O2 | ERC20.transfer |" in report
+
+
+def test_code_size_regression_fails(tmp_path):
+    compare_call_gas = load_compare_call_gas()
+    base_path = write_measurement(
+        tmp_path, "base.json", {"legacy-Os": {"ERC20": scenario({"transfer": 1000}, 1000)}}
+    )
+    head_path = write_measurement(
+        tmp_path, "head.json", {"legacy-Os": {"ERC20": scenario({"transfer": 1000}, 1100)}}
+    )
+
+    report, failed = compare_call_gas.generate_report(base_path, head_path, threshold=1.0)
+    assert failed
+    assert "Code size regressions above threshold: 1" in report
+    assert "| 🔴+100 | +10.00% | **1000** | **1100** | legacy-Os |" in report
+
+
+def test_broken_scenario_fails(tmp_path):
+    compare_call_gas = load_compare_call_gas()
+    base_path = write_measurement(
+        tmp_path, "base.json", {"venom-O3": {"ERC20": scenario({"transfer": 1000}, 1000)}}
+    )
+    head_path = write_measurement(
+        tmp_path,
+        "head.json",
+        {"venom-O3": {"ERC20": scenario({}, 1000, error="transfer: ExecutionReverted")}},
+    )
+
+    report, failed = compare_call_gas.generate_report(base_path, head_path, threshold=1.0)
+    assert failed
+    assert "| venom-O3 | ERC20 | `transfer: ExecutionReverted` |" in report
+    assert "| 🗑️ | - | **1000** | - | venom-O3 | ERC20.transfer |" in report
+
+
+def test_compile_time_is_reported_but_never_fails(tmp_path):
+    compare_call_gas = load_compare_call_gas()
+    base = scenario({"transfer": 1000}, 1000)
+    head = scenario({"transfer": 1000}, 1000)
+    base["compile_time"] = {"venom_runtime": 1.0}
+    head["compile_time"] = {"venom_runtime": 3.0}
+    base_path = write_measurement(tmp_path, "base.json", {"venom-O2": {"ERC20": base}})
+    head_path = write_measurement(tmp_path, "head.json", {"venom-O2": {"ERC20": head}})
+
+    report, failed = compare_call_gas.generate_report(base_path, head_path, threshold=0.0)
+    assert not failed
+    assert "| venom-O2 | venom_runtime | 1.000 | 3.000 | +200.00% |" in report
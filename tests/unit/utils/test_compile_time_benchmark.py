@@ -0,0 +1,83 @@
+import importlib.util
+import json
+from pathlib import Path
+
+import pytest
+
+SCRIPTS = Path(__file__).parents[3] / ".github" / "scripts"
+
+
+def load_script(name):
+    spec = importlib.util.spec_from_file_location(name, SCRIPTS / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.mark.parametrize(
+    "generator", ["functions", "storage_vars", "import_tree", "constant_array", "nested_loops"]
+)
+def test_generators_compile(tmp_path, generator):
+    measure = load_script("measure_compile_time")
+    gen, sizes = measure.GENERATORS[generator]
+    for filename, source in gen(sizes[0]).items():
+        (tmp_path / filename).write_text(source)
+
+    settings = measure.Settings(experimental_codegen=True)
+    result = measure.time_contract(tmp_path / "main.vy", [tmp_path], settings, repeat=1)
+    for phase in ("parse", "semantic_analysis", "venom_runtime", "assembly_runtime", "total"):
+        assert result["phases"][phase] > 0
+    assert "SimplifyCFGPass" in result["venom_passes"]
+
+
+def test_scaling_exponent():
+    measure = load_script("measure_compile_time")
+    sizes = [10, 20, 40, 80]
+    assert measure.scaling_exponent(sizes, [n * 0.01 for n in sizes]) == pytest.approx(1.0)
+    assert measure.scaling_exponent(sizes, [n**2 * 0.01 for n in sizes]) == pytest.approx(2.0)
+
+
+def write_measurement(tmp_path, name, total, exponent, example_total):
+    data = {
+        "opt_level": "gas",
+        "synthetic": {
+            "functions": {
+                "venom": {
+                    "sizes": {
+                        "16": {"phases": {"total": total / 4}, "venom_passes": {}},
+                        "64": {"phases": {"total": total}, "venom_passes": {"SCCP": total / 2}},
+                        "128": {"error": "CompilerPanic: stack too deep"},
+                    },
+                    "exponents": {"total": exponent},
+                }
+            }
+        },
+        "examples": {"examples/tokens/ERC20.vy": {"legacy": {"phases": {"total": example_total}}}},
+    }
+    path = tmp_path / name
+    path.write_text(json.dumps(data))
+    return path
+
+
+def test_compare_flags_slowdowns_and_scaling(tmp_path):
+    compare = load_script("compare_compile_time")
+    base_path = write_measurement(tmp_path, "base.json", 1.0, 1.0, 0.5)
+    head_path = write_measurement(tmp_path, "head.json", 1.5, 1.6, 0.4)
+
+    report, failed = compare.generate_report(base_path, head_path, 10.0, 0.25)
+    assert failed
+    assert "| 🔴+0.60 | 1.00 | 1.60 | functions (venom) | total |" in report
+    # the largest size which compiled is compared
+    assert "| 🔴+50.00% | 1.000 | 1.500 | functions (venom) | total |" in report
+    assert "| 🔴+50.00% | 0.500 | 0.750 | functions (venom) | venom_passes.SCCP |" in report
+    assert "| 🟢-20.00% | 0.500 | 0.400 | examples (legacy) | total |" in report
+
+
+def test_compare_ignores_noise(tmp_path):
+    compare = load_script("compare_compile_time")
+    base_path = write_measurement(tmp_path, "base.json", 1.0, 1.0, 0.01)
+    head_path = write_measurement(tmp_path, "head.json", 1.05, 1.1, 0.02)
+
+    report, failed = compare.generate_report(base_path, head_path, 10.0, 0.25)
+    assert not failed
+    assert "Phases slower than threshold: 0" in report
@@ -2,8 +2,6 @@ from importlib.metadata import PackageNotFoundError
 from importlib.metadata import version as _version
 from pathlib import Path as _Path
 
-from vyper.compiler import compile_code, compile_from_file_input
-
 _commit_hash_file = _Path(__file__).parent.joinpath("vyper_git_commithash.txt")
 
 if _commit_hash_file.exists():
@@ -22,3 +20,13 @@ except PackageNotFoundError:
 
 # pep440 version with commit hash
 __long_version__ = f"{__version__}+commit.{__commit__}"
+
+
+def __getattr__(name):
+    # the compiler is imported on first use, so that importing a
+    # submodule (e.g. `vyper.cli` for `vyper --version`) stays cheap
+    if name in ("compile_code", "compile_from_file_input"):
+        from vyper import compiler
+
+        return getattr(compiler, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,5 +1,4 @@
 from vyper.exceptions import InvalidABIType
-from vyper.semantics.types.infinity import is_bounded_length
 from vyper.utils import ceil32
 
 
@@ -155,6 +154,9 @@ class ABI_StaticArray(ABIType):
 
 class ABI_Bytes(ABIType):
     def __init__(self, bytes_bound):
+        # circular import: vyper.semantics.types imports this module
+        from vyper.semantics.types.infinity import is_bounded_length
+
         if is_bounded_length(bytes_bound) and not bytes_bound >= 0:
             raise InvalidABIType("Negative bytes_bound provided to ABI_Bytes")
 
@@ -186,6 +188,9 @@ class ABI_String(ABI_Bytes):
 
 class ABI_DynamicArray(ABIType):
     def __init__(self, subtyp, elems_bound):
+        # circular import: vyper.semantics.types imports this module
+        from vyper.semantics.types.infinity import is_bounded_length
+
         if is_bounded_length(elems_bound) and not elems_bound >= 0:
             raise InvalidABIType("Negative bound provided to DynamicArray")
 
@@ -0,0 +1,81 @@
+"""
+versioned binary serialization of parsed modules.
+
+the layout is a fixed size header, the version of the compiler which wrote
+the data, and the zlib-compressed pickle of the module:
+
+    magic (4 bytes) | format version (u16) | length of compiler version (u16)
+    | compiler version (utf-8) | payload
+
+the ast node classes can change between compiler versions, so data written
+by another compiler (or with another format version) is rejected with a
+`ValueError` instead of being unpickled.
+"""
+
+import pickle
+import struct
+import zlib
+
+import vyper
+from vyper.ast import nodes as vy_ast
+
+MAGIC = b"VYAS"
+
+# bump this whenever the layout changes
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct(">4sHH")
+
+# the pickle of a module repeats the source code of each node, which
+# compresses well. favor speed, this is on the compilation path.
+_COMPRESSION_LEVEL = 1
+
+
+def _compiler_version() -> bytes:
+    return vyper.__long_version__.encode("utf-8")
+
+
+def pack(pickled_module: bytes) -> bytes:
+    """
+    Wrap a pickled module in the versioned binary format.
+    """
+    version = _compiler_version()
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, len(version))
+    return header + version + zlib.compress(pickled_module, _COMPRESSION_LEVEL)
+
+
+def unpack(data: bytes) -> bytes:
+    """
+    Check the header of `data` and return the pickled module.
+
+    Raises `ValueError` if `data` was not written by `pack()` of this
+    compiler version.
+    """
+    if len(data) < _HEADER.size:
+        raise ValueError("truncated module data")
+    magic, format_version, version_len = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("not a serialized vyper module")
+    if format_version != FORMAT_VERSION:
+        raise ValueError(f"unsupported format version {format_version}")
+
+    ofst = _HEADER.size + version_len
+    version = data[_HEADER.size : ofst]
+    if version != _compiler_version():
+        raise ValueError(f"module was serialized by vyper {version.decode(errors='replace')}")
+
+    try:
+        return zlib.decompress(data[ofst:])
+    except zlib.error as e:
+        raise ValueError("corrupted module data") from e
+
+
+def dumps(module: vy_ast.Module) -> bytes:
+    return pack(pickle.dumps(module, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def loads(data: bytes) -> vy_ast.Module:
+    ret = pickle.loads(unpack(data))
+    if not isinstance(ret, vy_ast.Module):
+        raise ValueError("not a serialized vyper module")
+    return ret
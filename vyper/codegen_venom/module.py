@@ -910,8 +910,9 @@ def _generate_external_function_body(
     codegen_ctx.emit_nonreentrant_lock(func_t)
 
     # Function body
-    for stmt in func_ast.body:
-        Stmt(stmt, codegen_ctx).lower()
+    with builder.ctx.block_scope(f"external {func_t.name}"):
+        for stmt in func_ast.body:
+            Stmt(stmt, codegen_ctx).lower()
 
     # If no explicit return, add stop/return
     if not builder.is_terminated():
@@ -988,8 +989,9 @@ def _generate_common_function_body(
     codegen_ctx.emit_nonreentrant_lock(func_t)
 
     # Function body
-    for stmt in func_ast.body:
-        Stmt(stmt, codegen_ctx).lower()
+    with builder.ctx.block_scope(f"external {func_t.name}"):
+        for stmt in func_ast.body:
+            Stmt(stmt, codegen_ctx).lower()
 
     # If no explicit return, add stop/return
     if not builder.is_terminated():
@@ -1218,8 +1220,9 @@ def _generate_fallback_body(
     codegen_ctx.emit_nonreentrant_lock(func_t)
 
     # Function body
-    for stmt in func_ast.body:
-        Stmt(stmt, codegen_ctx).lower()
+    with builder.ctx.block_scope(f"external {func_t.name}"):
+        for stmt in func_ast.body:
+            Stmt(stmt, codegen_ctx).lower()
 
     # Exit
     if not builder.is_terminated():
@@ -1318,8 +1321,9 @@ def _generate_internal_function(
     codegen_ctx.emit_nonreentrant_lock(func_t)
 
     # Function body
-    for stmt in func_ast.body:
-        Stmt(stmt, codegen_ctx).lower()
+    with ir_ctx.block_scope(fn_label):
+        for stmt in func_ast.body:
+            Stmt(stmt, codegen_ctx).lower()
 
     # Default return if not terminated
     if not builder.is_terminated():
@@ -1,53 +1,85 @@
+from __future__ import annotations
+
+import contextlib
+import functools
+import importlib
+import warnings
 from pathlib import Path
-from typing import Callable, Dict, Optional
+from typing import TYPE_CHECKING, Callable, ContextManager, Dict, Optional
 
-import vyper.codegen.core as codegen
-import vyper.compiler.output as output
-from vyper.compiler.input_bundle import FileInput, InputBundle, JSONInput, PathLike
-from vyper.compiler.phases import CompilerData
 from vyper.compiler.settings import Settings, anchor_settings, get_global_settings
 from vyper.typing import OutputFormats, StorageLayout
 
-OUTPUT_FORMATS = {
-    # requires vyper_module
-    "ast_dict": output.build_ast_dict,
-    # requires annotated_vyper_module
-    "annotated_ast_dict": output.build_annotated_ast_dict,
-    "layout": output.build_layout_output,
-    "devdoc": output.build_devdoc,
-    "userdoc": output.build_userdoc,
-    "archive": output.build_archive,
-    "archive_b64": output.build_archive_b64,
-    "integrity": output.build_integrity,
-    "solc_json": output.build_solc_json,
-    # requires ir_node
-    "external_interface": output.build_external_interface_output,
-    "interface": output.build_interface_output,
-    "cfg": output.build_cfg_output,
-    "cfg_runtime": output.build_cfg_runtime_output,
-    "ir": output.build_ir_output,
-    "ir_runtime": output.build_ir_runtime_output,
-    "ir_dict": output.build_ir_dict_output,
-    "ir_runtime_dict": output.build_ir_runtime_dict_output,
-    "method_identifiers": output.build_method_identifiers_output,
-    "metadata": output.build_metadata_output,
-    "settings_dict": output.build_settings_output,
-    # requires assembly
-    "abi": output.build_abi_output,
-    "asm": output.build_asm_output,
-    "asm_runtime": output.build_asm_runtime_output,
-    "source_map": output.build_source_map_output,
-    "source_map_runtime": output.build_source_map_runtime_output,
-    # requires bytecode
-    "bytecode": output.build_bytecode_output,
-    "bytecode_runtime": output.build_bytecode_runtime_output,
-    "blueprint_bytecode": output.build_blueprint_bytecode_output,
-    "opcodes": output.build_opcodes_output,
-    "opcodes_runtime": output.build_opcodes_runtime_output,
-    "symbol_map": output.build_symbol_map,
-    "symbol_map_runtime": output.build_symbol_map_runtime,
+if TYPE_CHECKING:
+    from vyper.compiler.cache import CompilationCache
+    from vyper.compiler.input_bundle import FileInput, InputBundle, JSONInput, PathLike
+    from vyper.compiler.phases import CompilerData
+
+# note: this package is imported by everything which uses one of its
+# submodules (e.g. `vyper.compiler.settings`), so anything beyond the
+# settings is imported on first use. the names below are resolved by
+# `__getattr__()`.
+_LAZY_ATTRS = {
+    "CompilerData": "vyper.compiler.phases",
+    "CompilationCache": "vyper.compiler.cache",
+    "FileInput": "vyper.compiler.input_bundle",
+    "InputBundle": "vyper.compiler.input_bundle",
+    "JSONInput": "vyper.compiler.input_bundle",
+    "PathLike": "vyper.compiler.input_bundle",
 }
 
+
+def __getattr__(name):
+    if name == "OUTPUT_FORMATS":
+        return _output_formats()
+    if name in _LAZY_ATTRS:
+        return getattr(importlib.import_module(_LAZY_ATTRS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@functools.cache
+def _output_formats() -> dict[str, Callable]:
+    import vyper.compiler.output as output
+
+    return {
+        "ast_dict": output.build_ast_dict,
+        "annotated_ast_dict": output.build_annotated_ast_dict,
+        "layout": output.build_layout_output,
+        "devdoc": output.build_devdoc,
+        "userdoc": output.build_userdoc,
+        "archive": output.build_archive,
+        "archive_b64": output.build_archive_b64,
+        "integrity": output.build_integrity,
+        "solc_json": output.build_solc_json,
+        "external_interface": output.build_external_interface_output,
+        "interface": output.build_interface_output,
+        "cfg": output.build_cfg_output,
+        "cfg_runtime": output.build_cfg_runtime_output,
+        "ir": output.build_ir_output,
+        "ir_runtime": output.build_ir_runtime_output,
+        "ir_dict": output.build_ir_dict_output,
+        "ir_runtime_dict": output.build_ir_runtime_dict_output,
+        "method_identifiers": output.build_method_identifiers_output,
+        "metadata": output.build_metadata_output,
+        "settings_dict": output.build_settings_output,
+        "profile": output.build_profile_output,
+        "venom_pass_stats": output.build_venom_pass_stats_output,
+        "abi": output.build_abi_output,
+        "gas_estimates": output.build_gas_estimates_output,
+        "asm": output.build_asm_output,
+        "asm_runtime": output.build_asm_runtime_output,
+        "source_map": output.build_source_map_output,
+        "source_map_runtime": output.build_source_map_runtime_output,
+        "bytecode": output.build_bytecode_output,
+        "bytecode_runtime": output.build_bytecode_runtime_output,
+        "blueprint_bytecode": output.build_blueprint_bytecode_output,
+        "opcodes": output.build_opcodes_output,
+        "opcodes_runtime": output.build_opcodes_runtime_output,
+        "symbol_map": output.build_symbol_map,
+        "symbol_map_runtime": output.build_symbol_map_runtime,
+    }
+
+
 INTERFACE_OUTPUT_FORMATS = [
     "ast_dict",
     "annotated_ast_dict",
@@ -69,6 +101,7 @@ def compile_from_file_input(
     no_bytecode_metadata: bool = False,
     show_gas_estimates: bool = False,
     exc_handler: Optional[Callable] = None,
+    cache: Optional[CompilationCache] = None,
 ) -> dict:
     """
     Main entry point into the compiler.
@@ -100,12 +133,17 @@ def compile_from_file_input(
         Do not add metadata to bytecode. Defaults to False
     experimental_codegen: bool
         Use experimental codegen. Defaults to False
+    cache: CompilationCache, optional
+        Persistent cache to fetch outputs from (and store them to). On a
+        cache hit, semantic analysis and code generation are skipped.
 
     Returns
     -------
     Dict
         Compiler output as `{'output key': "output data"}`
     """
+    from vyper.compiler.phases import CompilerData
+
     settings = settings or get_global_settings() or Settings()
 
     compiler_data = CompilerData(
@@ -118,22 +156,63 @@ def compile_from_file_input(
         no_bytecode_metadata=no_bytecode_metadata,
     )
 
-    return outputs_from_compiler_data(compiler_data, output_formats, exc_handler)
+    return outputs_from_compiler_data(compiler_data, output_formats, exc_handler, cache)
 
 
 def outputs_from_compiler_data(
     compiler_data: CompilerData,
     output_formats: Optional[OutputFormats] = None,
     exc_handler: Optional[Callable] = None,
+    cache: Optional[CompilationCache] = None,
 ):
+    from vyper.compiler.cache import CachedWarning
+    from vyper.semantics.analysis.imports import get_parse_cache
+
     if output_formats is None:
         output_formats = ("bytecode",)
 
-    ret = {}
+    output_fns = _output_formats()
+    ret: dict = {}
+
+    def _handle_exc(exc):
+        if exc_handler is not None:
+            exc_handler(str(compiler_data.file_input.path), exc)
+        else:
+            raise exc
+
+    cache_key = None
+    cached: dict = {}
+    if cache is not None:
+        # share parsed modules across compiler invocations as well
+        get_parse_cache(compiler_data.input_bundle).persistent = cache
+        try:
+            # note: this has to happen before the imports are resolved
+            deps_key = cache.get_dependencies_key(compiler_data)
+            # fast path: if none of the dependencies changed, the cache
+            # key is known without parsing anything
+            cache_key = cache.load_dependencies(deps_key, compiler_data)
+            if cache_key is not None:
+                cached = cache.load(cache_key)
+            if cache_key is None or any(f not in cached for f in output_formats):
+                cache_key = cache.get_key(compiler_data)
+                cached = cache.load(cache_key)
+                cache.store_dependencies(deps_key, compiler_data, cache_key)
+        except Exception as exc:
+            _handle_exc(exc)
+            return ret
+
+    # outputs computed in this call, for populating the cache
+    to_store = {}
+
+    settings_ctx: ContextManager = contextlib.nullcontext()
+    if any(f not in cached for f in output_formats):
+        # (a complete cache hit does not even need to look at the
+        # settings pragmas in the source)
+        settings_ctx = anchor_settings(compiler_data.settings)
 
-    with anchor_settings(compiler_data.settings):
+    with settings_ctx:
         for output_format in output_formats:
-            if output_format not in OUTPUT_FORMATS:
+            if output_format not in output_fns:
                 raise ValueError(f"Unsupported format type {repr(output_format)}")
 
             is_vyi = compiler_data.file_input.resolved_path.suffix == ".vyi"
@@ -142,14 +221,30 @@ def outputs_from_compiler_data(
                     f"Unsupported format for compiling interface: {repr(output_format)}"
                 )
 
+            if output_format in cached:
+                ret[output_format], cached_warnings = cached[output_format]
+                for w in cached_warnings:
+                    w.emit()
+                continue
+
             try:
-                formatter = OUTPUT_FORMATS[output_format]
-                ret[output_format] = formatter(compiler_data)
+                formatter = output_fns[output_format]
+                if cache_key is None:
+                    ret[output_format] = formatter(compiler_data)
+                    continue
+
+                # record warnings so they can be replayed on a cache hit
+                with warnings.catch_warnings(record=True) as caught_warnings:
+                    ret[output_format] = formatter(compiler_data)
+                ws = [CachedWarning.from_warning_message(w) for w in caught_warnings]
+                for w in ws:
+                    w.emit()
+                to_store[output_format] = (ret[output_format], ws)
             except Exception as exc:
-                if exc_handler is not None:
-                    exc_handler(str(compiler_data.file_input.path), exc)
-                else:
-                    raise exc
+                _handle_exc(exc)
+
+    if cache is not None and cache_key is not None and to_store:
+        cache.store(cache_key, to_store)
 
     return ret
 
@@ -168,6 +263,8 @@ def compile_code(
     code. This was previously the main entry point into the compiler
     # (`compile_from_file_input()` is newer)
     """
+    from vyper.compiler.input_bundle import FileInput
+
     if isinstance(contract_path, str):
         contract_path = Path(contract_path)
     file_input = FileInput(
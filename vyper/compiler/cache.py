@@ -0,0 +1,383 @@
+import dataclasses
+import json
+import os
+import pickle
+import stat
+import tempfile
+import time
+import warnings
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
+
+import vyper
+from vyper.ast import serialization
+from vyper.compiler.input_bundle import CompilerInput
+from vyper.evm.opcodes import DEFAULT_EVM_VERSION
+from vyper.utils import sha256sum
+
+if TYPE_CHECKING:
+    from vyper.compiler.phases import CompilerData
+
+"""
+persistent, content-addressed cache for compiler outputs.
+
+entries are keyed on everything which can influence the output of a
+compilation: the integrity sum of the contract (which covers the contract
+source, all of its imports and any storage layout override), the resolved
+settings, the evm version and the compiler version. computing the key only
+requires parsing and import resolution, so a cache hit skips semantic
+analysis, codegen and the optimizers entirely.
+
+the cache also remembers which files each contract depends on (every file
+lookup made during import resolution, with its result). if replaying those
+lookups gives the same files with the same contents, the key is known
+without parsing anything, so a contract is only re-parsed, re-analyzed and
+re-compiled when it or one of its dependencies changed.
+
+parsed modules are stored as well (in the format of
+`vyper.ast.serialization`, together with the warnings emitted while parsing
+them), so that libraries which are shared between contracts, or which did
+not change, are not parsed again.
+
+entries are pickled, and unpickling can run arbitrary code, so the cache
+directory is trusted: whoever can write to it can run code as the user of
+the compiler. the directory is created private to the current user, and
+an entry is only read if it, its directory and the cache directory are
+owned by the current user and not writable by anyone else.
+"""
+
+VYPER_CACHE_DIR = os.environ.get("VYPER_CACHE_DIR")
+
+# default eviction policy: 512MiB total, entries unused for 30 days
+DEFAULT_MAX_SIZE = int(os.environ.get("VYPER_CACHE_MAX_SIZE", 512 * 1024 * 1024))
+DEFAULT_MAX_AGE = int(os.environ.get("VYPER_CACHE_MAX_AGE", 30 * 24 * 60 * 60))
+
+# bump this whenever the layout of a cache entry changes
+CACHE_FORMAT_VERSION = 2
+
+# output formats which are plain data and do not depend on the identity
+# of in-memory compiler objects, so they can be safely round-tripped
+# through the cache.
+CACHEABLE_FORMATS = frozenset(
+    (
+        "abi",
+        "asm",
+        "asm_runtime",
+        "bytecode",
+        "bytecode_runtime",
+        "blueprint_bytecode",
+        "devdoc",
+        "external_interface",
+        "interface",
+        "ir_dict",
+        "ir_runtime_dict",
+        "layout",
+        "metadata",
+        "method_identifiers",
+        "opcodes",
+        "opcodes_runtime",
+        "source_map",
+        "source_map_runtime",
+        "symbol_map",
+        "symbol_map_runtime",
+        "userdoc",
+    )
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class CachedWarning:
+    # a warning emitted while producing a cached output, so that it can be
+    # re-emitted on a cache hit.
+    category: type
+    message: str
+    filename: str
+    lineno: int
+
+    @classmethod
+    def from_warning_message(cls, w: warnings.WarningMessage) -> "CachedWarning":
+        return cls(w.category, str(w.message), w.filename, w.lineno)
+
+    def emit(self) -> None:
+        warnings.warn_explicit(
+            self.category(self.message), self.category, self.filename, self.lineno
+        )
+
+
+class CompilationCache:
+    """
+    On-disk cache of compiler outputs.
+
+    Each entry is a single file holding the outputs computed so far for one
+    cache key. Eviction is explicit (see `prune()`) so that it only walks
+    the cache directory once per compiler invocation.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | Path,
+        max_size: int = DEFAULT_MAX_SIZE,
+        max_age: int = DEFAULT_MAX_AGE,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_size = max_size
+        self.max_age = max_age
+
+    def get_key(self, compiler_data: "CompilerData") -> str:
+        # note: computing the integrity sum parses the contract and resolves
+        # its imports, but does not run semantic analysis.
+        settings = compiler_data.settings
+        import_analysis = compiler_data.resolved_imports
+
+        # source ids leak into the outputs (e.g. source maps), so they
+        # are part of the key as well.
+        source_ids = sorted(
+            (str(c.resolved_path), c.source_id) for c in import_analysis.compiler_inputs
+        )
+
+        settings_dict = settings.as_dict()
+        if settings_dict.get("venom_flags") is not None:
+            # does not change the output
+            settings_dict["venom_flags"].pop("fn_pass_jobs", None)
+
+        key_data = {
+            "format_version": CACHE_FORMAT_VERSION,
+            "compiler_version": vyper.__long_version__,
+            "integrity_sum": compiler_data.integrity_sum,
+            "settings": settings_dict,
+            "evm_version": settings.evm_version or DEFAULT_EVM_VERSION,
+            "path": str(compiler_data.contract_path),
+            "source_id": compiler_data.source_id,
+            "import_source_ids": source_ids,
+            "show_gas_estimates": compiler_data.show_gas_estimates,
+            "no_bytecode_metadata": compiler_data.no_bytecode_metadata,
+        }
+        return sha256sum(json.dumps(key_data, sort_keys=True, default=str))
+
+    def get_dependencies_key(self, compiler_data: "CompilerData") -> str:
+        """
+        Compute the key under which the dependencies of a contract are
+        stored. Unlike `get_key()`, this does not look at the imports of
+        the contract, so it must be called before they are resolved.
+        """
+        file_input = compiler_data.file_input
+        input_bundle = compiler_data.input_bundle
+        settings = compiler_data.original_settings
+        layout = compiler_data.storage_layout_override
+        source_ids, _ = input_bundle.snapshot_source_ids()
+
+        key_data = {
+            "format_version": CACHE_FORMAT_VERSION,
+            "compiler_version": vyper.__long_version__,
+            "settings": settings.as_dict() if settings is not None else None,
+            "path": str(file_input.path),
+            "resolved_path": str(file_input.resolved_path),
+            "source_id": file_input.source_id,
+            "sha256sum": file_input.sha256sum,
+            "storage_layout": layout.sha256sum if layout is not None else None,
+            "expected_integrity_sum": compiler_data.expected_integrity_sum,
+            "show_gas_estimates": compiler_data.show_gas_estimates,
+            "no_bytecode_metadata": compiler_data.no_bytecode_metadata,
+            # the state of the input bundle determines the source ids
+            # handed out during import resolution
+            "input_bundle": type(input_bundle).__name__,
+            "search_paths": [str(p) for p in input_bundle.search_paths],
+            "source_ids": sorted((str(k), v) for (k, v) in source_ids.items()),
+            # module paths in the output are relative to the cwd
+            "cwd": os.getcwd(),
+        }
+        return sha256sum(json.dumps(key_data, sort_keys=True, default=str))
+
+    def load_dependencies(self, deps_key: str, compiler_data: "CompilerData") -> Optional[str]:
+        """
+        Replay the file lookups recorded under `deps_key`. If they all
+        resolve to the same files with the same contents, return the cache
+        key of the contract, otherwise return None.
+
+        On success, the source ids of the dependencies are assigned exactly
+        as import resolution would assign them; on failure, the input bundle
+        is left untouched.
+        """
+        entry = self._read_entry(deps_key)
+        if entry is None:
+            return None
+
+        input_bundle = compiler_data.input_bundle
+        snapshot = input_bundle.snapshot_source_ids()
+        try:
+            for search_paths, path, expected in entry["dependencies"]:
+                with input_bundle.temporary_search_paths(search_paths):
+                    try:
+                        file = input_bundle.load_file(path)
+                    except FileNotFoundError:
+                        file = None
+                if _describe_file(file) != expected:
+                    input_bundle.restore_source_ids(snapshot)
+                    return None
+        except Exception:
+            input_bundle.restore_source_ids(snapshot)
+            return None
+
+        return entry["key"]
+
+    def store_dependencies(self, deps_key: str, compiler_data: "CompilerData", key: str) -> None:
+        expected_integrity_sum = compiler_data.expected_integrity_sum
+        if expected_integrity_sum not in (None, compiler_data.integrity_sum):
+            # the mismatch warning must be raised on every compilation
+            return
+
+        history = compiler_data.resolved_imports.load_history
+        dependencies = [
+            (search_paths, path, _describe_file(file)) for (search_paths, path, file) in history
+        ]
+        self._write_entry(deps_key, {"key": key, "dependencies": dependencies})
+
+    def _module_key(self, parse_key: tuple) -> str:
+        key_data = {
+            "format_version": CACHE_FORMAT_VERSION,
+            "compiler_version": vyper.__long_version__,
+            "module": parse_key,
+        }
+        return sha256sum(json.dumps(key_data, sort_keys=True, default=str))
+
+    def load_module(self, parse_key: tuple) -> Optional[tuple[bytes, list[CachedWarning]]]:
+        """
+        Fetch the pickled AST of the module parsed under `parse_key` (see
+        `ParseCache.parse()`) and the warnings emitted while parsing it, or
+        None on a cache miss.
+        """
+        entry = self._read_entry(self._module_key(parse_key))
+        if entry is None or "module" not in entry:
+            return None
+        try:
+            return serialization.unpack(entry["module"]), entry["warnings"]
+        except ValueError:
+            return None
+
+    def store_module(
+        self, parse_key: tuple, pickled_module: bytes, module_warnings: list[CachedWarning]
+    ) -> None:
+        entry = {"module": serialization.pack(pickled_module), "warnings": module_warnings}
+        self._write_entry(self._module_key(parse_key), entry)
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / key
+
+    def _read_file(self, key: str) -> Optional[bytes]:
+        path = self._entry_path(key)
+        try:
+            if not _is_private(self.cache_dir) or not _is_private(path.parent):
+                return None
+            with path.open("rb") as f:
+                if not _is_private(os.fstat(f.fileno())):
+                    return None
+                data = f.read()
+        except OSError:
+            return None
+
+        # bump mtime so that eviction is least-recently-used
+        try:
+            os.utime(path)
+        except OSError:  # pragma: nocover
+            pass
+
+        return data
+
+    def _read_entry(self, key: str) -> Optional[dict]:
+        data = self._read_file(key)
+        if data is None:
+            return None
+        try:
+            entry = pickle.loads(data)
+        except Exception:
+            # corrupted or truncated entry, treat it as a miss.
+            # (a bad entry will be overwritten on the next store.)
+            return None
+
+        if not isinstance(entry, dict) or entry.get("version") != CACHE_FORMAT_VERSION:
+            return None
+
+        return entry
+
+    def _write_entry(self, key: str, entry: dict) -> None:
+        entry = {"version": CACHE_FORMAT_VERSION, **entry}
+        self._write_file(key, pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def _write_file(self, key: str, data: bytes) -> None:
+        path = self._entry_path(key)
+        self.cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+        path.parent.mkdir(mode=0o700, exist_ok=True)
+
+        # write to a temporary file and rename, so that concurrent readers
+        # never observe a partially written entry
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def load(self, key: str) -> dict[str, tuple[Any, list[CachedWarning]]]:
+        """
+        Fetch the outputs stored under `key`. Returns an empty dict on a
+        cache miss (including when the entry is unreadable).
+        """
+        entry = self._read_entry(key)
+        if entry is None or "outputs" not in entry:
+            return {}
+        return entry["outputs"]
+
+    def store(self, key: str, outputs: dict[str, tuple[Any, list[CachedWarning]]]) -> None:
+        outputs = {k: v for (k, v) in outputs.items() if k in CACHEABLE_FORMATS}
+        if not outputs:
+            return
+
+        # merge with whatever is already there, so that entries accumulate
+        # output formats across invocations
+        existing = self.load(key)
+        self._write_entry(key, {"outputs": {**existing, **outputs}})
+
+    def prune(self) -> None:
+        """
+        Evict entries older than `max_age` seconds, then evict the least
+        recently used entries until the cache is smaller than `max_size`.
+        """
+        if not self.cache_dir.is_dir():
+            return
+
+        now = time.time()
+        entries = []
+        for path in self.cache_dir.glob("*/*"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:  # pragma: nocover
+                # concurrently evicted
+                continue
+            if now - st.st_mtime > self.max_age:
+                path.unlink(missing_ok=True)
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+
+        total_size = sum(size for (_, size, _) in entries)
+        # oldest first
+        for _, size, path in sorted(entries, key=lambda t: t[0]):
+            if total_size <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            total_size -= size
+
+
+def _is_private(path: Path | os.stat_result) -> bool:
+    # whether only the current user can have written `path`
+    st = path if isinstance(path, os.stat_result) else path.stat()
+    if hasattr(os, "getuid") and st.st_uid != os.getuid():
+        return False
+    return st.st_mode & (stat.S_IWGRP | stat.S_IWOTH) == 0
+
+
+def _describe_file(file: Optional[CompilerInput]) -> Optional[tuple[str, str, int]]:
+    if file is None:
+        return None
+    return str(file.resolved_path), file.sha256sum, file.source_id
@@ -119,6 +119,17 @@ class InputBundle:
 
         return self._source_ids[resolved_path]
 
+    # save and restore the source id assignments, so that callers can
+    # load files speculatively without affecting the source ids handed
+    # out to later loads.
+    def snapshot_source_ids(self) -> tuple[dict[PathLike, int], int]:
+        return self._source_ids.copy(), self._source_id_counter
+
+    def restore_source_ids(self, snapshot: tuple[dict[PathLike, int], int]) -> None:
+        source_ids, counter = snapshot
+        self._source_ids = source_ids.copy()
+        self._source_id_counter = counter
+
     def load_file(self, path: PathLike | str) -> FileInput:
         # search path precedence
         tried = []
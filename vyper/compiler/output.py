@@ -1,19 +1,18 @@
 import base64
+import itertools
+import json
 from collections import deque
 from pathlib import PurePath
-from typing import Iterable
+from typing import IO, Iterable, Iterator
 
 import vyper.ast as vy_ast
 from vyper.ast.utils import ast_to_dict
-from vyper.codegen.ir_node import IRnode
-from vyper.codegen_venom.calling_convention import pass_via_stack, returns_stack_count
 from vyper.compiler.output_bundle import SolcJSONWriter, VyperArchiveWriter
 from vyper.compiler.phases import CompilerData
+from vyper.compiler.profiler import Profiler
 from vyper.compiler.utils import build_gas_estimates
 from vyper.evm import opcodes
-from vyper.evm.assembler.symbols import resolve_symbols
 from vyper.exceptions import VyperException
-from vyper.ir import compile_ir
 from vyper.semantics.types.function import ContractFunctionT, FunctionVisibility, StateMutability
 from vyper.semantics.types.user import ErrorT, EventT
 from vyper.typing import StorageLayout
@@ -197,6 +196,8 @@ def build_ir_output(compiler_data: CompilerData):
     if compiler_data.settings.experimental_codegen:
         return compiler_data.venom_deploytime
     if compiler_data.show_gas_estimates:
+        from vyper.codegen.ir_node import IRnode
+
         IRnode.repr_show_gas = True
     return compiler_data.ir_nodes
 
@@ -205,11 +206,15 @@ def build_ir_runtime_output(compiler_data: CompilerData):
     if compiler_data.settings.experimental_codegen:
         return compiler_data.venom_runtime
     if compiler_data.show_gas_estimates:
+        from vyper.codegen.ir_node import IRnode
+
         IRnode.repr_show_gas = True
     return compiler_data.ir_runtime
 
 
 def _ir_to_dict(ir_node):
+    from vyper.codegen.ir_node import IRnode
+
     # Currently only supported with IRnode and not VenomIR
     if not isinstance(ir_node, IRnode):
         return
@@ -231,6 +236,66 @@ def build_settings_output(compiler_data: CompilerData) -> dict:
     return compiler_data.settings.as_dict()
 
 
+def _fresh_compiler_data(compiler_data: CompilerData) -> CompilerData:
+    # a copy of `compiler_data` with none of the phases computed yet, for
+    # outputs which instrument the compilation itself
+    return CompilerData(
+        compiler_data.file_input,
+        compiler_data.input_bundle,
+        settings=compiler_data.original_settings,
+        integrity_sum=compiler_data.expected_integrity_sum,
+        storage_layout=compiler_data.storage_layout_override,
+        show_gas_estimates=compiler_data.show_gas_estimates,
+        no_bytecode_metadata=compiler_data.no_bytecode_metadata,
+    )
+
+
+def build_profile_output(compiler_data: CompilerData) -> dict:
+    # profile a fresh compilation of the contract, so that every phase
+    # gets measured even if it was already computed for another format
+    fresh = _fresh_compiler_data(compiler_data)
+
+    profiler = Profiler()
+    with profiler.profile():
+        # run the phases in pipeline order, so that each one shows up at
+        # the top level instead of nested in the phase which needed it first
+        _ = fresh.settings  # parses the contract
+        _ = fresh.resolved_imports
+        _ = fresh.compilation_target
+        _ = fresh.storage_layout
+        if fresh.settings.experimental_codegen:
+            _ = fresh.venom_runtime
+        else:
+            _ = fresh.ir_nodes
+        _ = fresh.bytecode_runtime
+        _ = fresh.bytecode
+
+    return profiler.as_dict()
+
+
+def build_venom_pass_stats_output(compiler_data: CompilerData) -> dict:
+    if not compiler_data.settings.experimental_codegen:
+        raise ValueError("venom_pass_stats output requires --experimental-codegen")
+
+    from vyper.venom.pass_stats import PassStatsCollector
+
+    fresh = _fresh_compiler_data(compiler_data)
+
+    runtime_stats = PassStatsCollector()
+    with runtime_stats.collect():
+        _ = fresh.venom_runtime
+
+    # the deploy code embeds the runtime bytecode, compute it outside
+    # of the collector
+    _ = fresh.bytecode_runtime
+
+    deploy_stats = PassStatsCollector()
+    with deploy_stats.collect():
+        _ = fresh.venom_deploytime
+
+    return {"runtime": runtime_stats.as_dict(), "deploy": deploy_stats.as_dict()}
+
+
 def build_metadata_output(compiler_data: CompilerData) -> dict:
     # need ir info to be computed
     _ = compiler_data.function_signatures
@@ -274,6 +339,8 @@ def build_metadata_output(compiler_data: CompilerData) -> dict:
         ret["function_id"] = func_t._function_id
 
         if func_t.is_internal and compiler_data.settings.experimental_codegen:
+            from vyper.codegen_venom.calling_convention import pass_via_stack, returns_stack_count
+
             pass_via_stack_dict = pass_via_stack(func_t)
             pass_via_stack_list = [
                 arg for (arg, is_stack_arg) in pass_via_stack_dict.items() if is_stack_arg
@@ -314,7 +381,9 @@ def build_method_identifiers_output(compiler_data: CompilerData) -> dict:
 def build_abi_output(compiler_data: CompilerData) -> list:
     module_t = compiler_data.annotated_vyper_module._metadata["type"]
     if not compiler_data.annotated_vyper_module.is_interface:
-        _ = compiler_data.ir_runtime  # ensure _ir_info is generated
+        # the abi only needs semantic analysis, but still reject modules
+        # which cannot be compiled on their own
+        _ = compiler_data.compilation_target
 
     abi = module_t.to_toplevel_abi_dict()
     if module_t.init_function:
@@ -322,7 +391,11 @@ def build_abi_output(compiler_data: CompilerData) -> list:
 
     if compiler_data.show_gas_estimates:
         # Add gas estimates for each function to ABI
-        gas_estimates = build_gas_estimates(compiler_data.function_signatures)
+        if compiler_data.settings.experimental_codegen:
+            venom_estimates = compiler_data.venom_gas_estimates
+            gas_estimates = {k: v.worst for k, v in venom_estimates.items()}
+        else:
+            gas_estimates = build_gas_estimates(compiler_data.function_signatures)
         for func in abi:
             try:
                 func_signature = func["name"]
@@ -337,6 +410,20 @@ def build_abi_output(compiler_data: CompilerData) -> list:
     return abi
 
 
+def build_gas_estimates_output(compiler_data: CompilerData) -> dict:
+    if compiler_data.settings.experimental_codegen:
+        return {k: v.as_dict() for k, v in compiler_data.venom_gas_estimates.items()}
+
+    # the legacy IR only has an upper bound of the gas of each function
+    _ = compiler_data.function_signatures
+    module_t = compiler_data.global_ctx
+    fn_ts = {fn_t.name: fn_t for fn_t in module_t.exposed_functions}
+    return {
+        k: {"worst": v, "typical": None, "unknown_loop_trips": None}
+        for k, v in build_gas_estimates(fn_ts).items()
+    }
+
+
 def build_asm_output(compiler_data: CompilerData) -> str:
     return _build_asm(compiler_data.assembly)
 
@@ -352,26 +439,39 @@ def build_layout_output(compiler_data: CompilerData) -> StorageLayout:
 
 
 def _build_asm(asm_list):
-    output_string = "__entry__:"
+    return "".join(_iter_asm(asm_list))
+
+
+def write_asm(f: IO[str], asm_list: list) -> None:
+    """
+    Write the assembly listing of `asm_list` to the file object `f`, one
+    instruction at a time, instead of building it as one string.
+    """
+    for chunk in _iter_asm(asm_list):
+        f.write(chunk)
+
+
+def _iter_asm(asm_list) -> Iterator[str]:
+    from vyper.ir import compile_ir
+
+    yield "__entry__:"
     in_push = 0
     for item in asm_list:
         if isinstance(item, (compile_ir.Label, compile_ir.DataHeader)):
-            output_string += f"\n\n{item}:"
+            yield f"\n\n{item}:"
             continue
 
         if in_push > 0:
             assert isinstance(item, int), item
-            output_string += hex(item)[2:].rjust(2, "0")
+            yield hex(item)[2:].rjust(2, "0")
             in_push -= 1
         else:
-            output_string += f"\n    {item}"
+            yield f"\n    {item}"
 
             if isinstance(item, str) and item.startswith("PUSH") and item != "PUSH0":
                 assert in_push == 0
                 in_push = int(item[4:])
-                output_string += " 0x"
-
-    return output_string
+                yield " 0x"
 
 
 def _build_node_identifier(ast_node):
@@ -383,7 +483,7 @@ def _getpos(node):
     return (node.lineno, node.col_offset, node.end_lineno, node.end_col_offset)
 
 
-def _build_source_map_output(compiler_data, bytecode, pc_maps):
+def _build_source_map_output(compiler_data, bytecode, pc_maps, compress=True):
     """
     Generate source map output in various formats. Note that integrations
     are encouraged to use pc_ast_map since the information it provides is
@@ -405,8 +505,9 @@ def _build_source_map_output(compiler_data, bytecode, pc_maps):
 
     pc_pos_map = {k: _getpos(v) for (k, v) in ast_map.items()}
     node_id_map = {k: _build_node_identifier(v) for (k, v) in ast_map.items()}
-    compressed_map = _compress_source_map(ast_map, out["pc_jump_map"], len(bytecode))
-    out["pc_pos_map_compressed"] = compressed_map
+    if compress:
+        compressed_map = _compress_source_map(ast_map, out["pc_jump_map"], len(bytecode))
+        out["pc_pos_map_compressed"] = compressed_map
     out["pc_pos_map"] = pc_pos_map
     out["pc_ast_map"] = node_id_map
     # hint to consumers what the fields in pc_ast_map mean
@@ -426,42 +527,80 @@ def build_source_map_runtime_output(compiler_data: CompilerData) -> dict:
     return _build_source_map_output(compiler_data, bytecode, source_map)
 
 
+def write_source_map_output(f: IO[str], compiler_data: CompilerData, runtime: bool) -> None:
+    """
+    Write the `source_map` (or `source_map_runtime`) output as JSON to the
+    file object `f`, streaming `pc_pos_map_compressed` into it instead of
+    building it as one string.
+    """
+    if runtime:
+        assembly, source_map = compiler_data.assembly_runtime, compiler_data.source_map_runtime
+    else:
+        assembly, source_map = compiler_data.assembly, compiler_data.source_map
+    out = _build_source_map_output(compiler_data, None, source_map, compress=False)
+
+    # split the keys around the compressed map, in the order of
+    # `_build_source_map_output()`. (the compressed map is plain ascii,
+    # so it does not need to be escaped)
+    keys = list(out)
+    ix = keys.index("pc_pos_map")
+    head = json.dumps({k: out[k] for k in keys[:ix]})
+    tail = json.dumps({k: out[k] for k in keys[ix:]})
+    f.write(f'{head[:-1]}, "pc_pos_map_compressed": "')
+    write_compressed_source_map(f, assembly, compiler_data.annotated_vyper_module)
+    f.write(f'", {tail[1:]}')
+
+
 # generate a solidity-style source map. this functionality is deprecated
 # in favor of pc_ast_map, and may not be maintained to the same level
 # as pc_ast_map.
 def _compress_source_map(ast_map, jump_map, bytecode_size):
-    ret = []
+    assert all(pc < bytecode_size for pc in ast_map), ast_map
+    assert all(pc < bytecode_size for pc in jump_map), jump_map
 
-    jump_map = jump_map.copy()
-    ast_map = ast_map.copy()
+    entries = ((ast_map.get(pc), jump_map.get(pc)) for pc in range(bytecode_size))
+    return "".join(_iter_compressed_source_map(entries))
 
-    for pc in range(bytecode_size):
-        if pc in ast_map:
-            ast_node = ast_map.pop(pc)
-            # ast_node.src conveniently has the current position in
-            # the correct, compressed format
-            current_pos = [ast_node.src]
-        else:
-            current_pos = ["-1:-1:-1"]
 
-        if pc in jump_map:
-            jump_type = jump_map.pop(pc)
-            current_pos.append(jump_type)
+def write_compressed_source_map(f: IO[str], assembly: list, root_node: vy_ast.VyperNode) -> None:
+    """
+    Write the compressed source map of `assembly` to the file object `f`,
+    one pc at a time, without building the source map of the whole
+    program. `root_node` is used for pc 0 if no other node is attached to
+    it.
+    """
+    from vyper.evm.assembler.symbols import iter_source_map
+
+    entries = iter_source_map(assembly)
+    ast_node, jump_type = next(entries)
+    entries = itertools.chain([(ast_node or root_node, jump_type)], entries)
+    for chunk in _iter_compressed_source_map(entries):
+        f.write(chunk)
 
-        ret.append(":".join(str(i) for i in current_pos))
 
-    assert len(ast_map) == 0, ast_map
-    assert len(jump_map) == 0, jump_map
+def _iter_compressed_source_map(entries) -> Iterator[str]:
+    # `entries` are the AST node and the jump type of each pc, in order
+    for pc, (ast_node, jump_type) in enumerate(entries):
+        if pc > 0:
+            yield ";"
 
-    return ";".join(ret)
+        # ast_node.src conveniently has the current position in
+        # the correct, compressed format
+        yield ast_node.src if ast_node is not None else "-1:-1:-1"
+        if jump_type is not None:
+            yield f":{jump_type}"
 
 
 def build_symbol_map(compiler_data: CompilerData) -> dict[str, int]:
+    from vyper.evm.assembler.symbols import resolve_symbols
+
     sym, _, _ = resolve_symbols(compiler_data.assembly)
     return {k.label: v for (k, v) in sym.items()}
 
 
 def build_symbol_map_runtime(compiler_data: CompilerData) -> dict[str, int]:
+    from vyper.evm.assembler.symbols import resolve_symbols
+
     sym, _, _ = resolve_symbols(compiler_data.assembly_runtime)
     return {k.label: v for (k, v) in sym.items()}
 
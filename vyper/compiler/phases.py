@@ -1,14 +1,11 @@
-import copy
 from functools import cached_property
 from pathlib import Path, PurePath
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Optional
 
-import vyper.codegen.core as codegen
 from vyper import ast as vy_ast
 from vyper.ast import natspec
-from vyper.codegen import module
-from vyper.codegen.ir_node import IRnode
 from vyper.compiler.input_bundle import FileInput, FilesystemInputBundle, InputBundle, JSONInput
+from vyper.compiler.profiler import profile_phase
 from vyper.compiler.settings import (
     OptimizationLevel,
     Settings,
@@ -16,17 +13,22 @@ from vyper.compiler.settings import (
     merge_settings,
     should_run_legacy_optimizer,
 )
-from vyper.ir import compile_ir, optimizer
 from vyper.semantics import analyze_modules, set_data_positions, validate_compilation_target
 from vyper.semantics.analysis.data_positions import generate_layout_export
-from vyper.semantics.analysis.imports import resolve_imports
+from vyper.semantics.analysis.imports import get_parse_cache, resolve_imports
 from vyper.semantics.types.function import ContractFunctionT
 from vyper.semantics.types.module import ModuleT
 from vyper.typing import StorageLayout
 from vyper.utils import ERC5202_PREFIX, sha256sum
-from vyper.venom import generate_assembly_experimental
 from vyper.warnings import VyperWarning, vyper_warn
 
+if TYPE_CHECKING:
+    from vyper.codegen.ir_node import IRnode
+
+# note: codegen, the optimizers and the assembler are imported by the
+# phases which need them, so that outputs which only need the frontend
+# (e.g. `-f abi`) do not pay for importing the backend.
+
 DEFAULT_CONTRACT_PATH = PurePath("VyperContract.vy")
 
 
@@ -116,21 +118,28 @@ class CompilerData:
 
     @cached_property
     def vyper_module(self):
-        is_vyi = self.contract_path.suffix == ".vyi"
+        # the unannotated module, e.g. for `-f ast`. this is a separate
+        # copy from `_root_module`, which is only made when requested.
+        return self._parse()
 
-        ast = vy_ast.parse_to_ast(
-            self.source_code,
-            self.source_id,
-            module_path=self.contract_path.as_posix(),
-            resolved_path=self.file_input.resolved_path.as_posix(),
-            is_interface=is_vyi,
-        )
-
-        return ast
+    @cached_property
+    def _root_module(self) -> vy_ast.Module:
+        # the module which goes through import resolution and semantic
+        # analysis, and gets annotated in place.
+        return self._parse()
+
+    def _parse(self) -> vy_ast.Module:
+        # note: parses are cached on the input bundle, so this is cheap
+        # to call more than once, and every call returns a fresh copy.
+        is_vyi = self.contract_path.suffix == ".vyi"
+        parse_cache = get_parse_cache(self.input_bundle)
+        with profile_phase("parse"):
+            return parse_cache.parse(self.file_input, self.contract_path.as_posix(), is_vyi)
 
     @cached_property
     def settings(self):
-        settings = self.vyper_module.settings
+        # (the pragmas are not touched by analysis)
+        settings = self._root_module.settings
 
         if self.original_settings:
             og_settings = self.original_settings
@@ -157,10 +166,11 @@ class CompilerData:
 
     @cached_property
     def _resolve_imports(self):
-        # deepcopy so as to not interfere with `-f ast` output
-        vyper_module = copy.deepcopy(self.vyper_module)
-        with self.input_bundle.search_path(Path(vyper_module.resolved_path).parent):
-            imports = resolve_imports(vyper_module, self.input_bundle)
+        # note: not `vyper_module`, so as to not interfere with `-f ast`
+        vyper_module = self._root_module
+        with profile_phase("import_resolution"):
+            with self.input_bundle.search_path(Path(vyper_module.resolved_path).parent):
+                imports = resolve_imports(vyper_module, self.input_bundle)
 
         # check integrity sum
         integrity_sum = self._compute_integrity_sum(imports._integrity_sum)
@@ -188,8 +198,9 @@ class CompilerData:
     @cached_property
     def _annotate(self) -> tuple[natspec.NatspecOutput, vy_ast.Module]:
         root_module, imports, _ = self._resolve_imports
-        analyze_modules(imports)
-        nspec = natspec.parse_natspec(root_module)
+        with profile_phase("semantic_analysis"):
+            analyze_modules(imports)
+            nspec = natspec.parse_natspec(root_module)
         return nspec, root_module
 
     @cached_property
@@ -217,9 +228,9 @@ class CompilerData:
         storage_layout = None
         if self.storage_layout_override is not None:
             storage_layout = self.storage_layout_override.data
-        set_data_positions(module_ast, storage_layout)
-
-        return generate_layout_export(module_ast)
+        with profile_phase("storage_layout"):
+            set_data_positions(module_ast, storage_layout)
+            return generate_layout_export(module_ast)
 
     @property
     def global_ctx(self) -> ModuleT:
@@ -235,12 +246,12 @@ class CompilerData:
         return generate_ir_nodes(self.global_ctx, self.settings)
 
     @property
-    def ir_nodes(self) -> IRnode:
+    def ir_nodes(self) -> "IRnode":
         ir, ir_runtime = self._ir_output
         return ir
 
     @property
-    def ir_runtime(self) -> IRnode:
+    def ir_runtime(self) -> "IRnode":
         ir, ir_runtime = self._ir_output
         return ir_runtime
 
@@ -258,16 +269,30 @@ class CompilerData:
         assert self.settings.experimental_codegen
         from vyper.codegen_venom import generate_venom_runtime
 
-        return generate_venom_runtime(self.global_ctx, self.settings)
+        global_ctx = self.global_ctx
+        with profile_phase("venom_runtime"):
+            return generate_venom_runtime(global_ctx, self.settings)
+
+    @cached_property
+    def venom_gas_estimates(self) -> dict:
+        from vyper.compiler.utils import build_venom_gas_estimates
+
+        venom_runtime = self.venom_runtime
+        with profile_phase("gas_estimates"):
+            return build_venom_gas_estimates(venom_runtime, self.global_ctx)
 
     @cached_property
     def venom_deploytime(self):
         assert self.settings.experimental_codegen
         from vyper.codegen_venom import generate_venom_deploy
 
-        return generate_venom_deploy(
-            self.global_ctx, self.settings, self.bytecode_runtime, self.bytecode_metadata
-        )
+        global_ctx = self.global_ctx
+        bytecode_runtime = self.bytecode_runtime
+        bytecode_metadata = self.bytecode_metadata
+        with profile_phase("venom_deploytime"):
+            return generate_venom_deploy(
+                global_ctx, self.settings, bytecode_runtime, bytecode_metadata
+            )
 
     @cached_property
     def assembly(self) -> list:
@@ -276,20 +301,28 @@ class CompilerData:
             metadata = bytes.fromhex(self.integrity_sum)
 
         if self.settings.experimental_codegen:
+            from vyper.venom import generate_assembly_experimental
+
             assert self.settings.optimize is not None  # mypy hint
-            return generate_assembly_experimental(
-                self.venom_deploytime, optimize=self.settings.optimize
-            )
+            venom_deploytime = self.venom_deploytime
+            with profile_phase("assembly"):
+                return generate_assembly_experimental(
+                    venom_deploytime, optimize=self.settings.optimize
+                )
         else:
-            return generate_assembly(
-                self.ir_nodes, self.settings.optimize, compiler_metadata=metadata
-            )
+            ir_nodes = self.ir_nodes
+            with profile_phase("assembly"):
+                return generate_assembly(
+                    ir_nodes, self.settings.optimize, compiler_metadata=metadata
+                )
 
     @cached_property
     def bytecode_metadata(self) -> Optional[bytes]:
         if self.no_bytecode_metadata:
             return None
 
+        from vyper.ir import compile_ir
+
         runtime_asm = self.assembly_runtime
         runtime_data_segment_lengths = compile_ir.get_data_segment_lengths(runtime_asm)
 
@@ -304,16 +337,24 @@ class CompilerData:
     @cached_property
     def assembly_runtime(self) -> list:
         if self.settings.experimental_codegen:
+            from vyper.venom import generate_assembly_experimental
+
             assert self.settings.optimize is not None  # mypy hint
-            return generate_assembly_experimental(
-                self.venom_runtime, optimize=self.settings.optimize
-            )
+            venom_runtime = self.venom_runtime
+            with profile_phase("assembly_runtime"):
+                return generate_assembly_experimental(
+                    venom_runtime, optimize=self.settings.optimize
+                )
         else:
-            return generate_assembly(self.ir_runtime, self.settings.optimize)
+            ir_runtime = self.ir_runtime
+            with profile_phase("assembly_runtime"):
+                return generate_assembly(ir_runtime, self.settings.optimize)
 
     @cached_property
     def _bytecode(self) -> tuple[bytes, dict[str, Any]]:
-        return generate_bytecode(self.assembly)
+        assembly = self.assembly
+        with profile_phase("bytecode"):
+            return generate_bytecode(assembly)
 
     @property
     def bytecode(self) -> bytes:
@@ -325,7 +366,9 @@ class CompilerData:
 
     @cached_property
     def _bytecode_runtime(self) -> tuple[bytes, dict[str, Any]]:
-        return generate_bytecode(self.assembly_runtime)
+        assembly_runtime = self.assembly_runtime
+        with profile_phase("bytecode_runtime"):
+            return generate_bytecode(assembly_runtime)
 
     @property
     def bytecode_runtime(self) -> bytes:
@@ -346,7 +389,7 @@ class CompilerData:
         return deploy_bytecode + blueprint_bytecode
 
 
-def generate_ir_nodes(global_ctx: ModuleT, settings: Settings) -> tuple[IRnode, IRnode]:
+def generate_ir_nodes(global_ctx: ModuleT, settings: Settings) -> tuple["IRnode", "IRnode"]:
     """
     Generate the intermediate representation (IR) from the contextualized AST.
 
@@ -366,21 +409,26 @@ def generate_ir_nodes(global_ctx: ModuleT, settings: Settings) -> tuple[IRnode,
         IR to generate deployment bytecode
         IR to generate runtime bytecode
     """
+    import vyper.codegen.core as codegen
+    from vyper.codegen import module
+    from vyper.ir import optimizer
+
     # make IR output the same between runs
     codegen.reset_names()
 
-    with anchor_settings(settings):
+    with anchor_settings(settings), profile_phase("ir_generation"):
         ir_nodes, ir_runtime = module.generate_ir_for_module(global_ctx)
 
     if should_run_legacy_optimizer(settings):
-        ir_nodes = optimizer.optimize(ir_nodes)
-        ir_runtime = optimizer.optimize(ir_runtime)
+        with profile_phase("legacy_optimizer"):
+            ir_nodes = optimizer.optimize(ir_nodes)
+            ir_runtime = optimizer.optimize(ir_runtime)
 
     return ir_nodes, ir_runtime
 
 
 def generate_assembly(
-    ir_nodes: IRnode,
+    ir_nodes: "IRnode",
     optimize: Optional[OptimizationLevel] = None,
     compiler_metadata: Optional[Any] = None,
 ) -> list:
@@ -397,6 +445,8 @@ def generate_assembly(
     list
         List of assembly instructions.
     """
+    from vyper.ir import compile_ir
+
     optimize = optimize or OptimizationLevel.default()
     assembly = compile_ir.compile_to_assembly(
         ir_nodes, optimize=optimize, compiler_metadata=compiler_metadata
@@ -428,4 +478,7 @@ def generate_bytecode(assembly: list) -> tuple[bytes, dict[str, Any]]:
     dict
         Source map
     """
-    return compile_ir.assembly_to_evm(assembly)
+    from vyper.ir import compile_ir
+
+    with profile_phase("assembly_to_evm"):
+        return compile_ir.assembly_to_evm(assembly)
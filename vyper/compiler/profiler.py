@@ -0,0 +1,106 @@
+import contextlib
+import time
+import tracemalloc
+from typing import Iterator, Optional
+
+"""
+instrumentation for finding out where the compiler spends time and memory.
+
+phases of the compiler are wrapped in `profile_phase()`, which does nothing
+unless a `Profiler` is active. phases form a tree: a phase entered while
+another one is running is recorded as its child. a phase which is entered
+more than once under the same parent (e.g. a venom pass which runs several
+times) is aggregated into a single node.
+"""
+
+
+class _Phase:
+    def __init__(self):
+        self.count = 0
+        # wall time in seconds
+        self.time = 0.0
+        # peak traced memory in bytes, relative to the start of the phase
+        self.peak_memory = 0
+        self.children: dict[str, "_Phase"] = {}
+
+    def as_dict(self) -> dict:
+        ret: dict = {"count": self.count, "time": self.time, "peak_memory": self.peak_memory}
+        if self.children:
+            ret["children"] = {name: c.as_dict() for (name, c) in self.children.items()}
+        return ret
+
+
+class Profiler:
+    def __init__(self, trace_memory: bool = True):
+        # tracing memory allocations slows down the compiler, turn it off
+        # when only the timings are of interest
+        self.trace_memory = trace_memory
+        self.root = _Phase()
+        self._stack = [self.root]
+        # running peak of traced memory for each phase on the stack
+        self._peaks = [0]
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        parent = self._stack[-1]
+        if name not in parent.children:
+            parent.children[name] = _Phase()
+        node = parent.children[name]
+
+        # the peak so far belongs to the parent, reset it so that we can
+        # measure the peak of this phase
+        self._peaks[-1] = max(self._peaks[-1], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        start_memory = tracemalloc.get_traced_memory()[0]
+
+        self._stack.append(node)
+        self._peaks.append(start_memory)
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            node.time += time.perf_counter() - start_time
+            node.count += 1
+
+            self._stack.pop()
+            peak = max(self._peaks.pop(), tracemalloc.get_traced_memory()[1])
+            node.peak_memory = max(node.peak_memory, peak - start_memory)
+            self._peaks[-1] = max(self._peaks[-1], peak)
+
+    @contextlib.contextmanager
+    def profile(self) -> Iterator[None]:
+        """
+        Activate the profiler, and trace memory allocations (unless
+        `trace_memory` is off) for the duration of the context.
+        """
+        global _profiler
+
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+
+        prev_profiler = _profiler
+        _profiler = self
+        try:
+            with self.phase("total"):
+                yield
+        finally:
+            _profiler = prev_profiler
+            if started_tracing:
+                tracemalloc.stop()
+
+    def as_dict(self) -> dict:
+        return self.root.as_dict().get("children", {})
+
+
+_profiler: Optional[Profiler] = None
+
+
+@contextlib.contextmanager
+def profile_phase(name: str) -> Iterator[None]:
+    if _profiler is None:
+        yield
+        return
+
+    with _profiler.phase(name):
+        yield
@@ -82,10 +82,20 @@ class VenomOptimizationFlags:
     disable_mem2var: bool = False
     disable_simplify_cfg: bool = False
     disable_remove_unused_variables: bool = False
+    disable_licm: bool = False
+    disable_pre: bool = False
 
     # Tuning parameters
     inline_threshold: Optional[int] = None
 
+    # Execution profile (see `vyper.venom.execution_profile`), to favor the hot
+    # functions and branches.
+    execution_profile: Optional[dict] = None
+
+    # Number of processes to run the per-function pass pipelines on.
+    # Does not change the output.
+    fn_pass_jobs: int = 1
+
     def __post_init__(self):
         # Set default optimization level if not provided
         if self.level is None:
@@ -256,8 +266,9 @@ def merge_settings(
     venom_one = getattr(one, "venom_flags", None)
     venom_two = getattr(two, "venom_flags", None)
 
-    # Pick the venom_flags that matches the merged optimize level, if any
-    merged_optimize = values.get("optimize")
+    # Pick the venom_flags that matches the merged optimize level, if any.
+    # (if no level was given, the default level is used)
+    merged_optimize = values.get("optimize", OptimizationLevel.default())
     if venom_two and venom_two.level == merged_optimize:
         values["venom_flags"] = venom_two
     elif venom_one and venom_one.level == merged_optimize:
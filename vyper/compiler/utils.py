@@ -1,7 +1,14 @@
-from typing import Dict
+import re
+from typing import TYPE_CHECKING, Dict, Optional
 
 from vyper.semantics.types.function import ContractFunctionT
 
+if TYPE_CHECKING:
+    from vyper.semantics.types.module import ModuleT
+    from vyper.venom.basicblock import IRLabel
+    from vyper.venom.context import IRContext
+    from vyper.venom.function import IRFunction
+
 
 def build_gas_estimates(func_ts: Dict[str, ContractFunctionT]) -> dict:
     # note: `.gas_estimate` is added to ContractFunctionT._ir_info
@@ -12,6 +19,87 @@ def build_gas_estimates(func_ts: Dict[str, ContractFunctionT]) -> dict:
     return ret
 
 
+def build_venom_gas_estimates(ctx: "IRContext", module_t: "ModuleT") -> dict:
+    """
+    Estimate the gas of each external function from the (optimized) venom
+    runtime code.
+
+    Returns
+    -------
+    Dict
+        `GasEstimate` of each function, by name. The estimate of a function
+        with default arguments is the maximum over its method ids.
+    """
+    from vyper.venom.gas_estimate import GasEstimate, GasEstimator
+
+    fn = ctx.entry_function
+    assert fn is not None
+
+    # note: the dispatcher enters each external function through the block
+    # `{n}_match_{method_id:08x}` (or `entry_{method_id:08x}` with a dense
+    # jumptable), unless the optimizer merged the entry points of functions
+    # with the same body.
+    entry_points = {}
+    for bb in fn.get_basic_blocks():
+        m = _ENTRY_POINT_LABEL.match(bb.label.value)
+        if m is not None:
+            entry_points[int(m.group(1) or m.group(2), 16)] = bb.label
+
+    estimator = GasEstimator(ctx)
+    ret = {}
+    for fn_t in module_t.exposed_functions:
+        estimates = []
+        for method_id in fn_t.method_ids.values():
+            label = entry_points.get(method_id) or _find_selector_check(fn, method_id)
+            if label is not None:
+                estimates.append(estimator.estimate(fn, label))
+        if len(estimates) > 0:
+            ret[fn_t.name] = GasEstimate(
+                max(e.worst for e in estimates),
+                max(e.typical for e in estimates),
+                any(e.unknown_loop_trips for e in estimates),
+            )
+    return ret
+
+
+_ENTRY_POINT_LABEL = re.compile(r"^\d+_match_([0-9a-f]{8})$|^entry_([0-9a-f]{8})$")
+
+
+def _find_selector_check(fn: "IRFunction", method_id: int) -> Optional["IRLabel"]:
+    # find the target of the selector check for `method_id`, i.e.
+    # `jnz iszero(iszero(xor %selector, <method_id>)), @next, @match`
+    from vyper.venom.basicblock import IRLiteral
+
+    for bb in fn.get_basic_blocks():
+        term = bb.last_instruction
+        if term.opcode != "jnz":
+            continue
+
+        producers = {out: inst for inst in bb.instructions for out in inst.get_outputs()}
+
+        def resolve(op):
+            while op in producers and producers[op].opcode == "assign":
+                op = producers[op].operands[0]
+            return op
+
+        cond, if_nonzero, if_zero = term.operands
+        match_if_nonzero = False
+        inst = producers.get(resolve(cond))
+        while inst is not None and inst.opcode == "iszero":
+            match_if_nonzero = not match_if_nonzero
+            inst = producers.get(resolve(inst.operands[0]))
+        if inst is None or inst.opcode not in ("xor", "eq"):
+            continue
+        if IRLiteral(method_id) not in [resolve(op) for op in inst.operands]:
+            continue
+
+        if inst.opcode == "eq":
+            match_if_nonzero = not match_if_nonzero
+        return if_nonzero if match_if_nonzero else if_zero
+
+    return None
+
+
 def expand_source_map(compressed_map: str) -> list:
     """
     Expand a compressed source map string.
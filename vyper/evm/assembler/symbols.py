@@ -1,4 +1,4 @@
-from typing import Any, TypeVar
+from typing import Any, Iterator, Optional, TypeVar
 
 from vyper.evm.assembler.instructions import (
     CONST,
@@ -49,15 +49,10 @@ def resolve_symbols(
     }
 
     symbol_map: dict[Label, int] = {}
-    const_map: dict[CONSTREF, int] = {}
 
     pc: int = 0
 
-    # resolve constants
-    for item in assembly:
-        if isinstance(item, CONST):
-            # should this be merged into the symbol map?
-            _add_to_symbol_map(const_map, CONSTREF(item.name), item.value)
+    const_map = _resolve_constants(assembly)
 
     # resolve labels (i.e. JUMPDEST locations) to actual code locations,
     # and simultaneously build the source map.
@@ -66,65 +61,17 @@ def resolve_symbols(
         note_line_num(source_map, pc, item)
 
         # update pc_jump_map
-        if item == "JUMP":
-            assert i != 0  # otherwise we can get assembly[-1]
-            last = assembly[i - 1]
-            if isinstance(last, PUSHLABEL) and last.label.label.startswith("internal"):
-                if last.label.label.endswith("cleanup"):
-                    # exit an internal function
-                    source_map["pc_jump_map"][pc] = "o"
-                else:
-                    # enter an internal function
-                    source_map["pc_jump_map"][pc] = "i"
-            else:
-                # everything else
-                source_map["pc_jump_map"][pc] = "-"
-        elif item in ("JUMPI", "JUMPDEST"):
-            source_map["pc_jump_map"][pc] = "-"
-
-        if item == "DEBUG":
-            continue  # "debug" opcode does not go into bytecode
-
-        if isinstance(item, CONST):
-            continue  # CONST declarations do not go into bytecode
+        if (jump_type := _jump_type(assembly, i)) is not None:
+            source_map["pc_jump_map"][pc] = jump_type
 
-        # update pc
         if isinstance(item, Label):
             _add_to_symbol_map(symbol_map, item, pc)
-            pc += 1  # jumpdest
-
         elif isinstance(item, DataHeader):
-            # Don't increment pc as the symbol itself doesn't go into code
+            # the symbol itself doesn't go into code
             _add_to_symbol_map(symbol_map, item.label, pc)
 
-        elif isinstance(item, PUSHLABEL):
-            pc += SYMBOL_SIZE + 1  # PUSH2 highbits lowbits
-
-        elif isinstance(item, PUSH_OFST):
-            assert isinstance(item.ofst, int), item
-            # [PUSH_OFST, (Label foo), bar] -> PUSH2 (foo+bar)
-            # [PUSH_OFST, _mem_foo, bar] -> PUSHN (foo+bar)
-            if isinstance(item.label, Label):
-                pc += SYMBOL_SIZE + 1  # PUSH2 highbits lowbits
-            elif isinstance(item.label, CONSTREF):
-                const = const_map[item.label]
-                val = const + item.ofst
-                pc += calc_push_size(val)
-            else:  # pragma: nocover
-                raise CompilerPanic(f"invalid ofst {item.label}")
-
-        elif isinstance(item, DATA_ITEM):
-            if isinstance(item.data, Label):
-                pc += SYMBOL_SIZE
-            else:
-                assert isinstance(item.data, bytes)
-                pc += len(item.data)
-        elif isinstance(item, int):
-            assert 0 <= item < 256
-            pc += 1
-        else:
-            assert isinstance(item, str) and item in get_opcodes(), item
-            pc += 1
+        # update pc
+        pc += _instruction_size(item, const_map)
 
     source_map["breakpoints"] = list(source_map["breakpoints"])
     source_map["pc_breakpoints"] = list(source_map["pc_breakpoints"])
@@ -135,6 +82,116 @@ def resolve_symbols(
     return symbol_map, const_map, source_map
 
 
+def _resolve_constants(assembly: list[AssemblyInstruction]) -> dict[CONSTREF, int]:
+    const_map: dict[CONSTREF, int] = {}
+    for item in assembly:
+        if isinstance(item, CONST):
+            _add_to_symbol_map(const_map, CONSTREF(item.name), item.value)
+    return const_map
+
+
+def _jump_type(assembly: list[AssemblyInstruction], i: int) -> Optional[str]:
+    # the jump type of `assembly[i]` for the source map, if it is a jump
+    item = assembly[i]
+    if item == "JUMP":
+        assert i != 0  # otherwise we can get assembly[-1]
+        last = assembly[i - 1]
+        if isinstance(last, PUSHLABEL) and last.label.label.startswith("internal"):
+            if last.label.label.endswith("cleanup"):
+                # exit an internal function
+                return "o"
+            # enter an internal function
+            return "i"
+        # everything else
+        return "-"
+    if item in ("JUMPI", "JUMPDEST"):
+        return "-"
+    return None
+
+
+def _instruction_size(item: AssemblyInstruction, const_map: dict[CONSTREF, int]) -> int:
+    # the number of bytes which `item` takes up in the bytecode
+    if item == "DEBUG":
+        return 0  # "debug" opcode does not go into bytecode
+
+    if isinstance(item, CONST):
+        return 0  # CONST declarations do not go into bytecode
+
+    if isinstance(item, Label):
+        return 1  # jumpdest
+
+    if isinstance(item, DataHeader):
+        # the symbol itself doesn't go into code
+        return 0
+
+    if isinstance(item, PUSHLABEL):
+        return SYMBOL_SIZE + 1  # PUSH2 highbits lowbits
+
+    if isinstance(item, PUSH_OFST):
+        assert isinstance(item.ofst, int), item
+        # [PUSH_OFST, (Label foo), bar] -> PUSH2 (foo+bar)
+        # [PUSH_OFST, _mem_foo, bar] -> PUSHN (foo+bar)
+        if isinstance(item.label, Label):
+            return SYMBOL_SIZE + 1  # PUSH2 highbits lowbits
+        if isinstance(item.label, CONSTREF):
+            const = const_map[item.label]
+            val = const + item.ofst
+            return calc_push_size(val)
+        raise CompilerPanic(f"invalid ofst {item.label}")  # pragma: nocover
+
+    if isinstance(item, DATA_ITEM):
+        if isinstance(item.data, Label):
+            return SYMBOL_SIZE
+        assert isinstance(item.data, bytes)
+        return len(item.data)
+
+    if isinstance(item, int):
+        assert 0 <= item < 256
+        return 1
+
+    assert isinstance(item, str) and item in get_opcodes(), item
+    return 1
+
+
+def _source_node(item: AssemblyInstruction):
+    # the AST node which `item` was generated from, if any
+    if isinstance(item, TaggedInstruction):  # type: ignore
+        if (ast_node := item.ast_source) is not None:
+            ast_node = ast_node.get_original_node()
+            if hasattr(ast_node, "node_id"):
+                return ast_node
+    return None
+
+
+def iter_source_map(assembly: list[AssemblyInstruction]) -> Iterator[tuple[Any, Optional[str]]]:
+    """
+    Yield the AST node and the jump type of each pc in the bytecode, in
+    order, without building the source map of the whole program. These
+    are the entries of `pc_raw_ast_map` and `pc_jump_map` from
+    `resolve_symbols()` (`None` where a pc has no entry).
+    """
+    const_map = _resolve_constants(assembly)
+
+    # instructions which do not take up any space share the pc of the
+    # next instruction, so accumulate the entry until the pc moves.
+    ast_node: Any = None
+    jump_type: Optional[str] = "-"  # (like `pc_jump_map`, which starts with pc 0)
+    for i, item in enumerate(assembly):
+        if (node := _source_node(item)) is not None:
+            ast_node = node
+        if (jump := _jump_type(assembly, i)) is not None:
+            jump_type = jump
+
+        size = _instruction_size(item, const_map)
+        if size == 0:
+            continue
+
+        yield ast_node, jump_type
+        for _ in range(size - 1):
+            yield None, None
+        ast_node, jump_type = None, None
+
+
 def note_line_num(line_number_map, pc, item):
     # Record AST attached to pc
     if isinstance(item, TaggedInstruction):  # type: ignore
@@ -7,6 +7,7 @@ from typing import Any, Optional
 import cbor2
 
 from vyper.codegen.ir_node import IRnode
+from vyper.compiler.profiler import profile_phase
 from vyper.compiler.settings import OptimizationLevel
 from vyper.evm.assembler.core import assembly_to_evm, get_data_segment_lengths
 from vyper.evm.assembler.instructions import (
@@ -140,7 +141,8 @@ def compile_to_assembly(
     res = _IRnodeLowerer(optimize, compiler_metadata).compile_to_assembly(code)
 
     if optimize != OptimizationLevel.NONE:
-        optimize_assembly(res)
+        with profile_phase("assembly_optimization"):
+            optimize_assembly(res)
     return res
 
 
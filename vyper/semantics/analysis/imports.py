@@ -1,9 +1,11 @@
 import contextlib
 import dataclasses as dc
 import json
+import pickle
+import warnings
 from dataclasses import asdict, dataclass
 from pathlib import Path, PurePath
-from typing import Any, Iterator, Optional
+from typing import TYPE_CHECKING, Any, Iterator, Optional
 
 import vyper.builtins.interfaces
 import vyper.builtins.stdlib
@@ -27,6 +29,9 @@ from vyper.exceptions import (
 from vyper.semantics.analysis.base import ImportInfo
 from vyper.utils import OrderedSet, safe_relpath, sha256sum
 
+if TYPE_CHECKING:
+    from vyper.compiler.cache import CachedWarning, CompilationCache
+
 """
 collect import statements and validate the import graph.
 this module is separated into its own pass so that we can resolve the import
@@ -101,6 +106,12 @@ class ImportAnalyzer:
         # bundle, we have access to the compiler input for each module
         self._compiler_inputs = {}
 
+        # every file lookup made while resolving imports, in order, along
+        # with its result (None if the file was not found). replaying it
+        # tells whether import resolution would still produce the same
+        # result, without parsing anything.
+        self._load_history: list[tuple[list[PathLike], PathLike, Optional[CompilerInput]]] = []
+
         self._integrity_sum = None
 
         # memoization for _calculate_integrity_sum_r. the import graph is
@@ -119,6 +130,10 @@ class ImportAnalyzer:
     def compiler_inputs(self) -> dict[CompilerInput, vy_ast.Module]:
         return self._compiler_inputs
 
+    @property
+    def load_history(self) -> list[tuple[list[PathLike], PathLike, Optional[CompilerInput]]]:
+        return self._load_history
+
     def _calculate_integrity_sum_r(self, module_ast: vy_ast.Module):
         if id(module_ast) in self._integrity_cache:
             return self._integrity_cache[id(module_ast)]
@@ -272,7 +287,14 @@ class ImportAnalyzer:
             search_paths = self.absolute_search_paths
 
         with self.input_bundle.temporary_search_paths(search_paths):
-            return self.input_bundle.load_file(path)
+            try:
+                ret = self.input_bundle.load_file(path)
+            except FileNotFoundError:
+                self._load_history.append((search_paths.copy(), path, None))
+                raise
+
+        self._load_history.append((search_paths.copy(), path, ret))
+        return ret
 
     def _ast_from_file(self, file: FileInput) -> vy_ast.Module:
         # cache ast if we have seen it before.
@@ -280,12 +302,83 @@ class ImportAnalyzer:
         # two ASTs produced from the same source
         ast_of = self._ast_of
         if file.source_id not in ast_of:
-            ast_of[file.source_id] = _parse_ast(file)
+            ast_of[file.source_id] = _parse_ast(file, get_parse_cache(self.input_bundle))
 
         return ast_of[file.source_id]
 
 
-def _parse_ast(file: FileInput) -> vy_ast.Module:
+class ParseCache:
+    """
+    Cache of parsed modules which is shared between all compilation
+    targets using the same input bundle.
+
+    Entries are stored pickled, so that every lookup returns a private
+    copy of the AST which the caller is free to annotate. Unpickling is
+    several times faster than parsing the source again.
+
+    If `persistent` is set, parsed modules are also stored in (and loaded
+    from) the on-disk compilation cache, so they are shared across
+    compiler invocations as well.
+    """
+
+    def __init__(self):
+        # pickled module and the warnings emitted while parsing it, which
+        # are emitted again on every hit
+        self._entries: dict[tuple, tuple[bytes, list["CachedWarning"]]] = {}
+        self.persistent: Optional[CompilationCache] = None
+
+    def __getstate__(self):
+        # don't send the entries along with the input bundle (e.g. to a
+        # worker process), they are only needed until imports are resolved
+        return {"_entries": {}, "persistent": self.persistent}
+
+    def parse(self, file: FileInput, module_path: str, is_interface: bool) -> vy_ast.Module:
+        from vyper.compiler.cache import CachedWarning
+
+        # note: source_id is a function of resolved_path within a bundle,
+        # and module_path depends on the cwd, so they are part of the key
+        # as well.
+        key = (file.resolved_path, file.sha256sum, file.source_id, module_path, is_interface)
+        if key not in self._entries and self.persistent is not None:
+            entry = self.persistent.load_module(key)
+            if entry is not None:
+                self._entries[key] = entry
+
+        if key in self._entries:
+            pickled, cached_warnings = self._entries[key]
+            for w in cached_warnings:
+                w.emit()
+            return pickle.loads(pickled)
+
+        # record warnings (e.g. deprecations) so they can be replayed on a
+        # cache hit
+        with warnings.catch_warnings(record=True) as caught_warnings:
+            ret = vy_ast.parse_to_ast(
+                file.source_code,
+                source_id=file.source_id,
+                module_path=module_path,
+                resolved_path=file.resolved_path.as_posix(),
+                is_interface=is_interface,
+            )
+        ws = [CachedWarning.from_warning_message(w) for w in caught_warnings]
+        for w in ws:
+            w.emit()
+
+        pickled = pickle.dumps(ret, protocol=pickle.HIGHEST_PROTOCOL)
+        self._entries[key] = (pickled, ws)
+        if self.persistent is not None:
+            self.persistent.store_module(key, pickled, ws)
+        return ret
+
+
+def get_parse_cache(input_bundle: InputBundle) -> ParseCache:
+    cache = input_bundle._cache
+    if not hasattr(cache, "parse_cache"):
+        cache.parse_cache = ParseCache()
+    return cache.parse_cache
+
+
+def _parse_ast(file: FileInput, parse_cache: Optional[ParseCache] = None) -> vy_ast.Module:
     module_path = file.resolved_path  # for error messages
     try:
         # try to get a relative path, to simplify the error message
@@ -299,6 +392,9 @@ def _parse_ast(file: FileInput) -> vy_ast.Module:
         pass
 
     is_interface = file.resolved_path.suffix == ".vyi"
+    if parse_cache is not None:
+        return parse_cache.parse(file, module_path.as_posix(), is_interface)
+
     ret = vy_ast.parse_to_ast(
         file.source_code,
         source_id=file.source_id,
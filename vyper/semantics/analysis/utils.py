@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import contextlib
 import itertools
-from typing import TYPE_CHECKING, Any, Callable, Iterable, List
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Callable, Iterable, List, Optional
 
 from vyper import ast as vy_ast
 from vyper.exceptions import (
@@ -62,6 +64,43 @@ def uses_state(var_accesses: Iterable[VarAccess]) -> bool:
     return any(s.variable.is_state_variable() for s in var_accesses)
 
 
+# candidate types for each class of literal node, see `_literal_types`
+_LITERAL_TYPES: dict[type, list] = {}
+
+
+def _literal_types(node_class: type) -> list:
+    # the primitive types which accept literals of `node_class`, in the
+    # order of `PRIMITIVE_TYPES`
+    ret = _LITERAL_TYPES.get(node_class)
+    if ret is None:
+        ret = [
+            t for t in types.PRIMITIVE_TYPES.values() if issubclass(node_class, t._valid_literal)
+        ]
+        _LITERAL_TYPES[node_class] = ret
+    return ret
+
+
+# number of type inferences per node, see `count_type_inference`
+_INFERENCE_COUNTS: Optional[Counter] = None
+
+
+@contextlib.contextmanager
+def count_type_inference():
+    """
+    Count how many times the possible types of each node are inferred
+    (i.e., not found in the node's cache) within the context.
+
+    Yields a `Counter` keyed on the ast nodes.
+    """
+    global _INFERENCE_COUNTS
+    prev = _INFERENCE_COUNTS
+    _INFERENCE_COUNTS = Counter()
+    try:
+        yield _INFERENCE_COUNTS
+    finally:
+        _INFERENCE_COUNTS = prev
+
+
 class _ExprAnalyser:
     """
     Node type-checker class.
@@ -165,6 +204,9 @@ class _ExprAnalyser:
         # try to return it if found.
         k = f"possible_types_from_node_{include_type_exprs}"
         if k not in node._metadata:
+            if _INFERENCE_COUNTS is not None:
+                _INFERENCE_COUNTS[node] += 1
+
             fn = self._find_fn(node)
             ret = fn(node)
 
@@ -308,17 +350,14 @@ class _ExprAnalyser:
     def types_from_Constant(self, node):
         # literal value (integer, string, etc)
         types_list = []
-        for t in types.PRIMITIVE_TYPES.values():
+        for t in _literal_types(type(node)):
             try:
-                # clarity and perf note: will be better to construct a
-                # map from node types to valid vyper types
-                if not isinstance(node, t._valid_literal):
-                    continue
-
                 # special handling for bytestrings since their
                 # class objects are in the type map, not the type itself
                 # (worth rethinking this design at some point.)
-                if t in (BytesT, StringT):
+                # note: compare by identity, `t in (BytesT, StringT)` goes
+                # through `VyperType.__eq__` for every candidate type.
+                if t is BytesT or t is StringT:
                     t = t.from_literal(node)
 
                 # any more validation which needs to occur
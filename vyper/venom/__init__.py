@@ -1,8 +1,10 @@
 # maybe rename this `main.py` or `venom.py`
 # (can have an `__init__.py` which exposes the API).
 
+import multiprocessing
 from typing import Any, Dict, List
 
+from vyper.compiler.profiler import profile_phase
 from vyper.compiler.settings import OptimizationLevel, VenomOptimizationFlags
 from vyper.ir.compile_ir import AssemblyInstruction
 from vyper.venom.analysis import IRGlobalAnalysesCache, ReadonlyMemoryArgsGlobalAnalysis
@@ -10,12 +12,15 @@ from vyper.venom.analysis.analysis import IRAnalysesCache
 from vyper.venom.analysis.fcg import FCGGlobalAnalysis
 from vyper.venom.check_venom import check_calling_convention, check_mem_ops, check_post_lowering
 from vyper.venom.context import IRContext
+from vyper.venom.execution_profile import ExecutionProfile
 from vyper.venom.function import IRFunction
 from vyper.venom.optimization_levels.O2 import PASSES_O2
 from vyper.venom.optimization_levels.O3 import PASSES_O3
 from vyper.venom.optimization_levels.Os import PASSES_Os
 from vyper.venom.optimization_levels.pass_order import validate_pass_order
 from vyper.venom.optimization_levels.types import PassConfig
+from vyper.venom.parallel import is_acyclic, run_fn_passes_parallel
+from vyper.venom.pass_stats import is_collecting, pass_stats
 from vyper.venom.passes import (
     CSE,
     SCCP,
@@ -28,7 +33,9 @@ from vyper.venom.passes import (
     FunctionInlinerPass,
     InternalReturnCopyForwardingPass,
     LoadElimination,
+    LoopInvariantCodeMotion,
     Mem2Var,
+    PartialRedundancyElimination,
     ReadonlyInvokeArgCopyForwardingPass,
     RemoveUnusedVariablesPass,
     SimplifyCFGPass,
@@ -79,6 +86,8 @@ PASS_FLAG_MAP = {
     CSE: "disable_cse",
     SimplifyCFGPass: "disable_simplify_cfg",
     AssertEliminationPass: "disable_assert_elimination",
+    LoopInvariantCodeMotion: "disable_licm",
+    PartialRedundancyElimination: "disable_pre",
 }
 
 
@@ -86,9 +95,11 @@ PassRunConfig = tuple[type[IRPass], dict[str, Any]]
 
 
 def _run_passes(fn: IRFunction, pass_pipeline: list[PassRunConfig], ac: IRAnalysesCache) -> None:
-    for pass_cls, kwargs in pass_pipeline:
-        pass_instance = pass_cls(ac, fn)
-        pass_instance.run_pass(**kwargs)
+    with profile_phase(str(fn.name)):
+        for pass_cls, kwargs in pass_pipeline:
+            pass_instance = pass_cls(ac, fn)
+            with profile_phase(pass_cls.__name__), pass_stats(fn, pass_cls.__name__, ac):
+                pass_instance.run_pass(**kwargs)
 
 
 def _normalize_pass_config(pass_config: PassConfig) -> PassRunConfig:
@@ -121,23 +132,27 @@ def _run_global_passes(
     ctx.global_analyses_cache = IRGlobalAnalysesCache(ctx, ir_analyses)
     ctx.global_analyses_cache.force_analysis(ReadonlyMemoryArgsGlobalAnalysis)
     # Clean unreachable blocks before passes that require dominator analysis
-    for fn in ctx.get_functions():
-        SimplifyCFGPass(ir_analyses[fn], fn).run_pass()
+    with profile_phase(SimplifyCFGPass.__name__):
+        for fn in ctx.get_functions():
+            SimplifyCFGPass(ir_analyses[fn], fn).run_pass()
     # Intentionally run invoke-copy forwarding twice in the full pipeline:
     # 1) here (pre-inlining) to shrink obvious frontend-emitted staging copies
     # 2) again in O2/O3/Os per-function pipelines to catch shapes created later.
     # Keep this note in sync with optimization_levels/* where the second run is listed.
-    for fn in ctx.get_functions():
-        InternalReturnCopyForwardingPass(ir_analyses[fn], fn).run_pass()
-        ReadonlyInvokeArgCopyForwardingPass(ir_analyses[fn], fn).run_pass()
+    with profile_phase("CopyForwarding"):
+        for fn in ctx.get_functions():
+            InternalReturnCopyForwardingPass(ir_analyses[fn], fn).run_pass()
+            ReadonlyInvokeArgCopyForwardingPass(ir_analyses[fn], fn).run_pass()
 
-    _run_pre_inline_dret_desugar(ctx, ir_analyses)
+    with profile_phase(DretDesugarPass.__name__):
+        _run_pre_inline_dret_desugar(ctx, ir_analyses)
     # the desugar rewrites callee bodies, so the readonly facts must be
     # recomputed before the inliner reads them
     ctx.global_analyses_cache.invalidate_analysis(ReadonlyMemoryArgsGlobalAnalysis)
 
     if not flags.disable_inlining:
-        FunctionInlinerPass(ir_analyses, ctx, flags).run_pass()
+        with profile_phase(FunctionInlinerPass.__name__):
+            FunctionInlinerPass(ir_analyses, ctx, flags).run_pass()
 
 
 def _run_pre_inline_dret_desugar(
@@ -156,10 +171,13 @@ def run_passes_on(ctx: IRContext, flags: VenomOptimizationFlags, disable_mem_che
     if not disable_mem_checks:
         check_mem_ops(ctx)
     check_calling_convention(ctx)
+    if flags.execution_profile is not None:
+        ctx.profile = ExecutionProfile.from_dict(flags.execution_profile, ctx.block_ids)
     for fn in ctx.functions.values():
         ir_analyses[fn] = IRAnalysesCache(fn)
 
-    _run_global_passes(ctx, flags, ir_analyses)
+    with profile_phase("global_passes"):
+        _run_global_passes(ctx, flags, ir_analyses)
 
     ctx.global_analyses_cache = None
     ir_analyses = {}
@@ -178,7 +196,23 @@ def run_passes_on(ctx: IRContext, flags: VenomOptimizationFlags, disable_mem_che
     ctx.global_analyses_cache.force_analysis(ReadonlyMemoryArgsGlobalAnalysis)
 
     pass_pipeline = _build_fn_pass_pipeline(flags)
-    _run_fn_passes(ctx, fcg, ctx.entry_function, pass_pipeline, ir_analyses)
+    with profile_phase("function_passes"):
+        # pass statistics are recorded in this process, so they need
+        # the serial pipeline. daemonic processes (e.g. `multiprocessing.Pool`
+        # workers) cannot start a process pool.
+        if (
+            flags.fn_pass_jobs > 1
+            and not is_collecting()
+            and not multiprocessing.current_process().daemon
+            and is_acyclic(fcg, list(ctx.functions.values()))
+        ):
+
+            def run_serial(fn: IRFunction) -> None:
+                _run_fn_passes_isolated(ctx, fn, pass_pipeline)
+
+            run_fn_passes_parallel(ctx, fcg, flags, run_serial)
+        else:
+            _run_fn_passes(ctx, fcg, ctx.entry_function, pass_pipeline, ir_analyses)
     ctx.global_analyses_cache = None
 
     # validate the frozen FMP calling convention (not debug-gated: this is
@@ -198,6 +232,16 @@ def _run_fn_passes(
     _run_fn_passes_r(ctx, fcg, ctx.entry_function, pass_pipeline, ir_analyses, visited)
 
 
+def _run_fn_passes_isolated(
+    ctx: IRContext, fn: IRFunction, pass_pipeline: list[PassRunConfig]
+) -> None:
+    # run the pipeline of one function with fresh analyses, for when the
+    # functions of the context were replaced (see `vyper.venom.parallel`)
+    ir_analyses = {f: IRAnalysesCache(f) for f in ctx.functions.values()}
+    ctx.global_analyses_cache = IRGlobalAnalysesCache(ctx, ir_analyses)
+    _run_passes(fn, pass_pipeline, ir_analyses[fn])
+
+
 def _run_fn_passes_r(
     ctx: IRContext,
     fcg: FCGGlobalAnalysis,
@@ -7,6 +7,7 @@ from .dynamic_memory import DynamicMemoryAnalysis, DynamicMemoryInfo
 from .fcg import FCGGlobalAnalysis
 from .liveness import LivenessAnalysis
 from .load_analysis import LoadAnalysis
+from .loop import LoopAnalysis, NaturalLoop
 from .mem_alias import MemoryAliasAnalysis
 from .mem_liveness import MemLivenessAnalysis
 from .mem_ssa import MemSSA
@@ -67,6 +67,10 @@ class IRAnalysesCache:
         self.analyses_cache = {}
         self.function = function
 
+        # bookkeeping for pass statistics
+        self.num_computed = 0
+        self.num_invalidated = 0
+
     def _ensure_global_analyses_cache(self) -> "IRGlobalAnalysesCache":
         global_cache = self.function.ctx.global_analyses_cache
         if global_cache is None:
@@ -104,6 +108,7 @@ class IRAnalysesCache:
         analysis = analysis_cls(self, self.function)
         self.analyses_cache[analysis_cls] = analysis
         analysis.analyze(*args, **kwargs)
+        self.num_computed += 1
 
         return analysis
 
@@ -121,6 +126,7 @@ class IRAnalysesCache:
         analysis = self.analyses_cache.pop(analysis_cls, None)
         if analysis is not None:
             analysis.invalidate()
+            self.num_invalidated += 1
 
     def force_analysis(self, analysis_cls: Type[T], *args, **kwargs) -> T:
         """
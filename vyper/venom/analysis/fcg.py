@@ -56,7 +56,36 @@ class FCGGlobalAnalysis(IRGlobalAnalysis):
     def get_unreachable_functions(self) -> list[IRFunction]:
         return [fn for fn in self.ctx.get_functions() if fn not in self._reachable]
 
+    def remove_inlined_function(self, fn: IRFunction, new_call_sites: list[IRInstruction]) -> None:
+        """
+        Update the call graph in place after `fn` was inlined into all of
+        its call sites and removed from the context, instead of recomputing
+        it. `new_call_sites` are the invokes which were copied from the body
+        of `fn` into its callers.
+        """
+        for call_site in self.call_sites.pop(fn, OrderedSet()):
+            self.callees[call_site.parent.parent].discard(fn)
+
+        for callee in self.callees.pop(fn, OrderedSet()):
+            # the call sites in the body of `fn` are gone
+            self.call_sites[callee] = OrderedSet(
+                inst for inst in self.call_sites[callee] if inst.parent.parent is not fn
+            )
+
+        for inst in new_call_sites:
+            label = inst.operands[0]
+            assert isinstance(label, IRLabel)
+            callee = self.ctx.get_function(label)
+            self.callees[inst.parent.parent].add(callee)
+            self.call_sites[callee].add(inst)
+
+        self._reachable.discard(fn)
+        self._invalidate_dependents()
+
     def invalidate(self):
+        self._invalidate_dependents()
+
+    def _invalidate_dependents(self):
         # Imported lazily to avoid an analysis-package import cycle.
         from vyper.venom.stack_safety import StackCleanupSafety
 
@@ -1,4 +1,6 @@
+from bisect import bisect_left
 from collections import deque
+from typing import Optional
 
 from vyper.exceptions import CompilerPanic
 from vyper.utils import OrderedSet
@@ -6,78 +8,223 @@ from vyper.venom.analysis.analysis import IRAnalysis
 from vyper.venom.analysis.cfg import CFGAnalysis
 from vyper.venom.basicblock import IRBasicBlock, IRInstruction, IROperand, IRVariable
 
+# per-edge phi translation, see `_phi_edge()`: the mask of all phi operands
+# in the target, and for each phi, the mask of its operands together with
+# the bit of the operand coming from the source
+_PhiEdge = tuple[int, list[tuple[int, int]]]
+
 
 class LivenessAnalysis(IRAnalysis):
     """
     Compute liveness information for each instruction in the function.
+
+    The fixpoint is computed over int bitsets (variables are numbered per
+    function), with one gen/kill summary per basic block. The ordered live
+    sets are only materialized afterwards: per block at the end of the
+    analysis, and per instruction lazily, when they are first requested.
+
+    The order of the live sets is significant (it drives stack layout), and
+    it is the order the instruction-by-instruction worklist algorithm used
+    to produce. Since that algorithm only compares live sets for set
+    equality, the order of a block can depend on the order in which blocks
+    were visited. To reproduce it exactly, the fixpoint records which block
+    was visited at each step, and the ordered sets are then replayed for
+    those steps which the final result depends on.
     """
 
     cfg: CFGAnalysis
 
     _out_vars: dict[IRBasicBlock, OrderedSet[IRVariable]]
-    inst_to_liveness: dict[IRInstruction, OrderedSet[IRVariable]]
+    _in_vars: dict[IRBasicBlock, OrderedSet[IRVariable]]
+    _inst_liveness: dict[IRInstruction, OrderedSet[IRVariable]]
+    _visited: set[IRBasicBlock]
 
     def analyze(self):
         self.cfg = self.analyses_cache.request_analysis(CFGAnalysis)
 
-        self._out_vars = {}
-        self.inst_to_liveness = {}
+        self._var_bits: dict[IRVariable, int] = {}
+        self._phi_edges: dict[tuple[IRBasicBlock, IRBasicBlock], Optional[_PhiEdge]] = {}
+
+        steps = self._compute_fixpoint()
+        self._replay_order(steps)
+
+        self._inst_liveness = {}
+
+    def _bit(self, var: IRVariable) -> int:
+        bit = self._var_bits.get(var)
+        if bit is None:
+            bit = 1 << len(self._var_bits)
+            self._var_bits[var] = bit
+        return bit
+
+    def _compute_fixpoint(self) -> list[IRBasicBlock]:
+        """
+        Run the liveness fixpoint over bitsets. Returns the blocks in the
+        order they were visited.
+        """
+        # gen/kill summary of each block, so that
+        # live_in = gen | (live_out & ~kill)
+        gen: dict[IRBasicBlock, int] = {}
+        kill: dict[IRBasicBlock, int] = {}
         for bb in self.function.get_basic_blocks():
-            self._out_vars[bb] = OrderedSet()
-            for inst in bb.instructions:
-                self.inst_to_liveness[inst] = OrderedSet()
+            g = k = 0
+            for inst in reversed(bb.instructions):
+                defs = 0
+                for var in inst.get_outputs():
+                    defs |= self._bit(var)
+                uses = 0
+                for var in inst.get_input_variables():
+                    uses |= self._bit(var)
+                g = (g & ~defs) | uses
+                k |= defs
+            gen[bb] = g
+            kill[bb] = k
+
+        out_bits: dict[IRBasicBlock, int] = {bb: 0 for bb in gen}
+        in_bits: dict[IRBasicBlock, int] = {bb: 0 for bb in gen}
 
+        steps: list[IRBasicBlock] = []
         worklist = deque(self.cfg.dfs_post_walk)
 
         while len(worklist) > 0:
-            changed = False
-
             bb = worklist.popleft()
-            changed |= self._calculate_out_vars(bb)
-            changed |= self._calculate_liveness(bb)
+            steps.append(bb)
+
+            out = 0
+            for out_bb in self.cfg.cfg_out(bb):
+                out |= self._input_bits_from(bb, out_bb, in_bits[out_bb])
+            live = gen[bb] | (out & ~kill[bb])
+
+            changed = out != out_bits[bb] or live != in_bits[bb]
+            out_bits[bb] = out
+            in_bits[bb] = live
             # recompute liveness for basic blocks pointing into
             # this basic block
             if changed:
                 worklist.extend(self.cfg.cfg_in(bb))
 
-    def _calculate_liveness(self, bb: IRBasicBlock) -> bool:
+        return steps
+
+    def _phi_edge(self, source: IRBasicBlock, target: IRBasicBlock) -> Optional[_PhiEdge]:
+        key = (source, target)
+        if key in self._phi_edges:
+            return self._phi_edges[key]
+
+        phis = self._get_phis(source, target)
+        if len(phis) == 0:
+            ret = None
+        else:
+            operand_to_phi_idx, phi_matching = self._phi_mapping(source, phis)
+            masks = [0] * len(phis)
+            for var, phi_idx in operand_to_phi_idx.items():
+                assert isinstance(var, IRVariable)
+                masks[phi_idx] |= self._bit(var)
+            all_mask = 0
+            for mask in masks:
+                all_mask |= mask
+            ret = (all_mask, [(masks[i], self._bit(phi_matching[i])) for i in range(len(phis))])
+
+        self._phi_edges[key] = ret
+        return ret
+
+    def _input_bits_from(self, source: IRBasicBlock, target: IRBasicBlock, live: int) -> int:
+        phi_edge = self._phi_edge(source, target)
+        if phi_edge is None:
+            return live
+
+        all_mask, phis = phi_edge
+        ret = live & ~all_mask
+        for mask, matching in phis:
+            if live & mask:
+                ret |= matching
+        return ret
+
+    def _replay_order(self, steps: list[IRBasicBlock]) -> None:
         """
-        Compute liveness of each instruction in the basic block.
-        Returns True if liveness changed
+        Compute the ordered live sets at the end of the fixpoint, by
+        replaying the ordered computation for the steps it depends on.
         """
-        orig_liveness = self.inst_to_liveness[bb.instructions[0]].copy()
-        liveness = self._out_vars[bb].copy()
-        for instruction in reversed(bb.instructions):
-            ins = instruction.get_input_variables()
-            outs = instruction.get_outputs()
+        block_steps: dict[IRBasicBlock, list[int]] = {}
+        for i, bb in enumerate(steps):
+            block_steps.setdefault(bb, []).append(i)
+
+        def visible_step(bb: IRBasicBlock, step: int) -> Optional[int]:
+            # the last step before `step` at which `bb` was visited
+            bb_steps = block_steps.get(bb)
+            if bb_steps is None:
+                return None
+            idx = bisect_left(bb_steps, step)
+            if idx == 0:
+                return None
+            return bb_steps[idx - 1]
+
+        # find the steps which the final state depends on
+        needed: set[int] = set()
+        stack = [bb_steps[-1] for bb_steps in block_steps.values()]
+        while len(stack) > 0:
+            step = stack.pop()
+            if step in needed:
+                continue
+            needed.add(step)
+            for out_bb in self.cfg.cfg_out(steps[step]):
+                dep = visible_step(out_bb, step)
+                if dep is not None:
+                    stack.append(dep)
 
-            if ins or outs:
-                # perf: only copy if changed
-                liveness = liveness.copy()
-                # liveness update: live_in = (live_out - defs) U uses
-                liveness.dropmany(outs)
-                liveness.update(ins)
+        out_at: dict[int, OrderedSet[IRVariable]] = {}
+        in_at: dict[int, OrderedSet[IRVariable]] = {}
+        for step in sorted(needed):
+            bb = steps[step]
+            out_vars: OrderedSet[IRVariable] = OrderedSet()
+            for out_bb in self.cfg.cfg_out(bb):
+                dep = visible_step(out_bb, step)
+                target_liveness = in_at[dep] if dep is not None else OrderedSet()
+                out_vars.update(self._input_vars_from(bb, out_bb, target_liveness))
+            out_at[step] = out_vars
+            in_at[step] = self._live_in(bb, out_vars)
 
-            self.inst_to_liveness[instruction] = liveness
+        self._visited = set(block_steps.keys())
+        self._out_vars = {}
+        self._in_vars = {}
+        for bb in self.function.get_basic_blocks():
+            if bb in block_steps:
+                last_step = block_steps[bb][-1]
+                self._out_vars[bb] = out_at[last_step]
+                self._in_vars[bb] = in_at[last_step]
+            else:
+                self._out_vars[bb] = OrderedSet()
+                self._in_vars[bb] = OrderedSet()
 
-        return orig_liveness != self.inst_to_liveness[bb.instructions[0]]
+    @staticmethod
+    def _live_in(bb: IRBasicBlock, out_vars: OrderedSet[IRVariable]) -> OrderedSet[IRVariable]:
+        liveness = out_vars.copy()
+        for instruction in reversed(bb.instructions):
+            # liveness update: live_in = (live_out - defs) U uses
+            liveness.dropmany(instruction.get_outputs())
+            liveness.update(instruction.get_input_variables())
+        return liveness
 
-    def _calculate_out_vars(self, bb: IRBasicBlock) -> bool:
+    def _materialize(self, bb: IRBasicBlock) -> None:
         """
-        Compute out_vars of basic block.
-        Returns True if out_vars changed
+        Compute the liveness of each instruction in the basic block.
         """
-        out_vars = self._out_vars[bb].copy()
-        self._out_vars[bb] = OrderedSet()
-        for out_bb in self.cfg.cfg_out(bb):
-            target_vars = self.input_vars_from(bb, out_bb)
-            self._out_vars[bb].update(target_vars)
-        return out_vars != self._out_vars[bb]
+        if bb not in self._visited:
+            # never reached by the fixpoint, nothing is live
+            for instruction in bb.instructions:
+                self._inst_liveness[instruction] = OrderedSet()
+            return
+
+        liveness = self._out_vars[bb]
+        for instruction in reversed(bb.instructions):
+            liveness = liveness.copy()
+            liveness.dropmany(instruction.get_outputs())
+            liveness.update(instruction.get_input_variables())
+            self._inst_liveness[instruction] = liveness
 
     def liveness_in_vars(self, bb):
         for inst in bb.instructions:
             if inst.opcode != "phi":
-                return self.inst_to_liveness[inst]
+                return self.live_vars_at(inst)
         return OrderedSet()
 
     def out_vars(self, bb: IRBasicBlock) -> OrderedSet[IRVariable]:
@@ -90,12 +237,12 @@ class LivenessAnalysis(IRAnalysis):
         """
         Get the variables that are live at (right before) a given instruction
         """
-        return self.inst_to_liveness[inst]
-
-    # calculate the input variables into self from source
-    def input_vars_from(self, source: IRBasicBlock, target: IRBasicBlock) -> OrderedSet[IRVariable]:
-        liveness = self.inst_to_liveness[target.instructions[0]].copy()
+        if inst not in self._inst_liveness:
+            self._materialize(inst.parent)
+        return self._inst_liveness[inst]
 
+    @staticmethod
+    def _get_phis(source: IRBasicBlock, target: IRBasicBlock) -> list[IRInstruction]:
         phis: list[IRInstruction] = []
         for inst in target.instructions:
             if inst.opcode == "phi":
@@ -104,10 +251,12 @@ class LivenessAnalysis(IRAnalysis):
                 phis.append(inst)
             else:
                 break
+        return phis
 
-        if len(phis) == 0:
-            return liveness
-
+    @staticmethod
+    def _phi_mapping(
+        source: IRBasicBlock, phis: list[IRInstruction]
+    ) -> tuple[dict[IROperand, int], dict[int, IRVariable]]:
         # Map every phi operand (from all sources) to its phi index,
         # and record the matching operand from `source` for each phi.
         operand_to_phi_idx: dict[IROperand, int] = {}
@@ -118,6 +267,20 @@ class LivenessAnalysis(IRAnalysis):
                 if label == source.label:
                     assert isinstance(var, IRVariable)
                     phi_matching[i] = var
+        return operand_to_phi_idx, phi_matching
+
+    # calculate the input variables into self from source
+    def input_vars_from(self, source: IRBasicBlock, target: IRBasicBlock) -> OrderedSet[IRVariable]:
+        return self._input_vars_from(source, target, self._in_vars[target])
+
+    def _input_vars_from(
+        self, source: IRBasicBlock, target: IRBasicBlock, liveness: OrderedSet[IRVariable]
+    ) -> OrderedSet[IRVariable]:
+        phis = self._get_phis(source, target)
+        if len(phis) == 0:
+            return liveness.copy()
+
+        operand_to_phi_idx, phi_matching = self._phi_mapping(source, phis)
 
         result: OrderedSet[IRVariable] = OrderedSet()
         placed: set[int] = set()
@@ -137,4 +300,6 @@ class LivenessAnalysis(IRAnalysis):
     def invalidate(self):
         # delete properties so they can't accidentally be used
         del self._out_vars
-        del self.inst_to_liveness
+        del self._in_vars
+        del self._inst_liveness
+        del self._visited
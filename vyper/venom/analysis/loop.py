@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Optional
+
+from vyper.utils import OrderedSet
+from vyper.venom.analysis import CFGAnalysis, DominatorTreeAnalysis, IRAnalysis
+from vyper.venom.basicblock import IRBasicBlock
+
+
+@dataclass(eq=False)
+class NaturalLoop:
+    header: IRBasicBlock
+    # all blocks of the loop, including the header and nested loops
+    body: OrderedSet[IRBasicBlock]
+    # sources of the back edges to the header
+    latches: OrderedSet[IRBasicBlock]
+    # blocks of the loop with a successor outside of the loop
+    exiting: OrderedSet[IRBasicBlock] = field(default_factory=OrderedSet)
+    parent: Optional[NaturalLoop] = None
+    children: list[NaturalLoop] = field(default_factory=list)
+
+    @property
+    def depth(self) -> int:
+        ret = 1
+        loop = self
+        while loop.parent is not None:
+            ret += 1
+            loop = loop.parent
+        return ret
+
+    def __contains__(self, bb: IRBasicBlock) -> bool:
+        return bb in self.body
+
+    def __repr__(self) -> str:
+        return f"NaturalLoop({self.header.label}, {len(self.body)} blocks)"
+
+
+class LoopAnalysis(IRAnalysis):
+    """
+    Find the natural loops of a function. An edge is a back edge if its
+    target (the loop header) dominates its source (a latch). The loop of a
+    header consists of the header and all blocks which reach a latch
+    without going through the header. Loops with the same header are
+    merged into one.
+    """
+
+    # innermost loops first
+    loops: list[NaturalLoop]
+    # innermost loop of each block in a loop
+    loop_of: dict[IRBasicBlock, NaturalLoop]
+
+    def analyze(self):
+        self.cfg = self.analyses_cache.request_analysis(CFGAnalysis)
+        self.dom = self.analyses_cache.request_analysis(DominatorTreeAnalysis)
+
+        loops: dict[IRBasicBlock, NaturalLoop] = {}
+        for bb in self.function.get_basic_blocks():
+            if not self.cfg.is_reachable(bb):
+                continue
+            for succ in self.cfg.cfg_out(bb):
+                if not self.dom.dominates(succ, bb):
+                    continue
+                if succ not in loops:
+                    loops[succ] = NaturalLoop(succ, OrderedSet([succ]), OrderedSet())
+                loop = loops[succ]
+                loop.latches.add(bb)
+                self._add_body(loop, bb)
+
+        self.loops = sorted(loops.values(), key=lambda loop: len(loop.body))
+
+        for loop in self.loops:
+            for bb in loop.body:
+                if any(succ not in loop.body for succ in self.cfg.cfg_out(bb)):
+                    loop.exiting.add(bb)
+
+        # a loop is nested in the smallest loop which contains its header
+        for i, loop in enumerate(self.loops):
+            for outer in self.loops[i + 1 :]:
+                if outer is not loop and loop.header in outer.body:
+                    loop.parent = outer
+                    outer.children.append(loop)
+                    break
+
+        self.loop_of = {}
+        for loop in reversed(self.loops):
+            for bb in loop.body:
+                self.loop_of[bb] = loop
+
+    def _add_body(self, loop: NaturalLoop, latch: IRBasicBlock):
+        worklist = [latch]
+        while len(worklist) > 0:
+            bb = worklist.pop()
+            if bb in loop.body:
+                continue
+            loop.body.add(bb)
+            for pred in self.cfg.cfg_in(bb):
+                if self.cfg.is_reachable(pred):
+                    worklist.append(pred)
+
+    def get_loop(self, bb: IRBasicBlock) -> Optional[NaturalLoop]:
+        """
+        Return the innermost loop containing `bb`, or None.
+        """
+        return self.loop_of.get(bb)
+
+    def get_preheader(self, loop: NaturalLoop) -> Optional[IRBasicBlock]:
+        """
+        Return the block through which the loop is entered: the only
+        predecessor of the header outside of the loop, if the header is
+        its only successor. Otherwise, return None.
+        """
+        preds = [pred for pred in self.cfg.cfg_in(loop.header) if pred not in loop.body]
+        if len(preds) != 1:
+            return None
+        preheader = preds[0]
+        if not self.cfg.is_reachable(preheader) or len(self.cfg.cfg_out(preheader)) != 1:
+            return None
+        return preheader
@@ -181,6 +181,10 @@ class IROperand:
             self._hash = hash(self.value)
         return self._hash
 
+    def __getstate__(self):
+        # str hashes are only valid within one process, do not pickle them
+        return {**self.__dict__, "_hash": None}
+
     def __eq__(self, other) -> bool:
         if not isinstance(other, type(self)):
             return False
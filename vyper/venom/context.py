@@ -1,3 +1,4 @@
+import contextlib
 import textwrap
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Iterator, Optional
@@ -8,6 +9,7 @@ from vyper.venom.memory_allocator import MemoryAllocator
 
 if TYPE_CHECKING:
     from vyper.venom.analysis.analysis import IRGlobalAnalysesCache
+    from vyper.venom.execution_profile import ExecutionProfile
 
 
 @dataclass
@@ -48,6 +50,11 @@ class IRContext:
     last_variable: int
     mem_allocator: MemoryAllocator
     global_analyses_cache: Optional["IRGlobalAnalysesCache"]
+    # execution profile for profile-guided optimizations, if any
+    profile: Optional["ExecutionProfile"]
+    # labels of the blocks created in a `block_scope`, mapped to their
+    # block ids
+    block_ids: dict[str, str]
 
     def __init__(self) -> None:
         self.functions = {}
@@ -59,6 +66,11 @@ class IRContext:
 
         self.mem_allocator = MemoryAllocator()
         self.global_analyses_cache = None
+        self.profile = None
+
+        self.block_ids = {}
+        self._block_scope: Optional[str] = None
+        self._scope_blocks = 0
 
     def get_basic_blocks(self) -> Iterator[IRBasicBlock]:
         for fn in self.functions.values():
@@ -91,7 +103,27 @@ class IRContext:
         if suffix != "":
             suffix = f"_{suffix}"
         self.last_label += 1
-        return IRLabel(f"{self.last_label}{suffix}")
+        label = IRLabel(f"{self.last_label}{suffix}")
+        if self._block_scope is not None:
+            self._scope_blocks += 1
+            self.block_ids[label.value] = f"{self._block_scope}:{self._scope_blocks}{suffix}"
+        return label
+
+    @contextlib.contextmanager
+    def block_scope(self, name: str) -> Iterator[None]:
+        """
+        Give the blocks created in this scope an id made of `name` and
+        their position in the scope. Unlike the labels, the ids do not
+        depend on the code which was generated before the scope (e.g.
+        the selector section), so execution profiles are keyed by them.
+        """
+        assert self._block_scope is None, "nested block scope"
+        self._block_scope = name
+        self._scope_blocks = 0
+        try:
+            yield
+        finally:
+            self._block_scope = None
 
     def get_next_variable(self) -> IRVariable:
         self.last_variable += 1
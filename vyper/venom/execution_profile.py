@@ -0,0 +1,137 @@
+"""
+Execution profiles, for profile-guided optimization.
+
+A profile records how often the internal functions were called and how
+often each basic block was entered:
+
+    {
+        "version": 2,
+        "functions": {"internal 0 foo(uint256)_runtime": 1200, ...},
+        "branches": {"external bar:2_then": 1100, "external bar:3_if_exit": 100, ...}
+    }
+
+Blocks are keyed by their block id (see `IRContext.block_scope`), i.e.
+the function they were generated for and their position in it, and not
+by their labels: the labels are numbered across the whole contract, so
+they shift with the selector section, which depends on the optimization
+level. To record a profile, compile the contract with `-O none
+--disable-inlining` (so that every label is kept in the symbol map), run
+it and pass the executed pcs to `ExecutionProfile.from_trace()`, together
+with the `block_ids` of the runtime `IRContext`. The profile is then
+passed to the compiler with `--execution-profile`.
+"""
+
+import re
+from typing import Iterable, Optional
+
+from vyper.venom.basicblock import IRLabel
+from vyper.venom.function import IRFunction
+
+PROFILE_VERSION = 2
+
+# internal functions are the only venom functions besides the entry points,
+# e.g. `internal 0 foo(uint256)_runtime`
+_INTERNAL_FUNCTION = re.compile(r"^internal \d+ .*\)_(runtime|deploy)$")
+
+# a function is hot if it takes at least this share of the recorded calls
+HOT_FUNCTION_RATIO = 0.1
+# the inline threshold is multiplied by this factor for hot functions
+HOT_INLINE_FACTOR = 16
+
+# labels of blocks copied by the inliner, e.g. `inl3_inl0_5_then`
+_INLINE_PREFIX = re.compile(r"^(inl\d+_)+")
+
+
+def _check_counts(data: dict, key: str) -> dict[str, int]:
+    counts = data.get(key, {})
+    if not isinstance(counts, dict):
+        raise ValueError(f"profile `{key}` must be an object")
+    for name, count in counts.items():
+        if not isinstance(count, int) or isinstance(count, bool) or count < 0:
+            raise ValueError(f"invalid count for `{name}` in profile `{key}`: {count!r}")
+    return counts
+
+
+class ExecutionProfile:
+    functions: dict[str, int]
+    branches: dict[str, int]
+    # labels of the compiled context, mapped to their block ids
+    block_ids: dict[str, str]
+
+    def __init__(
+        self,
+        functions: dict[str, int],
+        branches: dict[str, int],
+        block_ids: Optional[dict[str, str]] = None,
+    ):
+        self.functions = functions
+        self.branches = branches
+        self.block_ids = block_ids or {}
+        self._total_calls = sum(functions.values())
+
+    @classmethod
+    def from_dict(
+        cls, data: dict, block_ids: Optional[dict[str, str]] = None
+    ) -> "ExecutionProfile":
+        """
+        Validate the JSON representation of a profile, to be applied to
+        the context with `block_ids`. Raises `ValueError` if the data is
+        malformed.
+        """
+        if not isinstance(data, dict):
+            raise ValueError("profile must be an object")
+        version = data.get("version")
+        if version != PROFILE_VERSION:
+            raise ValueError(f"unsupported profile version {version!r}")
+        functions = _check_counts(data, "functions")
+        return cls(functions, _check_counts(data, "branches"), block_ids)
+
+    @classmethod
+    def from_trace(
+        cls, symbol_map: dict[str, int], block_ids: dict[str, str], pcs: Iterable[int]
+    ) -> "ExecutionProfile":
+        """
+        Build a profile from the runtime `symbol_map` and `block_ids` of
+        the recording build and the pcs which were executed, in any
+        order. Blocks without an id (e.g. the selector section, or blocks
+        created by optimization passes) are not recorded.
+        """
+        hits: dict[int, int] = {}
+        for pc in pcs:
+            hits[pc] = hits.get(pc, 0) + 1
+
+        functions = {}
+        branches = {}
+        for label, pc in symbol_map.items():
+            count = hits.get(pc, 0)
+            if _INTERNAL_FUNCTION.match(label):
+                functions[label] = count
+            elif label in block_ids:
+                branches[block_ids[label]] = count
+        return cls(functions, branches)
+
+    def as_dict(self) -> dict:
+        return {"version": PROFILE_VERSION, "functions": self.functions, "branches": self.branches}
+
+    def call_count(self, fn: IRFunction) -> Optional[int]:
+        """
+        How often `fn` was called, or None if it was not recorded.
+        """
+        return self.functions.get(fn.name.value)
+
+    def is_hot(self, fn: IRFunction) -> bool:
+        count = self.call_count(fn)
+        if not count:
+            return False
+        return count >= self._total_calls * HOT_FUNCTION_RATIO
+
+    def block_count(self, label: IRLabel) -> Optional[int]:
+        """
+        How often the block with `label` was entered, or None if it was
+        not recorded (e.g. it was created by an optimization pass).
+        Inlined copies of a block share the count of the original block.
+        """
+        block_id = self.block_ids.get(_INLINE_PREFIX.sub("", label.value))
+        if block_id is None:
+            return None
+        return self.branches.get(block_id)
@@ -0,0 +1,638 @@
+"""
+Static gas estimates for venom IR.
+
+The estimates walk the CFG of the optimized IR and charge every instruction
+its cost from the opcode table (`vyper.evm.opcodes`), plus the stack and jump
+instructions which it is lowered to. Two estimates are computed:
+
+- `worst`: the most expensive path through the code. Storage writes set a
+  zero slot, external calls transfer value and loops run for their bound.
+- `typical`: the average over the paths which do not revert, taking each
+  branch with the same probability. Storage writes update a slot which was
+  read before and loops with a dynamic bound run for half of the bound.
+
+The trip count of a loop is read off its exit test, which compares the
+induction variable to a literal, to a variable whose range is known to
+`VariableRangeAnalysis`, or to a variable which a dominating `assert` bounds
+(e.g. the checks of `range(n, bound=N)` and of dynarray lengths). Loops
+without a known bound are charged for `UNKNOWN_LOOP_TRIPS` iterations, so
+`worst` is not an upper bound for the code which runs them; the estimates
+of such code are flagged with `unknown_loop_trips`.
+
+Neither estimate includes the gas used by the callee of an external call,
+nor refunds.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Union
+
+from vyper.evm.opcodes import get_opcodes
+from vyper.utils import ceil32
+from vyper.venom.analysis import (
+    CFGAnalysis,
+    DFGAnalysis,
+    DominatorTreeAnalysis,
+    IRAnalysesCache,
+    LoopAnalysis,
+    NaturalLoop,
+    VariableRangeAnalysis,
+)
+from vyper.venom.basicblock import IRBasicBlock, IRInstruction, IRLabel, IRLiteral, IROperand
+from vyper.venom.context import IRContext
+from vyper.venom.function import IRFunction
+
+# costs which depend on the access lists and on the original value of a
+# storage slot (EIP-2929, EIP-2200), which the opcode table does not model
+COLD_SLOAD_GAS = 2100
+SSTORE_RESET_GAS = 2900
+COLD_ACCOUNT_GAS = 2600
+CALL_VALUE_GAS = 9000
+
+# gas per word copied, hashed, or per byte logged
+COPY_WORD_GAS = 3
+SHA3_WORD_GAS = 6
+LOG_BYTE_GAS = 8
+EXP_BYTE_GAS = 50
+
+UNKNOWN_LOOP_TRIPS = 1
+
+# instructions which do not emit any code
+_FREE_INSTRUCTIONS = frozenset(
+    ["phi", "param", "fmp_param", "retpc_param", "alloca", "dbname", "nop"]
+)
+_COPY_INSTRUCTIONS = frozenset(["calldatacopy", "codecopy", "returndatacopy", "mcopy"])
+_CALL_INSTRUCTIONS = frozenset(["call", "staticcall", "delegatecall"])
+
+# a node of the CFG with the loops collapsed into single nodes
+_Node = Union[IRBasicBlock, NaturalLoop]
+
+
+@dataclass(frozen=True)
+class GasEstimate:
+    worst: int
+    typical: int
+    # whether the estimate charges `UNKNOWN_LOOP_TRIPS` iterations for
+    # some loop, i.e. `worst` is only a lower bound
+    unknown_loop_trips: bool = False
+
+    def as_dict(self) -> dict:
+        return {
+            "worst": self.worst,
+            "typical": self.typical,
+            "unknown_loop_trips": self.unknown_loop_trips,
+        }
+
+
+def _evm_args(inst: IRInstruction) -> list[IROperand]:
+    # the operands in the order of the EVM opcode's arguments
+    if inst.opcode == "log":
+        return list(reversed(inst.operands[1:]))
+    return list(reversed(inst.operands))
+
+
+def _memory_gas(end: int) -> int:
+    words = ceil32(end) // 32
+    return words * 3 + words * words // 512
+
+
+class GasEstimator:
+    """
+    Estimate the gas used by the code of a venom context. Must be run on
+    the optimized IR, after the memory locations have been fixed.
+    """
+
+    def __init__(self, ctx: IRContext):
+        self.ctx = ctx
+        self.opcodes = get_opcodes()
+        self._functions: dict[IRFunction, _FunctionGas] = {}
+
+    def estimate(self, fn: IRFunction, label: Optional[IRLabel] = None) -> GasEstimate:
+        """
+        Estimate the gas of a call to `fn`. If `label` is given, only the
+        paths through that block are considered.
+        """
+        fn_gas = self._function_gas(fn)
+        start = fn.entry if label is None else fn.get_basic_block(label.value)
+
+        worst = fn_gas.path_to(start, False) + fn_gas.path_gas(start, None, False)
+        typical = fn_gas.path_to(start, True) + fn_gas.path_gas(start, None, True)
+        memory = _memory_gas(fn_gas.memory_end(start))
+        unknown_loop_trips = fn_gas.has_unknown_loops(start, before=True)
+        return GasEstimate(round(worst) + memory, round(typical) + memory, unknown_loop_trips)
+
+    def opcode_gas(self, *opcodes: str) -> int:
+        ret = 0
+        for opcode in opcodes:
+            gas = self.opcodes[opcode][-1]
+            ret += gas or 0
+        return ret
+
+    def _function_gas(self, fn: IRFunction) -> _FunctionGas:
+        if fn not in self._functions:
+            self._functions[fn] = _FunctionGas(self, fn)
+        return self._functions[fn]
+
+    def call_gas(self, label: IRLabel, typical: bool) -> float:
+        fn_gas = self._function_gas(self.ctx.get_function(label))
+        return fn_gas.path_gas(fn_gas.function.entry, None, typical)
+
+    def call_memory_end(self, label: IRLabel) -> int:
+        fn_gas = self._function_gas(self.ctx.get_function(label))
+        return fn_gas.memory_end(fn_gas.function.entry)
+
+    def call_has_unknown_loops(self, label: IRLabel) -> bool:
+        fn_gas = self._function_gas(self.ctx.get_function(label))
+        return fn_gas.has_unknown_loops(fn_gas.function.entry)
+
+
+class _FunctionGas:
+    def __init__(self, estimator: GasEstimator, fn: IRFunction):
+        self.estimator = estimator
+        self.function = fn
+
+        ac = IRAnalysesCache(fn)
+        self.analyses_cache = ac
+        self.cfg = ac.request_analysis(CFGAnalysis)
+        self.dfg = ac.request_analysis(DFGAnalysis)
+        self.dom = ac.request_analysis(DominatorTreeAnalysis)
+        self.loops = ac.request_analysis(LoopAnalysis)
+        self._ranges: Optional[VariableRangeAnalysis] = None
+
+        self._block_gas: dict[tuple[IRBasicBlock, bool], float] = {}
+        self._loop_gas: dict[tuple[NaturalLoop, bool], float] = {}
+        self._memory_end: dict[IRBasicBlock, int] = {}
+        self._trip_bounds: dict[NaturalLoop, Optional[tuple[int, bool]]] = {}
+        self._dist: dict[bool, dict[_Node, float]] = {}
+        self._reverting = self._find_reverting()
+        self._asserts = [
+            inst
+            for bb in fn.get_basic_blocks()
+            for inst in bb.instructions
+            if inst.opcode == "assert"
+        ]
+
+    # analysis of the CFG
+
+    def _find_reverting(self) -> set[IRBasicBlock]:
+        # blocks from which every path reverts
+        ret = set()
+        for bb in self.cfg.dfs_post_walk:
+            succs = self.cfg.cfg_out(bb)
+            if bb.is_terminated and bb.last_instruction.opcode in ("revert", "invalid"):
+                ret.add(bb)
+            elif len(succs) > 0 and all(succ in ret for succ in succs):
+                ret.add(bb)
+        return ret
+
+    def _node(self, bb: IRBasicBlock, region: Optional[NaturalLoop]) -> _Node:
+        # the node of `bb` in the CFG of `region` (the whole function if
+        # None), in which the loops nested in `region` are collapsed
+        loop = self.loops.get_loop(bb)
+        if loop is None or loop is region:
+            return bb
+        while loop.parent is not region:
+            if loop.parent is None:  # pragma: nocover
+                return bb
+            loop = loop.parent
+        return loop
+
+    def _succs(self, node: _Node, region: Optional[NaturalLoop]) -> tuple[list[_Node], bool]:
+        # the successors of `node` in `region`, and whether the node also
+        # starts the next iteration of the region. exits are not included,
+        # their cost is accounted for by the trip count of the region.
+        if isinstance(node, NaturalLoop):
+            targets = [
+                succ
+                for bb in node.exiting
+                for succ in self.cfg.cfg_out(bb)
+                if succ not in node.body
+            ]
+        else:
+            targets = list(self.cfg.cfg_out(node))
+
+        ret: list[_Node] = []
+        repeats = False
+        for bb in targets:
+            if region is not None and bb is region.header:
+                repeats = True
+                continue
+            if region is not None and bb not in region.body:
+                continue
+            succ = self._node(bb, region)
+            if succ not in ret:
+                ret.append(succ)
+        return ret, repeats
+
+    def _postorder(self, start: _Node, region: Optional[NaturalLoop]) -> list[_Node]:
+        ret: list[_Node] = []
+        visited = {start}
+        stack = [(start, iter(self._succs(start, region)[0]))]
+        while len(stack) > 0:
+            node, succs = stack[-1]
+            for succ in succs:
+                if succ not in visited:
+                    visited.add(succ)
+                    stack.append((succ, iter(self._succs(succ, region)[0])))
+                    break
+            else:
+                stack.pop()
+                ret.append(node)
+        return ret
+
+    # gas of the code paths
+
+    def path_gas(self, start: IRBasicBlock, region: Optional[NaturalLoop], typical: bool) -> float:
+        """
+        Gas of the paths from `start` to the end of `region`: the end of
+        the function, or the back edges and exits of a loop.
+        """
+        gas: dict[_Node, float] = {}
+        for node in self._postorder(self._node(start, region), region):
+            succs, repeats = self._succs(node, region)
+            after = [gas.get(succ, 0) for succ in succs]
+            if repeats:
+                after.append(0)
+
+            if typical:
+                ok = [gas.get(succ, 0) for succ in succs if succ not in self._reverting]
+                if repeats:
+                    ok.append(0)
+                after = ok or after
+                rest = sum(after) / len(after) if len(after) > 0 else 0
+            else:
+                rest = max(after, default=0)
+
+            gas[node] = self._node_gas(node, typical) + rest
+
+        return gas[self._node(start, region)]
+
+    def path_to(self, target: IRBasicBlock, typical: bool) -> float:
+        """
+        Gas of the most expensive path from the entry of the function to
+        (but not including) `target`.
+        """
+        if typical not in self._dist:
+            entry = self._node(self.function.entry, None)
+            dist: dict[_Node, float] = {entry: 0}
+            for node in reversed(self._postorder(entry, None)):
+                gas = dist[node] + self._node_gas(node, typical)
+                for succ in self._succs(node, None)[0]:
+                    dist[succ] = max(dist.get(succ, 0), gas)
+            self._dist[typical] = dist
+        return self._dist[typical].get(self._node(target, None), 0)
+
+    def _node_gas(self, node: _Node, typical: bool) -> float:
+        if isinstance(node, NaturalLoop):
+            return self._loop_cost(node, typical)
+        return self._block_cost(node, typical)
+
+    def _loop_cost(self, loop: NaturalLoop, typical: bool) -> float:
+        key = (loop, typical)
+        if key not in self._loop_gas:
+            worst_trips, typical_trips = self.trip_count(loop)
+            trips = typical_trips if typical else worst_trips
+            iteration = self.path_gas(loop.header, loop, typical)
+            # the exit test runs once more than the body
+            self._loop_gas[key] = trips * iteration + self._block_cost(loop.header, typical)
+        return self._loop_gas[key]
+
+    def _block_cost(self, bb: IRBasicBlock, typical: bool) -> float:
+        key = (bb, typical)
+        if key not in self._block_gas:
+            self._block_gas[key] = sum(self._inst_gas(inst, typical) for inst in bb.instructions)
+        return self._block_gas[key]
+
+    # loop bounds
+
+    def _resolve(self, op: IROperand) -> IROperand:
+        # look through the copies of a variable
+        while (inst := self.dfg.get_producing_instruction(op)) is not None:
+            if inst.opcode != "assign":
+                break
+            op = inst.operands[0]
+        return op
+
+    def _producer(self, op: IROperand) -> Optional[IRInstruction]:
+        return self.dfg.get_producing_instruction(self._resolve(op))
+
+    def _literal(self, op: IROperand) -> Optional[int]:
+        op = self._resolve(op)
+        if isinstance(op, IRLiteral):
+            return op.value
+        return None
+
+    def _range_analysis(self) -> VariableRangeAnalysis:
+        if self._ranges is None:
+            self._ranges = self.analyses_cache.request_analysis(VariableRangeAnalysis)
+        return self._ranges
+
+    def upper_bound(self, op: IROperand, inst: IRInstruction) -> Optional[int]:
+        """
+        Upper bound of the unsigned value of `op` before `inst`.
+        """
+        op = self._resolve(op)
+        if isinstance(op, IRLiteral):
+            return op.value
+
+        rng = self._range_analysis().get_range(op, inst)
+        if not rng.is_top and not rng.is_empty and rng.lo >= 0:
+            return rng.hi
+
+        # bounds checks, e.g. `assert iszero(gt %len, 10)`
+        bb = inst.parent
+        for assert_inst in self._asserts:
+            if assert_inst.parent is bb:
+                if bb.instructions.index(assert_inst) > bb.instructions.index(inst):
+                    continue
+            elif not self.dom.dominates(assert_inst.parent, bb):
+                continue
+            bound = self._assert_bound(op, assert_inst)
+            if bound is not None:
+                return bound
+        return None
+
+    def _assert_bound(self, op: IROperand, assert_inst: IRInstruction) -> Optional[int]:
+        cond = self._producer(assert_inst.operands[0])
+        if cond is None or cond.opcode != "iszero":
+            return None
+
+        # the assert fails if any of the or'ed conditions holds
+        worklist = [cond.operands[0]]
+        while len(worklist) > 0:
+            inst = self._producer(worklist.pop())
+            if inst is None:
+                continue
+            if inst.opcode == "or":
+                worklist.extend(inst.operands)
+                continue
+            if inst.opcode not in ("gt", "lt"):
+                continue
+            lhs, rhs = (self._resolve(x) for x in _evm_args(inst))
+            if inst.opcode == "lt":
+                lhs, rhs = rhs, lhs
+            # `lhs > rhs` fails the assert
+            if lhs == op and isinstance(rhs, IRLiteral):
+                return rhs.value
+        return None
+
+    def _lower_bound(self, op: IROperand, inst: IRInstruction) -> int:
+        op = self._resolve(op)
+        if isinstance(op, IRLiteral):
+            return op.value
+        rng = self._range_analysis().get_range(op, inst)
+        if not rng.is_top and not rng.is_empty and rng.lo >= 0:
+            return rng.lo
+        return 0
+
+    def trip_count(self, loop: NaturalLoop) -> tuple[int, int]:
+        """
+        Worst case and typical trip count of a loop.
+        """
+        bound = self._known_trip_bound(loop)
+        if bound is None:
+            return UNKNOWN_LOOP_TRIPS, UNKNOWN_LOOP_TRIPS
+        trips, is_static = bound
+        if is_static:
+            return trips, trips
+        return trips, (trips + 1) // 2
+
+    def has_unknown_loops(self, start: IRBasicBlock, before: bool = False) -> bool:
+        """
+        Whether the paths from `start` (and to `start` if `before` is set)
+        run a loop, or call a function with a loop, whose trip count is
+        unknown.
+        """
+        blocks = self._reachable(start, self.cfg.cfg_out)
+        if before:
+            blocks |= self._reachable(start, self.cfg.cfg_in)
+
+        for bb in blocks:
+            loop = self.loops.get_loop(bb)
+            while loop is not None:
+                if self._known_trip_bound(loop) is None:
+                    return True
+                loop = loop.parent
+            for inst in bb.instructions:
+                if inst.opcode != "invoke":
+                    continue
+                assert isinstance(inst.operands[0], IRLabel)
+                if self.estimator.call_has_unknown_loops(inst.operands[0]):
+                    return True
+        return False
+
+    def _reachable(self, start: IRBasicBlock, edges) -> set[IRBasicBlock]:
+        visited = {start}
+        worklist = [start]
+        while len(worklist) > 0:
+            bb = worklist.pop()
+            for succ in edges(bb):
+                if succ not in visited:
+                    visited.add(succ)
+                    worklist.append(succ)
+        return visited
+
+    def _known_trip_bound(self, loop: NaturalLoop) -> Optional[tuple[int, bool]]:
+        if loop not in self._trip_bounds:
+            self._trip_bounds[loop] = self._trip_bound(loop)
+        return self._trip_bounds[loop]
+
+    def _trip_bound(self, loop: NaturalLoop) -> Optional[tuple[int, bool]]:
+        term = loop.header.last_instruction
+        if term.opcode != "jnz":
+            return None
+
+        test = self._producer(term.operands[0])
+        while test is not None and test.opcode == "iszero":
+            test = self._producer(test.operands[0])
+        if test is None or test.opcode not in ("eq", "xor", "lt", "gt"):
+            return None
+
+        # find the induction variable, `%iv = phi @pre, %init, @latch, %next`
+        # with `%next = add %iv, 1`
+        iv = end = phi = None
+        lhs, rhs = (self._resolve(op) for op in test.operands)
+        for a, b in ((lhs, rhs), (rhs, lhs)):
+            inst = self.dfg.get_producing_instruction(a)
+            if inst is not None and inst.opcode == "phi" and inst.parent is loop.header:
+                iv, end, phi = a, b, inst
+                break
+        if phi is None:
+            return None
+
+        init = None
+        for label, value in phi.phi_operands:
+            pred = self.function.get_basic_block(label.value)
+            if pred in loop.body:
+                step = self._producer(value)
+                if step is None or step.opcode != "add":
+                    return None
+                a, b = (self._resolve(op) for op in step.operands)
+                if {a, b} != {iv, IRLiteral(1)}:
+                    return None
+            else:
+                init = value
+        if init is None:
+            return None
+
+        # `range(start, start + n, bound=N)` bounds `n` rather than the end
+        rounds = None
+        end_inst = self._producer(end)
+        if end_inst is not None and end_inst.opcode == "add":
+            a, b = (self._resolve(op) for op in end_inst.operands)
+            if a == self._resolve(init):
+                rounds = b
+            elif b == self._resolve(init):
+                rounds = a
+
+        if rounds is not None:
+            hi = self.upper_bound(rounds, term)
+            if hi is None:
+                return None
+            return hi, self._literal(rounds) is not None
+
+        hi = self.upper_bound(end, term)
+        if hi is None:
+            return None
+        lo = self._lower_bound(init, loop.header.instructions[0])
+        is_static = self._literal(end) is not None and self._literal(init) is not None
+        return max(hi - lo, 0), is_static
+
+    # gas of instructions
+
+    def _size(self, op: IROperand, inst: IRInstruction) -> int:
+        # upper bound of a dynamic size. unknown sizes are not charged.
+        size = self.upper_bound(op, inst)
+        if size is None or size >= 2**32:
+            return 0
+        return size
+
+    def _inst_gas(self, inst: IRInstruction, typical: bool) -> float:
+        opcode = inst.opcode
+        gas = self.estimator.opcode_gas
+        if opcode in _FREE_INSTRUCTIONS:
+            return 0
+        if opcode in ("assign", "offset", "initial_fmp"):
+            # a DUP or a PUSH
+            return gas("PUSH1")
+        if opcode == "bump":
+            return gas("DUP2", "ADD")
+
+        ret = gas("PUSH1") * sum(isinstance(op, IRLiteral) for op in inst.operands)
+        args = _evm_args(inst)
+
+        if opcode == "jmp":
+            return ret + gas("PUSH1", "JUMP", "JUMPDEST")
+        if opcode == "jnz":
+            return ret + gas("PUSH1", "JUMPI", "JUMPDEST")
+        if opcode == "djmp":
+            return ret + gas("JUMP", "JUMPDEST")
+        if opcode == "invoke":
+            assert isinstance(inst.operands[0], IRLabel)
+            call = gas("PUSH1", "PUSH1", "JUMP", "JUMPDEST", "JUMPDEST")
+            return ret + call + self.estimator.call_gas(inst.operands[0], typical)
+        if opcode == "ret":
+            return ret + gas("JUMP")
+        if opcode == "assert":
+            return ret + gas("ISZERO", "PUSH1", "JUMPI")
+        if opcode == "assert_unreachable":
+            return ret + gas("PUSH1", "JUMPI", "JUMPDEST")
+        if opcode == "iload":
+            return ret + gas("MLOAD")
+        if opcode == "istore":
+            return ret + gas("SWAP1", "MSTORE")
+        if opcode == "sstore":
+            if typical:
+                return ret + SSTORE_RESET_GAS
+            return ret + gas("SSTORE") + COLD_SLOAD_GAS
+        if opcode in _CALL_INSTRUCTIONS:
+            ret += COLD_ACCOUNT_GAS
+            if opcode == "call":
+                value = self._literal(args[2])
+                if value != 0 and (value is not None or not typical):
+                    ret += CALL_VALUE_GAS
+            return ret
+        if opcode == "exp":
+            exponent = self.upper_bound(args[1], inst)
+            if exponent is None:
+                exponent = 2**256 - 1
+            return ret + gas("EXP") + EXP_BYTE_GAS * ((exponent.bit_length() + 7) // 8)
+        if opcode == "sha3":
+            words = ceil32(self._size(args[1], inst)) // 32
+            return ret + gas("SHA3") + SHA3_WORD_GAS * words
+        if opcode in _COPY_INSTRUCTIONS:
+            words = ceil32(self._size(args[2], inst)) // 32
+            return ret + gas(opcode.upper()) + COPY_WORD_GAS * words
+        if opcode == "log":
+            topic_count = inst.operands[0].value
+            ret -= gas("PUSH1")  # the topic count is not pushed
+            return ret + gas(f"LOG{topic_count}") + LOG_BYTE_GAS * self._size(args[1], inst)
+
+        if opcode.upper() in self.estimator.opcodes:
+            ret += gas(opcode.upper())
+        return ret
+
+    # memory expansion
+
+    def memory_end(self, start: IRBasicBlock) -> int:
+        """
+        The end of the memory which is (statically known to be) used by the
+        paths from `start`.
+        """
+        if start in self._memory_end:
+            return self._memory_end[start]
+
+        ret = 0
+        visited = {start}
+        worklist = [start]
+        while len(worklist) > 0:
+            bb = worklist.pop()
+            for inst in bb.instructions:
+                ret = max(ret, self._inst_memory_end(inst))
+            for succ in self.cfg.cfg_out(bb):
+                if succ not in visited:
+                    visited.add(succ)
+                    worklist.append(succ)
+
+        self._memory_end[start] = ret
+        return ret
+
+    def _inst_memory_end(self, inst: IRInstruction) -> int:
+        opcode = inst.opcode
+        args = _evm_args(inst)
+
+        if opcode == "invoke":
+            assert isinstance(inst.operands[0], IRLabel)
+            return self.estimator.call_memory_end(inst.operands[0])
+
+        if opcode in ("mload", "mstore", "iload", "istore"):
+            regions = [(args[0], 32)]
+        elif opcode in ("calldatacopy", "codecopy", "returndatacopy"):
+            regions = [(args[0], args[2])]
+        elif opcode == "mcopy":
+            regions = [(args[0], args[2]), (args[1], args[2])]
+        elif opcode == "extcodecopy":
+            regions = [(args[1], args[3])]
+        elif opcode in ("sha3", "return", "revert", "log", "create", "create2"):
+            if opcode in ("create", "create2"):
+                args = args[1:]
+            regions = [(args[0], args[1])]
+        elif opcode == "call":
+            regions = [(args[3], args[4]), (args[5], args[6])]
+        elif opcode in ("staticcall", "delegatecall"):
+            regions = [(args[2], args[3]), (args[4], args[5])]
+        else:
+            return 0
+
+        ret = 0
+        for ofst, size in regions:
+            if isinstance(size, int):
+                n = size
+            else:
+                n = self._size(size, inst)
+            start = self._literal(ofst)
+            if start is None or n == 0:
+                continue
+            ret = max(ret, start + n)
+        return ret
@@ -22,11 +22,13 @@ from vyper.venom.passes import (
     FmpPrunePass,
     InternalReturnCopyForwardingPass,
     LoadElimination,
+    LoopInvariantCodeMotion,
     LowerDloadPass,
     MakeSSA,
     Mem2Var,
     MemMergePass,
     MemoryCopyElisionPass,
+    PartialRedundancyElimination,
     PhiEliminationPass,
     ReadonlyInvokeArgCopyForwardingPass,
     RemoveUnusedVariablesPass,
@@ -53,6 +55,7 @@ PASSES_O2: List[PassConfig] = [
     AssignElimination,
     AffineFoldingPass,
     AlgebraicOptimizationPass,
+    LoopInvariantCodeMotion,
     LoadElimination,
     PhiEliminationPass,
     AssignElimination,
@@ -94,6 +97,7 @@ PASSES_O2: List[PassConfig] = [
     RemoveUnusedVariablesPass,
     PhiEliminationPass,
     AssignElimination,
+    PartialRedundancyElimination,
     CSE,
     AssignElimination,
     RemoveUnusedVariablesPass,
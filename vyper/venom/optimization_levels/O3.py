@@ -23,12 +23,14 @@ from vyper.venom.passes import (
     FmpPrunePass,
     InternalReturnCopyForwardingPass,
     LoadElimination,
+    LoopInvariantCodeMotion,
     LowerDloadPass,
     MakeSSA,
     Mem2Var,
     MemMergePass,
     MemoryCopyElisionPass,
     OverflowEliminationPass,
+    PartialRedundancyElimination,
     PhiEliminationPass,
     ReadonlyInvokeArgCopyForwardingPass,
     ReduceLiteralsCodesize,
@@ -59,6 +61,7 @@ PASSES_O3: List[PassConfig] = [
     AlgebraicOptimizationPass,
     AssertEliminationPass,
     OverflowEliminationPass,
+    LoopInvariantCodeMotion,
     LoadElimination,
     PhiEliminationPass,
     AssignElimination,
@@ -101,6 +104,7 @@ PASSES_O3: List[PassConfig] = [
     RemoveUnusedVariablesPass,
     PhiEliminationPass,
     AssignElimination,
+    PartialRedundancyElimination,
     CSE,
     AssignElimination,
     RemoveUnusedVariablesPass,
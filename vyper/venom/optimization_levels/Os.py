@@ -27,6 +27,7 @@ from vyper.venom.passes import (
     Mem2Var,
     MemMergePass,
     MemoryCopyElisionPass,
+    PartialRedundancyElimination,
     PhiEliminationPass,
     ReadonlyInvokeArgCopyForwardingPass,
     ReduceLiteralsCodesize,
@@ -95,6 +96,7 @@ PASSES_Os: List[PassConfig] = [
     RemoveUnusedVariablesPass,
     PhiEliminationPass,
     AssignElimination,
+    (PartialRedundancyElimination, {"max_code_growth": 0}),
     CSE,
     AssignElimination,
     RemoveUnusedVariablesPass,
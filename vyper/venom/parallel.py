@@ -0,0 +1,339 @@
+import copyreg
+import io
+import pickle
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Callable, Iterator
+
+from vyper.ast import VyperNode
+from vyper.codegen.ir_node import IRnode
+from vyper.compiler.settings import VenomOptimizationFlags
+from vyper.utils import OrderedSet
+from vyper.venom.analysis import IRAnalysesCache, IRGlobalAnalysesCache
+from vyper.venom.analysis.fcg import FCGGlobalAnalysis
+from vyper.venom.basicblock import IRBasicBlock, IRInstruction, IRLabel
+from vyper.venom.context import IRContext
+from vyper.venom.function import IRFunction
+from vyper.venom.memory_allocator import MemoryAllocator
+
+"""
+run the per-function pass pipelines on a process pool.
+
+the per-function pipeline of a function only reads the (already optimized)
+bodies of its callees and their memory allocations, and it does not touch
+any other function. so once all the callees of a function are done, its
+pipeline can run independently of every other function which is ready.
+
+each job gets a snapshot of the function and its transitive callees (the
+analyses the pipeline uses are closed over callees), runs the pipeline on
+it, and sends back only that function together with its memory
+allocations. the result is merged back into the context in the parent, so
+that the output is the same as for a serial run.
+"""
+
+# (function name, pickled function and allocator delta)
+_JobResult = tuple[str, bytes]
+
+# the types which make up the context, see `_SnapshotPickler`
+_IR_TYPES = (IRContext, IRFunction, IRBasicBlock, IRInstruction)
+
+
+class _ObjectTable:
+    """
+    Ids of the objects sent to the workers. The parent keeps the objects
+    alive, so that ids are never reused.
+    """
+
+    def __init__(self):
+        self.objects: list = []
+        self._ids: dict[int, int] = {}
+
+    def ref(self, obj) -> int:
+        idx = self._ids.get(id(obj))
+        if idx is None:
+            idx = len(self.objects)
+            self.objects.append(obj)
+            self._ids[id(obj)] = idx
+        return idx
+
+
+class _ExternalRef:
+    """
+    Stand-in for an object which stays in the parent process (source AST
+    nodes, which are attached to instructions but never looked at by the
+    passes).
+    """
+
+    def __init__(self, idx: int):
+        self.idx = idx
+
+
+# in a worker: id of an object restored from the snapshot -> (object, id in
+# the parent). holds on to the objects, so that ids are never reused.
+_snapshot_objects: dict[int, tuple[object, int]] = {}
+
+
+def _restore(cls: type, idx: int):
+    obj = cls.__new__(cls)
+    _snapshot_objects[id(obj)] = (obj, idx)
+    return obj
+
+
+class _SnapshotPickler(pickle.Pickler):
+    """
+    Pickle the part of the context a job needs: the given functions, and
+    the memory allocations in them. Every IR object is tagged with its id
+    in the parent's object table, so that results can refer back to it.
+    """
+
+    def __init__(self, file, table: _ObjectTable, functions: set[IRFunction]):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.table = table
+        self.functions = functions
+
+    def persistent_id(self, obj):
+        if isinstance(obj, (VyperNode, IRnode)):
+            return self.table.ref(obj)
+        return None
+
+    def reducer_override(self, obj):
+        if isinstance(obj, IRContext):
+            return _restore, (IRContext, self.table.ref(obj)), self._context_state(obj)
+        if type(obj) in _IR_TYPES:
+            return _restore, (type(obj), self.table.ref(obj)), obj.__dict__
+        if isinstance(obj, MemoryAllocator):
+            return copyreg.__newobj__, (MemoryAllocator,), self._allocator_state(obj)
+        return NotImplemented
+
+    def _context_state(self, ctx: IRContext) -> dict:
+        state = ctx.__dict__.copy()
+        state["functions"] = {k: fn for k, fn in ctx.functions.items() if fn in self.functions}
+        if ctx.entry_function not in self.functions:
+            state["entry_function"] = None
+        # analyses are recomputed in the worker
+        state["global_analyses_cache"] = None
+        return state
+
+    def _allocator_state(self, allocator: MemoryAllocator) -> dict:
+        state = allocator.__dict__.copy()
+        state["allocated"] = {
+            alloca: ptr
+            for alloca, ptr in allocator.allocated.items()
+            if _owner(alloca.inst) in self.functions
+        }
+        state["mems_used"] = {
+            fn: mems for fn, mems in allocator.mems_used.items() if fn in self.functions
+        }
+        state["fn_eom"] = {fn: eom for fn, eom in allocator.fn_eom.items() if fn in self.functions}
+        # per-function scratch state, reset at the start of each function
+        state["allocated_fn"] = OrderedSet()
+        state.pop("current_function", None)
+        return state
+
+
+class _SnapshotUnpickler(pickle.Unpickler):
+    def persistent_load(self, pid):
+        return _ExternalRef(pid)
+
+
+def _owner(inst: IRInstruction) -> IRFunction:
+    return inst.parent.parent
+
+
+def _owned_by(obj, fn: IRFunction) -> bool:
+    if isinstance(obj, IRFunction):
+        return obj is fn
+    if isinstance(obj, IRBasicBlock):
+        return obj.parent is fn
+    if isinstance(obj, IRInstruction):
+        return _owner(obj) is fn
+    return False
+
+
+class _ResultPickler(pickle.Pickler):
+    """
+    Pickle a function, referring to everything outside of it (the context,
+    other functions and their instructions) by their ids in the parent.
+    """
+
+    def __init__(self, file, fn: IRFunction):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.fn = fn
+
+    def persistent_id(self, obj):
+        if isinstance(obj, _ExternalRef):
+            return obj.idx
+        if isinstance(obj, _IR_TYPES) and not _owned_by(obj, self.fn):
+            return _snapshot_objects[id(obj)][1]
+        return None
+
+
+class _ResultUnpickler(pickle.Unpickler):
+    def __init__(self, file, table: _ObjectTable):
+        super().__init__(file)
+        self.table = table
+
+    def persistent_load(self, pid):
+        return self.table.objects[pid]
+
+
+def _dump_snapshot(table: _ObjectTable, functions: set[IRFunction]) -> bytes:
+    buf = io.BytesIO()
+    fn = next(iter(functions))
+    _SnapshotPickler(buf, table, functions).dump(fn.ctx)
+    return buf.getvalue()
+
+
+def _data_labels(ctx: IRContext) -> dict[tuple[int, int], IRLabel]:
+    ret = {}
+    for i, section in enumerate(ctx.data_segment):
+        for j, item in enumerate(section.data_items):
+            if isinstance(item.data, IRLabel):
+                ret[(i, j)] = item.data
+    return ret
+
+
+def _run_job(snapshot: bytes, fn_name: str, flags: VenomOptimizationFlags) -> _JobResult:
+    # imported here, this module is imported by `vyper.venom`
+    from vyper.venom import _build_fn_pass_pipeline, _run_passes
+
+    _snapshot_objects.clear()
+    ctx = _SnapshotUnpickler(io.BytesIO(snapshot)).load()
+    fn = ctx.get_function(IRLabel(fn_name))
+
+    data_before = _data_labels(ctx)
+
+    ir_analyses = {f: IRAnalysesCache(f) for f in ctx.functions.values()}
+    ctx.global_analyses_cache = IRGlobalAnalysesCache(ctx, ir_analyses)
+    _run_passes(fn, _build_fn_pass_pipeline(flags), ir_analyses[fn])
+    ctx.global_analyses_cache = None
+
+    # passes rename the labels of their function in the data segment
+    data_items = [
+        (pos, label) for pos, label in _data_labels(ctx).items() if label != data_before[pos]
+    ]
+
+    allocator = ctx.mem_allocator
+    allocated = {
+        alloca: ptr for alloca, ptr in allocator.allocated.items() if _owner(alloca.inst) is fn
+    }
+    delta = (data_items, allocated, allocator.mems_used.get(fn), allocator.fn_eom.get(fn))
+
+    buf = io.BytesIO()
+    _ResultPickler(buf, fn).dump((fn, delta))
+    _snapshot_objects.clear()
+    return fn_name, buf.getvalue()
+
+
+def _merge_result(ctx: IRContext, result: bytes, table: _ObjectTable) -> None:
+    new_fn, delta = _ResultUnpickler(io.BytesIO(result), table).load()
+    data_items, allocated, mems_used, fn_eom = delta
+
+    for (i, j), label in data_items:
+        ctx.data_segment[i].data_items[j].data = label
+
+    old_fn = ctx.get_function(new_fn.name)
+    allocator = ctx.mem_allocator
+    for alloca in [a for a in allocator.allocated if _owner(a.inst) is old_fn]:
+        del allocator.allocated[alloca]
+    allocator.allocated.update(allocated)
+    if mems_used is not None:
+        allocator.mems_used[new_fn] = mems_used
+    if fn_eom is not None:
+        allocator.fn_eom[new_fn] = fn_eom
+
+    # replaces the function in place, so the order of `ctx.functions`
+    # does not change
+    ctx.functions[new_fn.name] = new_fn
+    if ctx.entry_function is old_fn:
+        ctx.entry_function = new_fn
+
+
+def _closure(
+    ctx: IRContext, name: IRLabel, callees: dict[IRLabel, set[IRLabel]]
+) -> set[IRFunction]:
+    names = {name}
+    worklist = [name]
+    while len(worklist) > 0:
+        for callee in callees[worklist.pop()]:
+            if callee not in names:
+                names.add(callee)
+                worklist.append(callee)
+    return {ctx.get_function(n) for n in names}
+
+
+def is_acyclic(fcg: FCGGlobalAnalysis, functions: list[IRFunction]) -> bool:
+    """
+    Check that there is a callee-first order of `functions`.
+    """
+    visiting: set[IRFunction] = set()
+    done: set[IRFunction] = set()
+
+    for root in functions:
+        if root in done:
+            continue
+        stack: list[tuple[IRFunction, Iterator[IRFunction]]] = [(root, iter(fcg.get_callees(root)))]
+        visiting.add(root)
+        while len(stack) > 0:
+            fn, callees = stack[-1]
+            callee = next(callees, None)
+            if callee is None:
+                stack.pop()
+                visiting.remove(fn)
+                done.add(fn)
+            elif callee in visiting:
+                return False
+            elif callee not in done:
+                visiting.add(callee)
+                stack.append((callee, iter(fcg.get_callees(callee))))
+    return True
+
+
+def run_fn_passes_parallel(
+    ctx: IRContext,
+    fcg: FCGGlobalAnalysis,
+    flags: VenomOptimizationFlags,
+    run_serial: Callable[[IRFunction], None],
+) -> None:
+    """
+    Run the per-function pipelines on `flags.fn_pass_jobs` processes. A
+    function is scheduled as soon as all of its callees are done, so the
+    call graph must be acyclic (see `is_acyclic()`).
+
+    If a job fails, the pipeline of that function is re-run in this
+    process with `run_serial`, so that errors are raised with their full
+    context.
+    """
+    functions = list(ctx.functions.values())
+
+    # the fcg refers to the functions as they were before the passes;
+    # work with names, the function objects get replaced on merge.
+    callees = {fn.name: {c.name for c in fcg.get_callees(fn)} for fn in functions}
+    pending = {fn.name for fn in functions}
+    done: set[IRLabel] = set()
+    running: dict[Future, IRLabel] = {}
+
+    table = _ObjectTable()
+    with ProcessPoolExecutor(max_workers=flags.fn_pass_jobs) as executor:
+        while len(pending) > 0 or len(running) > 0:
+            ready = [
+                fn.name
+                for fn in ctx.functions.values()
+                if fn.name in pending and callees[fn.name] <= done
+            ]
+            for name in ready:
+                pending.remove(name)
+                snapshot = _dump_snapshot(table, _closure(ctx, name, callees))
+                future = executor.submit(_run_job, snapshot, name.value, flags)
+                running[future] = name
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            # merge in a fixed order, independent of completion order
+            for future in sorted(finished, key=lambda f: running[f].value):
+                name = running.pop(future)
+                try:
+                    _, result = future.result()
+                except Exception:
+                    run_serial(ctx.get_function(name))
+                else:
+                    _merge_result(ctx, result, table)
+                done.add(name)
@@ -0,0 +1,102 @@
+import contextlib
+import time
+from typing import Iterator, Optional
+
+from vyper.venom.analysis.analysis import IRAnalysesCache
+from vyper.venom.function import IRFunction
+
+"""
+statistics about what each venom pass did to each function.
+
+like the profiler, collection is opt-in: `pass_stats()` does nothing unless
+a `PassStatsCollector` is active. collecting stats snapshots the function
+before and after every pass, so it is too slow to leave on by default.
+"""
+
+
+def _num_instructions(fn: IRFunction) -> int:
+    return sum(len(bb.instructions) for bb in fn.get_basic_blocks())
+
+
+class PassStatsCollector:
+    def __init__(self):
+        # function name -> one record per pass run, in pipeline order
+        self.functions: dict[str, list[dict]] = {}
+
+    @contextlib.contextmanager
+    def record(self, fn: IRFunction, pass_name: str, ac: IRAnalysesCache) -> Iterator[None]:
+        instructions_before = _num_instructions(fn)
+        basic_blocks_before = fn.num_basic_blocks
+        code_size_before = fn.code_size_cost
+        # note: the text representation is the cheapest complete snapshot
+        # of a function, it is how we tell whether a pass did anything.
+        text_before = str(fn)
+        computed_before = ac.num_computed
+        invalidated_before = ac.num_invalidated
+
+        start = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - start
+
+        record = {
+            "pass": pass_name,
+            "time": elapsed,
+            "changed": str(fn) != text_before,
+            "instructions_before": instructions_before,
+            "instructions_after": _num_instructions(fn),
+            "basic_blocks_before": basic_blocks_before,
+            "basic_blocks_after": fn.num_basic_blocks,
+            "code_size_delta": fn.code_size_cost - code_size_before,
+            "analyses_computed": ac.num_computed - computed_before,
+            "analyses_invalidated": ac.num_invalidated - invalidated_before,
+        }
+        self.functions.setdefault(str(fn.name), []).append(record)
+
+    @contextlib.contextmanager
+    def collect(self) -> Iterator[None]:
+        global _collector
+
+        prev_collector = _collector
+        _collector = self
+        try:
+            yield
+        finally:
+            _collector = prev_collector
+
+    def summary(self) -> dict[str, dict]:
+        """
+        Aggregate the records of each pass over all functions.
+        """
+        ret: dict[str, dict] = {}
+        for records in self.functions.values():
+            for record in records:
+                summary = ret.setdefault(
+                    record["pass"], {"runs": 0, "changed": 0, "time": 0.0, "instructions_delta": 0}
+                )
+                summary["runs"] += 1
+                summary["changed"] += record["changed"]
+                summary["time"] += record["time"]
+                summary["instructions_delta"] += (
+                    record["instructions_after"] - record["instructions_before"]
+                )
+        return ret
+
+    def as_dict(self) -> dict:
+        return {"functions": self.functions, "passes": self.summary()}
+
+
+_collector: Optional[PassStatsCollector] = None
+
+
+def is_collecting() -> bool:
+    return _collector is not None
+
+
+@contextlib.contextmanager
+def pass_stats(fn: IRFunction, pass_name: str, ac: IRAnalysesCache) -> Iterator[None]:
+    if _collector is None:
+        yield
+        return
+
+    with _collector.record(fn, pass_name, ac):
+        yield
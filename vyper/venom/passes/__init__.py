@@ -14,12 +14,14 @@ from .function_inliner import FunctionInlinerPass
 from .internal_return_copy_forwarding import InternalReturnCopyForwardingPass
 from .literals_codesize import ReduceLiteralsCodesize
 from .load_elimination import LoadElimination
+from .loop_invariant_code_motion import LoopInvariantCodeMotion
 from .lower_dload import LowerDloadPass
 from .make_ssa import MakeSSA
 from .mem2var import Mem2Var
 from .memmerging import MemMergePass
 from .memory_copy_elision import MemoryCopyElisionPass
 from .overflow_elimination import OverflowEliminationPass
+from .partial_redundancy_elimination import PartialRedundancyElimination
 from .phi_elimination import PhiEliminationPass
 from .readonly_invoke_arg_copy_forwarding import ReadonlyInvokeArgCopyForwardingPass
 from .remove_unused_variables import RemoveUnusedVariablesPass
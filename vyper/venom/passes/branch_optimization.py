@@ -1,6 +1,14 @@
+from typing import Optional
+
 from vyper.utils import OrderedSet
 from vyper.venom.analysis import CFGAnalysis, DFGAnalysis, LivenessAnalysis
-from vyper.venom.basicblock import COMPARATOR_INSTRUCTIONS, IRBasicBlock, IRInstruction, IRLiteral
+from vyper.venom.basicblock import (
+    COMPARATOR_INSTRUCTIONS,
+    IRBasicBlock,
+    IRInstruction,
+    IRLabel,
+    IRLiteral,
+)
 from vyper.venom.passes.base_pass import InstUpdater, IRPass
 
 
@@ -38,16 +46,26 @@ class BranchOptimizationPass(IRPass):
 
             fst, snd = self.cfg.cfg_out(bb)
 
+            cond = term_inst.operands[0]
+            prev_inst = self.dfg.get_producing_instruction(cond)
+            assert prev_inst is not None
+
+            hot_label = self._hot_label(term_inst)
+            if hot_label is not None:
+                # the zero target is laid out as the fallthrough. keep the
+                # hot path there, but only flip if it saves the iszero.
+                if hot_label == term_inst.operands[1] and prev_inst.opcode == "iszero":
+                    new_cond = prev_inst.operands[0]
+                    new_operands = [new_cond, term_inst.operands[2], term_inst.operands[1]]
+                    self.updater.update(term_inst, term_inst.opcode, new_operands)
+                continue
+
             fst_liveness = self.heuristic_liveness[fst]
             snd_liveness = self.heuristic_liveness[snd]
 
             # heuristic(!) to decide if we should flip the labels or not
             cost_a, cost_b = len(fst_liveness), len(snd_liveness)
 
-            cond = term_inst.operands[0]
-            prev_inst = self.dfg.get_producing_instruction(cond)
-            assert prev_inst is not None
-
             # heuristic: remove the iszero and swap branches
             if cost_a >= cost_b and prev_inst.opcode == "iszero":
                 new_cond = prev_inst.operands[0]
@@ -62,6 +80,20 @@ class BranchOptimizationPass(IRPass):
                 new_operands = [new_cond, term_inst.operands[2], term_inst.operands[1]]
                 self.updater.update(term_inst, term_inst.opcode, new_operands)
 
+    def _hot_label(self, term_inst: IRInstruction) -> Optional[IRLabel]:
+        # the target of the jnz which was entered more often, according
+        # to the execution profile
+        profile = self.function.ctx.profile
+        if profile is None:
+            return None
+        nonzero, zero = term_inst.operands[1], term_inst.operands[2]
+        assert isinstance(nonzero, IRLabel) and isinstance(zero, IRLabel)
+        nonzero_count = profile.block_count(nonzero)
+        zero_count = profile.block_count(zero)
+        if nonzero_count is None or zero_count is None or nonzero_count == zero_count:
+            return None
+        return nonzero if nonzero_count > zero_count else zero
+
     def run_pass(self):
         liveness = self.analyses_cache.request_analysis(LivenessAnalysis)
 
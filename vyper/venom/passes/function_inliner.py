@@ -9,6 +9,7 @@ from vyper.venom.analysis.readonly_memory_args import ReadonlyMemoryArgsGlobalAn
 from vyper.venom.basicblock import IRBasicBlock, IRInstruction, IRLabel, IROperand, IRVariable
 from vyper.venom.call_layout import InvokeLayout, has_dret
 from vyper.venom.context import IRContext
+from vyper.venom.execution_profile import HOT_INLINE_FACTOR
 from vyper.venom.function import IRFunction
 from vyper.venom.passes.base_pass import IRGlobalPass
 
@@ -28,6 +29,8 @@ class FunctionInlinerPass(IRGlobalPass):
     inline_count: int
     fcg: FCGGlobalAnalysis
     flags: VenomOptimizationFlags
+    # `code_size_cost` of the functions, dropped when a function changes
+    _code_size_costs: dict[IRFunction, int]
 
     def __init__(
         self,
@@ -41,6 +44,7 @@ class FunctionInlinerPass(IRGlobalPass):
     def run_pass(self):
         entry = self.ctx.entry_function
         self.inline_count = 0
+        self._code_size_costs = {}
         self.fcg = self.analyses_caches[entry].force_analysis(FCGGlobalAnalysis)
 
         for fn in self.fcg.get_reachable_functions():
@@ -60,14 +64,14 @@ class FunctionInlinerPass(IRGlobalPass):
             # print(f"Inlining function {candidate.name} with cost {candidate.code_size_cost}")
 
             calls = self.fcg.get_call_sites(candidate)
-            self._inline_function(candidate, calls)
+            new_call_sites = self._inline_function(candidate, calls)
             self.ctx.remove_function(candidate)
             self.walk.remove(candidate)
 
             self.analyses_caches[entry].invalidate_analysis(ReadonlyMemoryArgsGlobalAnalysis)
-            # TODO: check if recomputing this is a perf issue or we should rather
-            # update it in-place.
-            self.fcg = self.analyses_caches[entry].force_analysis(FCGGlobalAnalysis)
+            # recomputing the call graph after every inlined function makes
+            # the pass quadratic in the number of functions
+            self.fcg.remove_inlined_function(candidate, new_call_sites)
 
     def _select_inline_candidate(self) -> Optional[IRFunction]:
         for func in self.walk:
@@ -83,25 +87,45 @@ class FunctionInlinerPass(IRGlobalPass):
                 return func
 
             # Use the inline threshold from flags
-            if func.code_size_cost <= self.flags.inline_threshold:
+            if self._code_size_cost(func) <= self._inline_threshold(func):
                 return func
 
         return None
 
-    def _inline_function(self, func: IRFunction, call_sites: List[IRInstruction]) -> None:
+    def _inline_threshold(self, func: IRFunction) -> int:
+        threshold = self.flags.inline_threshold
+        assert threshold is not None  # help mypy
+        # spend code size on the functions where the gas is spent
+        if self.ctx.profile is not None and self.ctx.profile.is_hot(func):
+            return threshold * HOT_INLINE_FACTOR
+        return threshold
+
+    def _code_size_cost(self, func: IRFunction) -> int:
+        if func not in self._code_size_costs:
+            self._code_size_costs[func] = func.code_size_cost
+        return self._code_size_costs[func]
+
+    def _inline_function(
+        self, func: IRFunction, call_sites: List[IRInstruction]
+    ) -> List[IRInstruction]:
         """
-        Inline function into call sites.
+        Inline function into call sites. Returns the invokes which were
+        copied into the callers.
         """
+        new_call_sites = []
         for call_site in call_sites:
-            self._inline_call_site(func, call_site)
+            new_call_sites.extend(self._inline_call_site(func, call_site))
             fn = call_site.parent.parent
+            self._code_size_costs.pop(fn, None)
             self.analyses_caches[fn].invalidate_analysis(DFGAnalysis)
             self.analyses_caches[fn].invalidate_analysis(CFGAnalysis)
             self.analyses_caches[fn].invalidate_analysis(DynamicMemoryAnalysis)
+        return new_call_sites
 
-    def _inline_call_site(self, func: IRFunction, call_site: IRInstruction) -> None:
+    def _inline_call_site(self, func: IRFunction, call_site: IRInstruction) -> List[IRInstruction]:
         """
-        Inline function into call site.
+        Inline function into call site. Returns the invokes in the inlined
+        body.
         """
         # TODO: not allowed at all in Vyper at the moment
         #       but we could support it if we want to with Venom.
@@ -127,6 +151,12 @@ class FunctionInlinerPass(IRGlobalPass):
         call_site_func.append_basic_block(call_site_return)
 
         func_copy = self._clone_function(func, prefix)
+        new_call_sites = [
+            inst
+            for bb in func_copy.get_basic_blocks()
+            for inst in bb.instructions
+            if inst.opcode == "invoke"
+        ]
         # bound_params = user args + (hidden fmp operand, never present
         # pre-lowering) + target-as-return-pc: identical to the old
         # operands[1:] + [operands[0]] reorder for raw IR.
@@ -180,6 +210,8 @@ class FunctionInlinerPass(IRGlobalPass):
 
         self._fix_phi(call_site_bb, call_site_return)
 
+        return new_call_sites
+
     def _fix_phi(self, orig: IRBasicBlock, new: IRBasicBlock) -> None:
         # when a function is inlined, the successors of the entry block
         # may contain phis.
@@ -0,0 +1,354 @@
+from typing import Optional
+
+from vyper.evm.address_space import MEMORY, STORAGE, TRANSIENT, AddrSpace
+from vyper.utils import OrderedSet
+from vyper.venom.analysis import (
+    BasePtrAnalysis,
+    CFGAnalysis,
+    DFGAnalysis,
+    DominatorTreeAnalysis,
+    LivenessAnalysis,
+    LoopAnalysis,
+    NaturalLoop,
+)
+from vyper.venom.analysis.mem_alias import mem_alias_type_factory
+from vyper.venom.basicblock import IRBasicBlock, IRInstruction, IROperand
+from vyper.venom.effects import EMPTY, Effects
+from vyper.venom.memory_location import MemoryLocation
+from vyper.venom.passes.base_pass import IRPass
+
+# instructions which only depend on their operands
+_PURE_INSTRUCTIONS = frozenset(
+    [
+        "add",
+        "sub",
+        "mul",
+        "div",
+        "sdiv",
+        "mod",
+        "smod",
+        "exp",
+        "addmod",
+        "mulmod",
+        "signextend",
+        "lt",
+        "gt",
+        "slt",
+        "sgt",
+        "eq",
+        "iszero",
+        "and",
+        "or",
+        "xor",
+        "not",
+        "byte",
+        "shl",
+        "shr",
+        "sar",
+    ]
+)
+
+# instructions which return the same value for the whole message call
+_ENV_INSTRUCTIONS = frozenset(
+    [
+        "address",
+        "origin",
+        "caller",
+        "callvalue",
+        "calldatasize",
+        "calldataload",
+        "codesize",
+        "gasprice",
+        "coinbase",
+        "timestamp",
+        "number",
+        "prevrandao",
+        "gaslimit",
+        "chainid",
+        "basefee",
+        "blobbasefee",
+    ]
+)
+
+# instructions which can be evaluated in the preheader to check whether a
+# loop is entered
+_CLONEABLE_INSTRUCTIONS = _PURE_INSTRUCTIONS | _ENV_INSTRUCTIONS | {"assign"}
+
+# loads are only hoisted if they are executed on every iteration of the
+# loop. hoisting a load out of a conditional block would pay for it on
+# every call, even if the branch is never taken (e.g. a cold `sload`);
+# `mload` can also expand memory, which changes `msize` and the gas cost.
+# a storage load which is not executed if the loop is left right away is
+# hoisted behind a guard, see `_insert_guard()`.
+_LOADS = {"sload": STORAGE, "tload": TRANSIENT, "mload": MEMORY}
+
+# the loads which pay for the guard. an `mload` is about as cheap as
+# keeping its value on the stack across the loop.
+_GUARDED_LOADS = frozenset(["sload", "tload"])
+
+_SPACE_EFFECTS = {MEMORY: Effects.MEMORY, STORAGE: Effects.STORAGE, TRANSIENT: Effects.TRANSIENT}
+
+
+class LoopInvariantCodeMotion(IRPass):
+    """
+    Hoist loop-invariant instructions into the preheader of their loop.
+
+    An instruction is loop-invariant if all of its inputs are defined
+    outside of the loop, and, for loads, if no store in the loop may write
+    to the location it reads (see `MemoryAliasAnalysis`). Loops are
+    visited innermost first, so that instructions can be hoisted out of a
+    whole loop nest.
+
+    Loads in the body of a loop whose header checks the exit condition
+    (e.g. a `for` loop) are not executed if the loop runs zero times. They
+    are hoisted into a guard block, which the preheader only enters if the
+    header would enter the body:
+
+        preheader:                      preheader:
+            ...                             ...
+            jmp @header                     %c' = <exit condition>
+        header:                 ==>         jnz %c', @guard, @exit
+            %c = <exit condition>       guard:
+            jnz %c, @body, @exit            <hoisted loads>
+                                            jmp @header
+    """
+
+    def run_pass(self):
+        self.base_ptr = self.analyses_cache.request_analysis(BasePtrAnalysis)
+        self._request_cfg_analyses()
+
+        changed = False
+        visited: set[IRBasicBlock] = set()
+        restart = True
+        while restart:
+            restart = False
+            for loop in self.loop_analysis.loops:
+                if loop.header in visited:
+                    continue
+                visited.add(loop.header)
+
+                preheader = self.loop_analysis.get_preheader(loop)
+                if preheader is None:
+                    continue
+                self.guard: Optional[IRBasicBlock] = None
+                changed |= self._hoist_loop(loop, preheader)
+
+                if self.guard is not None:
+                    # the cfg changed, the remaining (outer) loops are
+                    # visited with fresh analyses
+                    self._invalidate_cfg_analyses()
+                    self._request_cfg_analyses()
+                    restart = True
+                    break
+
+        if changed:
+            self.analyses_cache.invalidate_analysis(LivenessAnalysis)
+
+    def _request_cfg_analyses(self):
+        self.cfg = self.analyses_cache.request_analysis(CFGAnalysis)
+        self.dfg = self.analyses_cache.request_analysis(DFGAnalysis)
+        self.dom = self.analyses_cache.request_analysis(DominatorTreeAnalysis)
+        self.loop_analysis = self.analyses_cache.request_analysis(LoopAnalysis)
+
+    def _invalidate_cfg_analyses(self):
+        self.analyses_cache.invalidate_analysis(CFGAnalysis)
+        self.analyses_cache.invalidate_analysis(LoopAnalysis)
+        # the guard defines new variables
+        self.analyses_cache.invalidate_analysis(BasePtrAnalysis)
+        for space in _SPACE_EFFECTS:
+            self.analyses_cache.invalidate_analysis(mem_alias_type_factory(space))
+        self.base_ptr = self.analyses_cache.request_analysis(BasePtrAnalysis)
+
+    def _hoist_loop(self, loop: NaturalLoop, preheader: IRBasicBlock) -> bool:
+        self._collect_writes(loop)
+
+        changed = False
+        # hoisting an instruction can make its uses invariant, iterate
+        # until nothing changes. blocks are visited in order, so usually a
+        # single round is enough.
+        while True:
+            hoisted = False
+            # (a list, the guard block may be added on the way)
+            for bb in list(self.function.get_basic_blocks()):
+                if bb not in loop.body:
+                    continue
+                for inst in list(bb.non_phi_instructions):
+                    target = self._hoist_target(inst, loop, preheader)
+                    if target is not None:
+                        self._move_to_end(inst, target)
+                        hoisted = True
+            if not hoisted:
+                break
+            changed = True
+
+        return changed
+
+    def _collect_writes(self, loop: NaturalLoop):
+        self.write_effects = EMPTY
+        self.write_locations: dict[AddrSpace, list[MemoryLocation]] = {
+            space: [] for space in _SPACE_EFFECTS
+        }
+        for bb in loop.body:
+            for inst in bb.instructions:
+                write_effects = inst.get_write_effects()
+                if write_effects == EMPTY:
+                    continue
+                self.write_effects |= write_effects
+                for space, eff in _SPACE_EFFECTS.items():
+                    if write_effects & eff != EMPTY:
+                        loc = self.base_ptr.get_write_location(inst, space)
+                        self.write_locations[space].append(loc)
+
+    def _hoist_target(
+        self, inst: IRInstruction, loop: NaturalLoop, preheader: IRBasicBlock
+    ) -> Optional[IRBasicBlock]:
+        # the block to hoist `inst` into, or None if it is not invariant
+        if inst.num_outputs != 1:
+            return None
+
+        opcode = inst.opcode
+        if opcode in _LOADS:
+            if not self._is_executed_every_iteration(inst, loop):
+                return None
+            if not self._is_unclobbered(inst, _LOADS[opcode]):
+                return None
+        elif opcode not in _PURE_INSTRUCTIONS and opcode not in _ENV_INSTRUCTIONS:
+            return None
+
+        target = preheader
+        for var in inst.get_input_variables():
+            producer = self.dfg.get_producing_instruction(var)
+            if producer is None or producer.parent in loop.body:
+                return None
+            if producer.parent is self.guard:
+                target = self.guard
+
+        if opcode in _LOADS and not self._is_executed_on_entry(inst, loop):
+            if opcode not in _GUARDED_LOADS:
+                return None
+            if self.guard is None:
+                self.guard = self._insert_guard(loop, preheader)
+            if self.guard is None:
+                return None
+            target = self.guard
+
+        return target
+
+    def _is_unclobbered(self, inst: IRInstruction, space: AddrSpace) -> bool:
+        # check that no instruction in the loop may write to the location
+        # which `inst` reads
+        if self.write_effects & _SPACE_EFFECTS[space] == EMPTY:
+            return True
+
+        read_loc = self.base_ptr.get_read_location(inst, space)
+        mem_alias = self.analyses_cache.request_analysis(mem_alias_type_factory(space))
+        return not any(
+            mem_alias.may_alias(read_loc, write_loc) for write_loc in self.write_locations[space]
+        )
+
+    def _is_executed_on_entry(self, inst: IRInstruction, loop: NaturalLoop) -> bool:
+        # the block of `inst` is executed before the loop can be left
+        return all(self.dom.dominates(inst.parent, bb) for bb in loop.exiting)
+
+    def _is_executed_every_iteration(self, inst: IRInstruction, loop: NaturalLoop) -> bool:
+        # the block of `inst` is executed on every iteration, and before
+        # the loop can be left from the body (e.g. by a `break`). only the
+        # exit from the header can skip it, if the loop runs zero times.
+        bb = inst.parent
+        return all(self.dom.dominates(bb, latch) for latch in loop.latches) and all(
+            self.dom.dominates(bb, exiting) for exiting in loop.exiting if exiting != loop.header
+        )
+
+    def _insert_guard(self, loop: NaturalLoop, preheader: IRBasicBlock) -> Optional[IRBasicBlock]:
+        """
+        Evaluate the exit condition of the header in the preheader, and
+        branch to a new guard block (and from there to the header) if the
+        loop body is entered, or to the exit otherwise. Returns the guard
+        block, or None if the header cannot be evaluated in the preheader.
+        """
+        fn = self.function
+        header = loop.header
+        term = header.instructions[-1]
+        if term.opcode != "jnz":
+            return None
+        labels = list(term.get_label_operands())
+        exits = [fn.get_basic_block(label.value) for label in labels]
+        exits = [bb for bb in exits if bb not in loop.body]
+        if len(exits) != 1:
+            return None
+        exit_bb = exits[0]
+        # the exit gets the preheader as a new predecessor, which is only
+        # handled if it does not merge values yet
+        if self.cfg.cfg_in(exit_bb) != OrderedSet([header]):
+            return None
+
+        body = list(header.body_instructions)
+        if not all(
+            inst.opcode in _CLONEABLE_INSTRUCTIONS and inst.num_outputs == 1 for inst in body
+        ):
+            return None
+
+        # the values defined in the header which are used after the loop
+        # are merged in the exit block
+        defined = [inst.output for inst in header.instructions if inst.num_outputs == 1]
+        outside_uses = {}
+        for var in defined:
+            uses = [use for use in self.dfg.get_uses(var) if use.parent not in loop.body]
+            if not all(self.dom.dominates(exit_bb, use.parent) for use in uses):
+                return None
+            if len(uses) > 0:
+                outside_uses[var] = uses
+
+        # the values of the header on the first iteration
+        first: dict[IROperand, IROperand] = {}
+        for phi in header.phi_instructions:
+            first[phi.output] = next(v for label, v in phi.phi_operands if label == preheader.label)
+
+        preheader_term = preheader.instructions.pop()
+        for inst in body:
+            clone = inst.copy()
+            clone.replace_operands(first)
+            clone.set_outputs([fn.get_next_variable()])
+            first[inst.output] = clone.output
+            preheader.instructions.append(clone)
+            clone.parent = preheader
+
+        guard = IRBasicBlock(fn.ctx.get_next_label("licm_guard"), fn)
+        guard.append_instruction("jmp", header.label)
+        fn.append_basic_block(guard)
+
+        branch = preheader_term
+        branch.opcode = "jnz"
+        # branch to the guard where the header branches into the loop
+        branch.operands = [
+            guard.label if op != exit_bb.label and op in labels else first.get(op, op)
+            for op in term.operands
+        ]
+        preheader.instructions.append(branch)
+
+        for phi in header.phi_instructions:
+            phi.replace_label_operands({preheader.label: guard.label})
+
+        for var, uses in outside_uses.items():
+            merged = fn.get_next_variable()
+            phi = IRInstruction(
+                "phi", [header.label, var, preheader.label, first[var]], outputs=[merged]
+            )
+            exit_bb.insert_instruction(phi, 0)
+            for use in uses:
+                use.replace_operands({var: merged})
+
+        # the guard is part of the loops which contain the preheader
+        parent = loop.parent
+        while parent is not None:
+            parent.body.add(guard)
+            parent = parent.parent
+
+        return guard
+
+    def _move_to_end(self, inst: IRInstruction, bb: IRBasicBlock):
+        inst.parent.remove_instruction(inst)
+        # insert before the terminator. (not `insert_instruction()`, it
+        # would overwrite the source information of the instruction).
+        bb.instructions.insert(len(bb.instructions) - 1, inst)
+        inst.parent = bb
@@ -0,0 +1,261 @@
+from typing import Optional
+
+from vyper.evm.opcodes import get_opcodes
+from vyper.utils import ceil32
+from vyper.venom.analysis import CFGAnalysis, DFGAnalysis, DominatorTreeAnalysis, LivenessAnalysis
+from vyper.venom.analysis.available_expression import (
+    NONIDEMPOTENT_INSTRUCTIONS,
+    AvailableExpressionAnalysis,
+)
+from vyper.venom.basicblock import (
+    COMMUTATIVE_INSTRUCTIONS,
+    IRBasicBlock,
+    IRInstruction,
+    IRLiteral,
+    IROperand,
+    IRVariable,
+)
+from vyper.venom.effects import EMPTY
+from vyper.venom.passes.base_pass import InstUpdater, IRPass
+from vyper.venom.passes.common_subexpression_elimination import NO_SUBSTITUTE_OPCODES
+
+# estimated number of stack operations needed at the end of each
+# predecessor to line up the operands of a phi
+PHI_COST = 3
+_STACK_OP_GAS = 3
+
+# default code size budget per eliminated instruction
+DEFAULT_MAX_CODE_GROWTH = 8
+
+_ExprKey = tuple[str, tuple[IROperand, ...]]
+
+
+class PartialRedundancyElimination(IRPass):
+    """
+    Eliminate instructions in join blocks which are (partially) redundant
+    with instructions in the predecessors.
+
+    For each instruction in a block with several predecessors, the
+    instruction is translated into each predecessor (phi outputs are
+    replaced by the value which flows in from that predecessor), and
+    looked up by value number (opcode and operands, modulo assigns and
+    commutativity). If the value is available at the end of all
+    predecessors, the instruction is replaced by a phi of the available
+    values. If it is only available in some, it is inserted at the end of
+    the others first, provided the join block is their only successor (so
+    the inserted instruction is not speculative).
+
+    This catches what `CSE` misses, since `AvailableExpressionAnalysis` only
+    knows about expressions computed on a dominating path; for instance the
+    `sha3` of a `HashMap` slot which is written on both arms of an `if` and
+    read again after it.
+
+    Each elimination is weighed against the cost of the phi: the code
+    size (from `code_size_cost`) of the inserted instructions and of the
+    stack shuffling in the predecessors must not exceed `max_code_growth`
+    (0 for `-Os`, so that the code never grows), and the gas saved on the
+    paths where the value was available must exceed the gas of the
+    shuffling.
+    """
+
+    updater: InstUpdater
+
+    def run_pass(self, max_code_growth: int = DEFAULT_MAX_CODE_GROWTH):
+        self.max_code_growth = max_code_growth
+        self.cfg = self.analyses_cache.request_analysis(CFGAnalysis)
+        self.dfg = self.analyses_cache.request_analysis(DFGAnalysis)
+        self.dom = self.analyses_cache.request_analysis(DominatorTreeAnalysis)
+        self.updater = InstUpdater(self.dfg)
+
+        self.exprs: dict[_ExprKey, list[IRInstruction]] = {}
+        self.inst_to_key: dict[IRInstruction, _ExprKey] = {}
+        for bb in self.function.get_basic_blocks():
+            for inst in bb.instructions:
+                if self._is_candidate(inst):
+                    self._add_expr(inst, self._mk_key(inst.opcode, inst.operands))
+
+        changed = False
+        for bb in self.function.get_basic_blocks():
+            preds = self.cfg.cfg_in(bb)
+            if len(preds) < 2 or not self.cfg.is_reachable(bb):
+                continue
+            if not all(self.cfg.is_reachable(pred) for pred in preds):
+                continue
+            changed |= self._handle_join(bb)
+
+        if changed:
+            self.analyses_cache.invalidate_analysis(DFGAnalysis)
+            self.analyses_cache.invalidate_analysis(LivenessAnalysis)
+            self.analyses_cache.invalidate_analysis(AvailableExpressionAnalysis)
+
+    def _is_candidate(self, inst: IRInstruction) -> bool:
+        if inst.num_outputs != 1:
+            return False
+        if inst.opcode in NO_SUBSTITUTE_OPCODES or inst.opcode in NONIDEMPOTENT_INSTRUCTIONS:
+            return False
+        if inst.is_pseudo or inst.is_bb_terminator:
+            return False
+        return inst.get_write_effects() == EMPTY
+
+    def _add_expr(self, inst: IRInstruction, key: _ExprKey):
+        self.exprs.setdefault(key, []).append(inst)
+        self.inst_to_key[inst] = key
+
+    def _resolve(self, op: IROperand) -> IROperand:
+        # value numbering: look through assigns
+        while isinstance(op, IRVariable):
+            inst = self.dfg.get_producing_instruction(op)
+            if inst is None or inst.opcode != "assign":
+                break
+            op = inst.operands[0]
+        return op
+
+    def _mk_key(self, opcode: str, operands: list[IROperand]) -> _ExprKey:
+        ops = tuple(self._resolve(op) for op in operands)
+        if opcode in COMMUTATIVE_INSTRUCTIONS:
+            ops = tuple(sorted(ops, key=repr))
+        return (opcode, ops)
+
+    def _handle_join(self, bb: IRBasicBlock) -> bool:
+        changed = False
+        # effects written by the instructions of `bb` seen so far
+        killed = EMPTY
+        for inst in list(bb.non_phi_instructions):
+            if self._is_candidate(inst) and inst.get_read_effects() & killed == EMPTY:
+                changed |= self._handle_inst(bb, inst)
+            killed |= inst.get_write_effects()
+        return changed
+
+    def _handle_inst(self, bb: IRBasicBlock, inst: IRInstruction) -> bool:
+        available: dict[IRBasicBlock, IRVariable] = {}
+        missing: dict[IRBasicBlock, list[IROperand]] = {}
+        for pred in self.cfg.cfg_in(bb):
+            operands = self._translate(inst, bb, pred)
+            if operands is None:
+                return False
+            val = self._find_available(inst, pred, self._mk_key(inst.opcode, operands))
+            if val is not None:
+                available[pred] = val
+            else:
+                missing[pred] = operands
+
+        if len(available) == 0:
+            return False
+        # the value is the same along all paths, leave it to CSE
+        if len(missing) == 0 and len(set(available.values())) == 1:
+            return False
+        for pred in missing:
+            # only insert where `inst` would be executed anyway
+            if pred is bb or len(self.cfg.cfg_out(pred)) != 1:
+                return False
+
+        preds = self.cfg.cfg_in(bb)
+        size = _code_size(inst)
+        growth = len(missing) * size + PHI_COST * len(preds) - size
+        if growth > self.max_code_growth:
+            return False
+        # the phi costs gas on every path, the instruction is only saved
+        # on the paths where it was available
+        if _gas(inst) * len(available) <= PHI_COST * _STACK_OP_GAS * len(preds):
+            return False
+
+        for pred, operands in missing.items():
+            available[pred] = self._insert(inst, pred, operands)
+
+        phi_operands: list[IROperand] = []
+        for pred in preds:
+            phi_operands.extend([pred.label, available[pred]])
+        join = self.updater.add_before(bb.instructions[0], "phi", phi_operands)
+        assert join is not None
+
+        self.exprs[self.inst_to_key.pop(inst)].remove(inst)
+        self.updater.mk_assign(inst, join)
+        return True
+
+    def _translate(
+        self, inst: IRInstruction, bb: IRBasicBlock, pred: IRBasicBlock
+    ) -> Optional[list[IROperand]]:
+        # the operands of `inst` as seen at the end of `pred`
+        ret = []
+        for op in inst.operands:
+            op = self._resolve(op)
+            if isinstance(op, IRVariable):
+                producer = self.dfg.get_producing_instruction(op)
+                assert producer is not None, op
+                if producer.parent is bb:
+                    if producer.opcode != "phi":
+                        return None
+                    op = self._resolve(self._phi_value(producer, pred))
+            ret.append(op)
+        return ret
+
+    def _phi_value(self, phi: IRInstruction, pred: IRBasicBlock) -> IROperand:
+        for label, var in phi.phi_operands:
+            if label == pred.label:
+                return var
+        raise KeyError(pred.label)  # pragma: nocover
+
+    def _find_available(
+        self, inst: IRInstruction, pred: IRBasicBlock, key: _ExprKey
+    ) -> Optional[IRVariable]:
+        # find an instruction computing `key` whose value is still valid
+        # at the end of `pred`
+        read_effects = inst.get_read_effects()
+        for other in self.exprs.get(key, []):
+            if other is inst:
+                continue
+            if other.parent is pred:
+                if not self._is_killed_after(other, read_effects):
+                    return other.output
+            elif read_effects == EMPTY and self.dom.dominates(other.parent, pred):
+                return other.output
+        return None
+
+    def _is_killed_after(self, inst: IRInstruction, read_effects) -> bool:
+        if read_effects == EMPTY:
+            return False
+        bb = inst.parent
+        idx = bb.instructions.index(inst)
+        return any(
+            other.get_write_effects() & read_effects != EMPTY
+            for other in bb.instructions[idx + 1 :]
+        )
+
+    def _insert(
+        self, inst: IRInstruction, pred: IRBasicBlock, operands: list[IROperand]
+    ) -> IRVariable:
+        var = self.updater.add_before(pred.instructions[-1], inst.opcode, operands)
+        assert var is not None
+        new_inst = self.dfg.get_producing_instruction(var)
+        assert new_inst is not None
+        self._add_expr(new_inst, self._mk_key(inst.opcode, operands))
+        return var
+
+
+def _push_size(lit: IRLiteral) -> int:
+    if lit.value == 0:
+        return 1  # PUSH0
+    return 1 + (lit.value.bit_length() + 7) // 8
+
+
+def _code_size(inst: IRInstruction) -> int:
+    # `code_size_cost` does not count the literal operands
+    ret = inst.code_size_cost
+    for op in inst.operands:
+        if isinstance(op, IRLiteral):
+            ret += _push_size(op)
+    return ret
+
+
+def _gas(inst: IRInstruction) -> int:
+    # static gas of the instruction and of pushing its literal operands
+    opcode_info = get_opcodes().get(inst.opcode.upper())
+    if opcode_info is None:
+        return 0
+    ret = opcode_info[3]
+    if inst.opcode == "sha3" and isinstance(size := inst.operands[0], IRLiteral):
+        ret += 6 * ceil32(size.value) // 32
+    for op in inst.operands:
+        if isinstance(op, IRLiteral):
+            ret += 2 if op.value == 0 else 3
+    return ret
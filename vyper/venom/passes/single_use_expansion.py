@@ -22,6 +22,7 @@ class SingleUseExpansion(IRPass):
 
     def run_pass(self):
         self.dfg = self.analyses_cache.request_analysis(DFGAnalysis)
+        self.liveness = self.analyses_cache.request_analysis(LivenessAnalysis)
         self.updater = InstUpdater(self.dfg)
         for bb in self.function.get_basic_blocks():
             self._process_bb(bb)
@@ -74,10 +75,13 @@ class SingleUseExpansion(IRPass):
 
             # problematic case is only when two phis
             # are getting same variable at the start of the
-            # same basic block otherwise this is not needed
+            # same basic block, or when the variable is still
+            # live after the phis (e.g. it is used in a loop body
+            # and flows back into the loop header), otherwise
+            # this is not needed
             uses = self.dfg.get_uses_in_bb(var, inst.parent)
             uses = [use for use in uses if use.opcode != "assign"]
-            if len(uses) == 1:
+            if len(uses) == 1 and var not in self.liveness.liveness_in_vars(inst.parent):
                 continue
 
             source = self.function.get_basic_block(label.name)
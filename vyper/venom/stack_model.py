@@ -1,16 +1,23 @@
+from bisect import insort
+
 from vyper.venom.basicblock import IROperand, IRVariable
 
 
 class StackModel:
     NOT_IN_STACK = object()
     _stack: list[IROperand]
+    # operand value -> ascending positions (indices into `_stack`) at which
+    # it occurs, so that depth lookups do not need to scan the stack
+    _positions: dict[object, list[int]]
 
     def __init__(self):
         self._stack = []
+        self._positions = {}
 
     def copy(self):
         new = StackModel()
         new._stack = self._stack.copy()
+        new._positions = {k: v.copy() for k, v in self._positions.items()}
         return new
 
     @property
@@ -20,15 +27,36 @@ class StackModel:
         """
         return len(self._stack)
 
+    def _add_position(self, op: IROperand, pos: int) -> None:
+        positions = self._positions.get(op.value)
+        if positions is None:
+            self._positions[op.value] = [pos]
+        elif positions[-1] < pos:
+            positions.append(pos)
+        else:
+            insort(positions, pos)
+
+    def _remove_position(self, op: IROperand, pos: int) -> None:
+        positions = self._positions[op.value]
+        if positions[-1] == pos:
+            positions.pop()
+        else:
+            positions.remove(pos)
+        if len(positions) == 0:
+            del self._positions[op.value]
+
     def push(self, op: IROperand) -> None:
         """
         Pushes an operand onto the stack map.
         """
         assert isinstance(op, IROperand), f"{type(op)}: {op}"
+        self._add_position(op, len(self._stack))
         self._stack.append(op)
 
     def pop(self, num: int = 1) -> None:
-        del self._stack[len(self._stack) - num :]
+        for _ in range(num):
+            op = self._stack.pop()
+            self._remove_position(op, len(self._stack))
 
     def get_depth(self, op: IROperand) -> int:
         """
@@ -37,11 +65,11 @@ class StackModel:
         """
         assert isinstance(op, IROperand), f"{type(op)}: {op}"
 
-        for i, stack_op in enumerate(reversed(self._stack)):
-            if stack_op.value == op.value:
-                return -i
+        positions = self._positions.get(op.value)
+        if positions is None:
+            return StackModel.NOT_IN_STACK  # type: ignore
 
-        return StackModel.NOT_IN_STACK  # type: ignore
+        return positions[-1] - (len(self._stack) - 1)
 
     def get_phi_depth(self, phis: list[IRVariable]) -> int:
         """
@@ -52,12 +80,14 @@ class StackModel:
         assert isinstance(phis, list)
 
         ret = StackModel.NOT_IN_STACK
-        for i, stack_item in enumerate(reversed(self._stack)):
-            if stack_item in phis:
+        for value in {phi.value for phi in phis}:
+            for pos in self._positions.get(value, ()):
+                if self._stack[pos] not in phis:
+                    continue
                 assert (
                     ret is StackModel.NOT_IN_STACK
                 ), f"phi argument is not unique! {phis}, {self._stack}"
-                ret = -i
+                ret = pos - (len(self._stack) - 1)
 
         return ret  # type: ignore
 
@@ -75,7 +105,10 @@ class StackModel:
         assert depth is not StackModel.NOT_IN_STACK, "Cannot poke non-in-stack depth"
         assert depth <= 0, "Bad depth"
         assert isinstance(op, IROperand), f"{type(op)}: {op}"
-        self._stack[depth - 1] = op
+        pos = len(self._stack) + depth - 1
+        self._remove_position(self._stack[pos], pos)
+        self._stack[pos] = op
+        self._add_position(op, pos)
 
     def dup(self, depth: int) -> None:
         """
@@ -83,7 +116,7 @@ class StackModel:
         """
         assert depth is not StackModel.NOT_IN_STACK, "Cannot dup non-existent operand"
         assert depth <= 0, "Cannot dup positive depth"
-        self._stack.append(self.peek(depth))
+        self.push(self.peek(depth))
 
     def swap(self, depth: int) -> None:
         """
@@ -91,9 +124,17 @@ class StackModel:
         """
         assert depth is not StackModel.NOT_IN_STACK, "Cannot swap non-existent operand"
         assert depth < 0, "Cannot swap positive depth"
-        top = self._stack[-1]
-        self._stack[-1] = self._stack[depth - 1]
-        self._stack[depth - 1] = top
+        top_pos = len(self._stack) - 1
+        pos = top_pos + depth
+        top = self._stack[top_pos]
+        op = self._stack[pos]
+        if top.value != op.value:
+            self._remove_position(top, top_pos)
+            self._remove_position(op, pos)
+            self._add_position(top, pos)
+            self._add_position(op, top_pos)
+        self._stack[top_pos] = op
+        self._stack[pos] = top
 
     def __repr__(self) -> str:
         return f"<StackModel: {self._stack}>"
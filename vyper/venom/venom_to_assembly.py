@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from typing import Any, Iterable
 
+from vyper.compiler.profiler import profile_phase
 from vyper.evm.assembler.instructions import CONST, CONSTREF, DATA_ITEM, PUSH, PUSH_OFST, DataHeader
 from vyper.evm.opcodes import get_opcodes
 from vyper.exceptions import CompilerPanic
@@ -267,7 +268,8 @@ class VenomCompiler:
             asm.extend(asm_data_section)
 
         if no_optimize is False:
-            optimize_assembly(asm)
+            with profile_phase("assembly_optimization"):
+                optimize_assembly(asm)
 
         return asm
 